@@ -0,0 +1,316 @@
+"""
+Benchmarks for the setty backends and accessors.
+
+Run from the root of the repository:
+
+    python -m benchmarks.run --output results.json
+
+Each backend is benchmarked for the latency of config.<name>, setting handles, config.get_compiled()[key_id],
+config.get_for_app and the context processor, the latency of the first reads after a cold start compared to later
+reads, and the throughput of config.<name> across concurrent threads. The time taken to set up Django and import
+setty is measured in a fresh interpreter. The results are written as JSON so they can be compared between runs.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from setty import config  # noqa: E402
+from setty.context_processors import setty_settings  # noqa: E402
+from setty.models import SettySettings, TypeChoices  # noqa: E402
+from setty.snapshot import key_id  # noqa: E402
+from setty.wrapper import set_backend  # noqa: E402
+
+BACKENDS = ['DatabaseBackend', 'CacheBackend', 'TwoTierCacheBackend']
+APP_NAMES = ['setty', 'django.contrib.auth', 'django.contrib.admin', '']
+WARM_UP_PASSES = 5
+
+# Run in a fresh interpreter, as setty is already imported by this one
+IMPORT_SCRIPT = '''
+import json
+import time
+
+start = time.perf_counter()
+import django
+
+django.setup()
+import setty.context_processors
+import setty.wrapper
+from django.db import connection
+
+print(json.dumps({
+    'elapsed': time.perf_counter() - start,
+    'backend_created': setty.wrapper._backend is not None,
+    'database_connected': connection.connection is not None,
+}))
+'''
+
+
+def create_settings(count):
+    values = [
+        (TypeChoices.INTEGER, 123),
+        (TypeChoices.STRING, 'test_string'),
+        (TypeChoices.BOOL, True),
+        (TypeChoices.DICT, {'a': 1, 'b': [1, 2, 3]}),
+    ]
+    SettySettings.objects.bulk_create(
+        SettySettings(
+            name=f'setting_{i}',
+            app_name=APP_NAMES[i % len(APP_NAMES)],
+            type=values[i % len(values)][0],
+            value=values[i % len(values)][1],
+        )
+        for i in range(count)
+    )
+    return [f'setting_{i}' for i in range(count)]
+
+
+def summarise(timings):
+    timings_us = sorted(timing * 1e6 for timing in timings)
+    return {
+        'unit': 'us',
+        'count': len(timings_us),
+        'mean': round(statistics.mean(timings_us), 3),
+        'p50': round(timings_us[len(timings_us) // 2], 3),
+        'p99': round(timings_us[min(len(timings_us) - 1, int(len(timings_us) * 0.99))], 3),
+        'min': round(timings_us[0], 3),
+    }
+
+
+def time_calls(func, args_list):
+    timings = []
+    # perf_counter_ns would need Python 3.7+
+    perf_counter = time.perf_counter
+    for args in args_list:
+        start = perf_counter()
+        func(*args)
+        timings.append(perf_counter() - start)
+    return timings
+
+
+def reset_backend():
+    cache.clear()
+    set_backend(None)
+
+
+def bench_getattr(names, iterations):
+    for name in names:
+        getattr(config, name)
+    return summarise(time_calls(getattr, [(config, names[i % len(names)]) for i in range(iterations)]))
+
+
+def bench_handle(names, iterations):
+    handles = [config.handle(name) for name in names]
+
+    def read(handle):
+        return handle.value
+
+    for handle in handles:
+        read(handle)
+    return summarise(time_calls(read, [(handles[i % len(handles)],) for i in range(iterations)]))
+
+
+def bench_compiled(names, iterations):
+    # Includes the call to config.get_compiled(), which only avoids the cache with the TwoTierCacheBackend and loads
+    # every setting with the DatabaseBackend
+    key_ids = [key_id(name) for name in names]
+
+    def read(index):
+        return config.get_compiled()[index]
+
+    read(key_ids[0])
+    return summarise(time_calls(read, [(key_ids[i % len(key_ids)],) for i in range(iterations)]))
+
+
+def bench_get_for_app(names, iterations):
+    for app_name in APP_NAMES:
+        config.get_for_app(app_name)
+    return summarise(time_calls(config.get_for_app, [(APP_NAMES[i % len(APP_NAMES)],) for i in range(iterations)]))
+
+
+def bench_context_processor(names, iterations):
+    def render(name):
+        # Templates access the settings of one app, which triggers loading all settings grouped by app
+        return setty_settings(None)['setty_setty'].get(name)
+
+    render(names[0])
+    return summarise(time_calls(render, [(names[0],) for _ in range(iterations)]))
+
+
+def bench_warm_up(names, iterations):
+    """
+    Read every setting once per pass after a cold start. The first pass shows the cost of cold misses.
+    """
+    reset_backend()
+    passes = []
+    for _ in range(WARM_UP_PASSES):
+        passes.append(summarise(time_calls(getattr, [(config, name) for name in names])))
+    return {'passes': passes}
+
+
+def bench_concurrent(names, iterations, thread_counts):
+    results = {}
+    for thread_count in thread_counts:
+        barrier = threading.Barrier(thread_count + 1)
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for i in range(iterations):
+                    getattr(config, names[i % len(names)])
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        if errors:
+            raise errors[0]
+        results[str(thread_count)] = {
+            'ops_per_sec': round(thread_count * iterations / elapsed, 1),
+            'elapsed_sec': round(elapsed, 4),
+        }
+    return results
+
+
+def bench_import(repeats):
+    """
+    Time setting up Django and importing setty in a fresh interpreter, and check that doing so neither creates the
+    backend nor connects to the database
+    """
+    timings = []
+    backend_created = database_connected = False
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_SCRIPT], check=True, stdout=subprocess.PIPE, universal_newlines=True
+        ).stdout
+        result = json.loads(output)
+        timings.append(result['elapsed'])
+        backend_created = backend_created or result['backend_created']
+        database_connected = database_connected or result['database_connected']
+    return {**summarise(timings), 'backend_created': backend_created, 'database_connected': database_connected}
+
+
+def run(backends, settings_count, iterations, thread_counts):
+    names = create_settings(settings_count)
+    results = {}
+    for backend in backends:
+        with override_settings(SETTY_BACKEND=backend):
+            reset_backend()
+            results[backend] = {
+                'getattr': bench_getattr(names, iterations),
+                'handle': bench_handle(names, iterations),
+                'compiled': bench_compiled(names, iterations),
+                'get_for_app': bench_get_for_app(names, iterations),
+                'context_processor': bench_context_processor(names, iterations),
+                'warm_up': bench_warm_up(names, iterations),
+                'concurrent': bench_concurrent(names, iterations, thread_counts),
+            }
+            print(f'{backend}: config.<name> p50 {results[backend]["getattr"]["p50"]}us', file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Return a description of each latency benchmark whose p50 is more than threshold slower than in the baseline
+    """
+    regressions = []
+    for backend, benchmarks in results.items():
+        for benchmark in ('getattr', 'handle', 'compiled', 'get_for_app', 'context_processor'):
+            try:
+                previous = baseline[backend][benchmark]['p50']
+            except KeyError:
+                continue
+            current = benchmarks[benchmark]['p50']
+            if current > previous * (1 + threshold):
+                regressions.append(f'{backend} {benchmark}: p50 {previous}us -> {current}us')
+    return regressions
+
+
+def environment():
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'cache': settings.CACHES['default']['BACKEND'],
+        'codec': getattr(settings, 'SETTY_VALUE_CODEC', 'json'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the setty backends and accessors.')
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='Comma separated backends to benchmark.')
+    parser.add_argument('--settings-count', type=int, default=100, help='Number of settings to create.')
+    parser.add_argument('--iterations', type=int, default=5000, help='Number of calls timed per benchmark.')
+    parser.add_argument('--threads', default='1,4,8', help='Comma separated thread counts for the throughput test.')
+    parser.add_argument('--import-repeats', type=int, default=10, help='Number of times the import is timed.')
+    parser.add_argument('--output', help='File to write the JSON results to. Defaults to stdout.')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare the latencies against.')
+    parser.add_argument(
+        '--threshold', type=float, default=0.2, help='Fraction by which a p50 latency may exceed the baseline.'
+    )
+    args = parser.parse_args(argv)
+
+    import_results = bench_import(args.import_repeats)
+    print(f'import p50 {import_results["p50"]}us', file=sys.stderr)
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = run(
+            args.backends.split(','),
+            args.settings_count,
+            args.iterations,
+            [int(count) for count in args.threads.split(',')],
+        )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    output = json.dumps({'environment': environment(), 'import': import_results, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.threshold)
+        if 'import' in baseline and import_results['p50'] > baseline['import']['p50'] * (1 + args.threshold):
+            regressions.append(f'import: p50 {baseline["import"]["p50"]}us -> {import_results["p50"]}us')
+        for regression in regressions:
+            print(f'Regression: {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
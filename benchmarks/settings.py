@@ -0,0 +1,51 @@
+"""
+Django settings for the setty benchmarks.
+
+SQLite and the local memory cache are used by default. Set SETTY_BENCH_DATABASE_URL to a postgres:// URL and/or
+SETTY_BENCH_REDIS_URL to a redis:// URL to benchmark against a local PostgreSQL or Redis instead. A temporary test
+database is created on the given server and destroyed afterwards.
+"""
+
+import os
+from urllib.parse import urlparse
+
+import django
+
+SECRET_KEY = 'BENCHMARK_KEY'
+
+DEBUG = False
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'setty',
+]
+
+DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}}
+
+database_url = os.environ.get('SETTY_BENCH_DATABASE_URL')
+if database_url:
+    url = urlparse(database_url)
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': url.path.lstrip('/'),
+        'USER': url.username or '',
+        'PASSWORD': url.password or '',
+        'HOST': url.hostname or '',
+        'PORT': url.port or '',
+    }
+
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+redis_url = os.environ.get('SETTY_BENCH_REDIS_URL')
+if redis_url:
+    if django.VERSION < (4, 0):
+        raise RuntimeError('Benchmarking against Redis requires Django 4.0+')
+    CACHES['default'] = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': redis_url}
+
+USE_TZ = True
+
+SETTY_BACKEND = 'DatabaseBackend'
@@ -7,7 +7,16 @@ from django.contrib import admin
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
-from .models import TypeChoices, SettySettings
+from .models import TypeChoices, SettyHistory, SettySettings
+from .rollouts import Rollout
+
+
+def parse_rollout(value):
+    rollout = json.loads(value)
+    # Raises a ValueError if the rollout is not valid
+    Rollout.from_value('', rollout)
+    return rollout
+
 
 SERIALIZERS = {
     TypeChoices.BOOL: lambda x: strtobool(x),
@@ -16,9 +25,14 @@ SERIALIZERS = {
     TypeChoices.INTEGER: lambda x: int(x),
     TypeChoices.LIST: lambda x: json.loads(x),
     TypeChoices.STRING: lambda x: str(x),
+    TypeChoices.ROLLOUT: parse_rollout,
 }
 
 
+def get_app_choices():
+    return [('', '---------')] + [(app, app) for app in settings.INSTALLED_APPS]
+
+
 class SettingsForm(forms.ModelForm):
     def __init__(self, *args, instance=None, **kwargs):
         # Loading the stringified value does not work without manually passing this in as initial data.
@@ -27,6 +41,8 @@ class SettingsForm(forms.ModelForm):
         initial_data = {'value_unpacked': getattr(instance, 'value_unpacked', None)}
         super().__init__(*args, initial=initial_data, instance=instance, **kwargs)
 
+    # The installed apps are only read when the form is rendered, so importing setty does not depend on them
+    app_name = forms.ChoiceField(choices=get_app_choices, required=False)
     value_unpacked = forms.CharField(
         label='Value', help_text='The value to store. ' 'List and Dict data types should be defined as JSON strings.'
     )
@@ -46,10 +62,13 @@ class SettingsForm(forms.ModelForm):
         instance.save()
 
         # Reset item in cache if changed in the admin
-        if settings.SETTY_BACKEND == 'CacheBackend':
-            from setty.backend import CacheBackend
+        from setty.backend import CacheBackend
+        from setty.wrapper import get_backend
 
-            CacheBackend().set_in_cache(instance.name, instance.value)
+        backend = get_backend()
+        if isinstance(backend, CacheBackend):
+            backend.set_in_cache(instance.name, instance.value)
+            backend.notify_changed([instance.name])
 
         return instance
 
@@ -67,5 +86,37 @@ class SettingsForm(forms.ModelForm):
 @admin.register(SettySettings)
 class SettyAdmin(admin.ModelAdmin):
     form = SettingsForm
-    list_display = ['name', 'app_name', 'type', 'value_unpacked', 'created_time', 'updated_time']
+    list_display = ['name', 'app_name', 'type', 'value_preview', 'created_time', 'updated_time']
+    list_filter = ['type', 'app_name']
+    search_fields = ['name', 'app_name']
     readonly_fields = ['created_time', 'updated_time']
+    # Counting every setting on each filtered page is slow with thousands of settings
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # The changelist shows the stored preview, so the full value is only loaded when editing a setting
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            return queryset.defer('value')
+        return queryset
+
+
+@admin.register(SettyHistory)
+class SettyHistoryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'setting_name', 'value_preview', 'deleted', 'changed_time']
+    list_filter = ['deleted']
+    search_fields = ['setting_name']
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('value')
+
+    # The history is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -5,4 +5,6 @@ class DjangoSettyConfig(AppConfig):
     name = 'setty'
 
     def ready(self):
-        pass
+        from .preload import setup_preload
+
+        setup_preload()
@@ -1,76 +1,1191 @@
 import logging
-from typing import Optional, Iterable, Any, TypeVar
+import random
+import time
+from collections import Counter
+from functools import partial
+from typing import Optional, Iterable, Any, TypeVar, Dict, List, Callable, Tuple, Mapping, Sequence
 
 from django.conf import settings
 from django.core.cache import cache
+from django.core.cache.backends.base import BaseCache
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
 from setty.exceptions import SettingDoesNotExistError
 
-from .models import SettySettings
+from .codecs import get_codec
+from .invalidation import get_transport, publish_invalidation
+from .metrics import get_metrics
+from .models import SettyHistory, SettyOverride, SettySettings, TypeChoices, make_value_preview
+from .rollouts import Rollout
+from .scopes import LRUCache, resolve_overrides
+from .snapshot import CompiledSettings, SettingsSnapshot, copy_mutable
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+VERSION_KEY = '__version__'
+SNAPSHOT_KEY = '__snapshot__'
+BY_APP_KEY = '__by_app__'
+COMPILED_KEY = '__compiled__'
+ROLLOUT_KEY = '__rollout__'
+INDEX_KEY = '__index__'
+APP_INDEX_KEY = '__app__'
+APP_VALUES_KEY = '__app_values__'
+SCOPE_KEY = '__scope__'
+
+# Cached in place of the encoded value of settings which do not exist. Encoded values are always bytes, so this can
+# never be mistaken for a real value.
+NOT_FOUND_MARKER = '__not_found__'
+
+# Suffixes of the keys used for stale-while-revalidate. The fresh marker expires after SETTY_CACHE_TTL, while the value
+# itself is kept for an extra SETTY_CACHE_STALE_TTL seconds so it can be served while one process refreshes it.
+FRESH_SUFFIX = ':fresh'
+LOCK_SUFFIX = ':lock'
+
+# Native async ORM and cache methods are only available on Django 4.1+ and 4.0+ respectively.
+# Older versions fall back to running the sync methods in a thread.
+ASYNC_ORM = hasattr(QuerySet, 'aget')
+ASYNC_CACHE = hasattr(BaseCache, 'aget')
+
+
+def _sync_to_async(func: Callable) -> Callable:
+    # Imported lazily as Django < 3.0 does not depend on asgiref
+    from asgiref.sync import sync_to_async
+
+    return sync_to_async(func)
+
+
+async def _acache(method: str, *args) -> Any:
+    if ASYNC_CACHE:
+        return await getattr(cache, f'a{method}')(*args)
+    return await _sync_to_async(getattr(cache, method))(*args)
+
+
+def _not_found_value() -> Any:
+    return getattr(settings, 'SETTY_NOT_FOUND_VALUE', None)
+
+
+def _does_not_exist_error(name: str) -> SettingDoesNotExistError:
+    return SettingDoesNotExistError(
+        f'Error setting value for {name} - ' f'this setting does not exist in the database!'
+    )
+
+
+def _do_not_exist_error(names: List[str]) -> SettingDoesNotExistError:
+    if len(names) == 1:
+        return _does_not_exist_error(names[0])
+    return SettingDoesNotExistError(
+        f'Error setting values for {", ".join(names)} - these settings do not exist in the database!'
+    )
+
 
 class DatabaseBackend:
     """
     The simple DatabaseBackend is backed by the Django model storing these settings
     """
 
+    def _increment(self, event: str, key: Optional[str] = None, count: int = 1) -> None:
+        metrics = get_metrics()
+        if metrics.enabled:
+            metrics.increment(event, type(self).__name__, key, count)
+
+    def _increment_many(self, hits: int, misses: int, hit_event: str, miss_event: str) -> None:
+        metrics = get_metrics()
+        if metrics.enabled:
+            backend = type(self).__name__
+            if hits:
+                metrics.increment(hit_event, backend, count=hits)
+            if misses:
+                metrics.increment(miss_event, backend, count=misses)
+
     def get_all(self, app_name: Optional[str] = None) -> Iterable:
         if app_name:
-            return SettySettings.objects.filter(app_name=app_name).all()
+            return SettySettings.objects.filter(app_name=app_name).order_by('name')
         return SettySettings.objects.all()
 
+    def get_values_for_app(self, app_name: str) -> Dict[str, Any]:
+        """
+        Load the values of the settings of an app, in name order, using a single query on the (app_name, name) index.
+        Only the names and values are fetched rather than full settings.
+        """
+        return dict(SettySettings.objects.filter(app_name=app_name).order_by('name').values_list('name', 'value'))
+
     def get(self, name: str) -> Any:
         try:
-            setting = SettySettings.objects.get(name=name).value
+            setting = self._retrieve_setting(name)
         except SettySettings.DoesNotExist:
-            setting = getattr(settings, 'SETTY_NOT_FOUND_VALUE', None)
+            setting = _not_found_value()
 
         return setting
 
+    def _retrieve_setting(self, name: str) -> Any:
+        return SettySettings.objects.values_list('value', flat=True).get(name=name)
+
+    def make_reader(self, name: str) -> Callable[[], Any]:
+        """
+        Return a function reading the given setting, with any per-setting work such as building the cache key done
+        up front. Used by setting handles.
+        """
+        return partial(self.get, name)
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetch the values of several settings using a single query
+        """
+        names = list(names)
+        found = self._retrieve_settings(names)
+
+        not_found_value = _not_found_value()
+        return {name: found.get(name, not_found_value) for name in names}
+
+    def _retrieve_settings(self, names: List[str]) -> Dict[str, Any]:
+        return dict(SettySettings.objects.filter(name__in=names).values_list('name', 'value'))
+
+    def get_snapshot(self) -> SettingsSnapshot:
+        """
+        Load the values of all settings using a single query
+        """
+        return SettingsSnapshot(SettySettings.objects.values_list('name', 'value'))
+
+    def get_compiled(self) -> CompiledSettings:
+        """
+        Compile all settings, coerced to their types, into a table indexed by key id using a single query.
+        Nothing is cached by the DatabaseBackend, so the settings are loaded and compiled on every call.
+        """
+        return CompiledSettings(SettySettings.objects.values_list('name', 'type', 'value'))
+
+    def get_rollout(self, name: str) -> Rollout:
+        """
+        Load and compile a single rollout setting using a single query. Settings which do not exist, or are not
+        rollouts, return a rollout which is never enabled.
+        """
+        row = SettySettings.objects.filter(name=name).values_list('type', 'value').first()
+        if row is None or row[0] != TypeChoices.ROLLOUT:
+            return Rollout(name)
+        return TypeChoices.compile(name, *row)
+
+    def get_all_by_app(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the values of all settings grouped by app name using a single query
+        """
+        settings_by_app = {}
+        for app_name, name, value in SettySettings.objects.values_list('app_name', 'name', 'value'):
+            settings_by_app.setdefault(app_name, {})[name] = value
+        return settings_by_app
+
+    def preload(self, app_names: Optional[Iterable[str]] = None) -> int:
+        """
+        Load all settings, or the settings of the given apps, ready to be served.
+        Nothing is cached by the DatabaseBackend, so this only checks the settings can be loaded.
+        Returns the number of settings loaded.
+        """
+        return len(self._retrieve_settings_for_apps(app_names))
+
+    def _retrieve_settings_for_apps(self, app_names: Optional[Iterable[str]]) -> Dict[str, Any]:
+        queryset = SettySettings.objects.all()
+        if app_names is not None:
+            queryset = queryset.filter(app_name__in=list(app_names))
+        return dict(queryset.values_list('name', 'value'))
+
     def set(self, name: str, value: T) -> T:
-        updated_count = SettySettings.objects.filter(name=name).update(value=value)
-        if not updated_count:
-            raise SettingDoesNotExistError(
-                f'Error setting value for {name} - ' f'this setting does not exist in the database!'
+        with transaction.atomic():
+            updated_count = SettySettings.objects.filter(name=name).update(
+                value=value, value_preview=make_value_preview(value)
+            )
+            if not updated_count:
+                raise _does_not_exist_error(name)
+            SettyHistory.record({name: value})
+        return value
+
+    def set_many(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update several settings using a single bulk update inside a transaction.
+        If any of the settings do not exist, none of them are updated and all of the missing names are reported.
+        """
+        with transaction.atomic():
+            settings_to_update = list(
+                SettySettings.objects.select_for_update().filter(name__in=list(values)).only('name')
             )
+
+            missing = set(values).difference(setting.name for setting in settings_to_update)
+            if missing:
+                raise _do_not_exist_error(sorted(missing))
+
+            now = timezone.now()
+            for setting in settings_to_update:
+                setting.value = values[setting.name]
+                setting.value_preview = make_value_preview(setting.value)
+                setting.updated_time = now
+            SettySettings.objects.bulk_update(settings_to_update, ['value', 'value_preview', 'updated_time'])
+            SettyHistory.record(values)
+        return values
+
+    def get_overrides(self, scopes: Sequence[str]) -> Dict[str, Any]:
+        """
+        Load the overrides of the given scopes, ordered from the most specific, using a single query.
+        Returns the value of each overridden setting taken from the most specific scope overriding it.
+        """
+        return resolve_overrides(scopes, self._retrieve_overrides(scopes))
+
+    def _retrieve_overrides(self, scopes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        overrides = {scope: {} for scope in scopes}
+        queryset = SettyOverride.objects.filter(scope__in=list(overrides))
+        for scope, name, value in queryset.values_list('scope', 'setting_id', 'value'):
+            overrides[scope][name] = value
+        return overrides
+
+    def set_override(self, name: str, scope: str, value: T) -> T:
+        with transaction.atomic():
+            if not SettySettings.objects.filter(name=name).exists():
+                raise _does_not_exist_error(name)
+            SettyOverride.objects.update_or_create(setting_id=name, scope=scope, defaults={'value': value})
         return value
 
+    def delete_override(self, name: str, scope: str) -> bool:
+        deleted_count, _ = SettyOverride.objects.filter(setting_id=name, scope=scope).delete()
+        return bool(deleted_count)
+
+    async def aget_all(self, app_name: Optional[str] = None) -> List[SettySettings]:
+        queryset = DatabaseBackend.get_all(self, app_name)
+        if ASYNC_ORM:
+            return [setting async for setting in queryset]
+        return await _sync_to_async(list)(queryset)
+
+    async def aget(self, name: str) -> Any:
+        try:
+            return await self._aretrieve_setting(name)
+        except SettySettings.DoesNotExist:
+            return _not_found_value()
+
+    async def _aretrieve_setting(self, name: str) -> Any:
+        queryset = SettySettings.objects.values_list('value', flat=True)
+        if ASYNC_ORM:
+            return await queryset.aget(name=name)
+        return await _sync_to_async(queryset.get)(name=name)
+
+    async def aget_many(self, names: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetch the values of several settings using a single query
+        """
+        names = list(names)
+        found = await self._aretrieve_settings(names)
+
+        not_found_value = _not_found_value()
+        return {name: found.get(name, not_found_value) for name in names}
+
+    async def _aretrieve_settings(self, names: List[str]) -> Dict[str, Any]:
+        queryset = SettySettings.objects.filter(name__in=names).values_list('name', 'value')
+        if ASYNC_ORM:
+            return {name: value async for name, value in queryset}
+        return await _sync_to_async(dict)(queryset)
+
+    async def aget_snapshot(self) -> SettingsSnapshot:
+        queryset = SettySettings.objects.values_list('name', 'value')
+        if ASYNC_ORM:
+            return SettingsSnapshot([row async for row in queryset])
+        return SettingsSnapshot(await _sync_to_async(list)(queryset))
+
+    async def aset(self, name: str, value: T) -> T:
+        # Transactions are not supported by the async ORM, so the update and its history are written in a thread
+        return await _sync_to_async(DatabaseBackend.set)(self, name, value)
+
 
 class CacheBackend(DatabaseBackend):
     """
     CacheBackend uses the Django cache setup to cache values instead of accessing the
-    database on each get call.
+    database on each get call. Values are stored in the cache encoded with the configured SETTY_VALUE_CODEC.
+
+    Settings which do not exist are cached as well, for SETTY_NOT_FOUND_CACHE_TTL seconds, so probing
+    for optional settings does not query the database each time.
+
+    If SETTY_CACHE_STALE_TTL is set, expired values are kept for that many extra seconds. Only the process
+    holding a short-lived lock refreshes an expired value from the database, while the others are served the
+    stale value. refresh_counts records how many refreshes were performed and how many were collapsed.
     """
 
+    refresh_counts = Counter()
+
+    # Settings version, expiry time and compiled settings last compiled by the process
+    _local_compiled = (None, 0.0, None)
+    # Settings version, expiry time and the rollouts compiled by the process for that version
+    _local_rollouts = (None, 0.0, {})
+
     def get(self, name: str) -> Any:
+        return self._get_cached(name, self._make_cache_key(name))
+
+    def make_reader(self, name: str) -> Callable[[], Any]:
         cache_key = self._make_cache_key(name)
+        return partial(self._get_cached, name, cache_key)
+
+    def _get_cached(self, name: str, cache_key: str) -> Any:
+        if getattr(settings, 'SETTY_CACHE_STALE_TTL', 0):
+            return self._get_stale_while_revalidate(name, cache_key)
+
         setting_value = cache.get(cache_key, '__expired__')
-        if setting_value != '__expired__':
-            logger.debug('From Cache:', setting_value)
-            return setting_value
-        logger.debug('From Database:', setting_value)
-        return self._retrieve_and_cache_setting(name)
+        if setting_value == '__expired__':
+            logger.debug('Setting %s not found in the cache', name)
+            self._increment('cache_miss', name)
+            return self._retrieve_and_cache_setting(name)
+
+        logger.debug('Setting %s retrieved from the cache', name)
+        self._increment('cache_hit', name)
+        if setting_value == NOT_FOUND_MARKER:
+            return _not_found_value()
+        return get_codec().decode(setting_value)
+
+    def _get_stale_while_revalidate(self, name: str, cache_key: str) -> Any:
+        fresh_key = cache_key + FRESH_SUFFIX
+        cached = cache.get_many([cache_key, fresh_key])
+        setting_value = cached.get(cache_key)
+        if setting_value is None:
+            self._increment('cache_miss', name)
+            return self._retrieve_and_cache_setting(name)
+
+        self._increment('cache_hit', name)
+        if setting_value == NOT_FOUND_MARKER:
+            return _not_found_value()
+        if fresh_key in cached:
+            return get_codec().decode(setting_value)
+
+        lock_key = cache_key + LOCK_SUFFIX
+        if cache.add(lock_key, True, getattr(settings, 'SETTY_CACHE_LOCK_TTL', 10)):
+            self.refresh_counts['refreshed'] += 1
+            self._increment('refreshed', name)
+            try:
+                return self._retrieve_and_cache_setting(name)
+            finally:
+                cache.delete(lock_key)
+
+        self.refresh_counts['collapsed'] += 1
+        self._increment('collapsed', name)
+        return get_codec().decode(setting_value)
 
     def _retrieve_and_cache_setting(self, name: str) -> Any:
-        value = super().get(name)
+        self._increment('db_fallback', name)
+        try:
+            value = self._retrieve_setting(name)
+        except SettySettings.DoesNotExist:
+            self.set_not_found_in_cache([name])
+            return _not_found_value()
+
         self.set_in_cache(name, value)
         return value
 
+    def get_many(self, names: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetch the values of several settings using a single cache lookup. Settings missing from the cache are
+        retrieved from the database using a single query and written back to the cache.
+        """
+        names = list(names)
+        cache_keys = {self._make_cache_key(name): name for name in names}
+        values = self._decode_cached_values(cache_keys, cache.get_many(list(cache_keys)))
+
+        missing = [name for name in names if name not in values]
+        self._increment_many(len(values), len(missing), 'cache_hit', 'cache_miss')
+        if missing:
+            self._increment('db_fallback', count=len(missing))
+            retrieved = self._retrieve_settings(missing)
+            if retrieved:
+                self._set_encoded_in_cache(self._encode_for_cache(retrieved))
+            not_found = [name for name in missing if name not in retrieved]
+            if not_found:
+                self.set_not_found_in_cache(not_found)
+            values.update(retrieved)
+
+        not_found_value = _not_found_value()
+        return {name: values.get(name, not_found_value) for name in names}
+
+    def get_snapshot(self) -> SettingsSnapshot:
+        """
+        Load the values of all settings using a single cache lookup, falling back to a single database query
+        """
+        values = cache.get(self._make_cache_key(SNAPSHOT_KEY))
+        if values is not None:
+            return SettingsSnapshot(get_codec().decode(values))
+
+        snapshot = super().get_snapshot()
+        self._cache_snapshot(snapshot)
+        return snapshot
+
+    def get_all(self, app_name: Optional[str] = None) -> Iterable:
+        """
+        Retrieve all settings, or the settings of a single app, from the cache.
+        The full index and the settings of each installed app are cached under separate keys.
+        """
+        if not self._is_cacheable_app(app_name):
+            return super().get_all(app_name)
+
+        cache_key = self._make_index_cache_key(app_name)
+        all_settings = cache.get(cache_key)
+        if all_settings is None:
+            all_settings = list(super().get_all(app_name))
+            cache.set(cache_key, all_settings, getattr(settings, 'SETTY_CACHE_TTL', 3600))
+        return all_settings
+
+    def get_values_for_app(self, app_name: str) -> Dict[str, Any]:
+        """
+        Retrieve the values of the settings of an app from the cache, falling back to a single database query
+        """
+        if app_name not in settings.INSTALLED_APPS:
+            return super().get_values_for_app(app_name)
+
+        cache_key = self._make_app_values_cache_key(app_name)
+        values = cache.get(cache_key)
+        if values is not None:
+            return get_codec().decode(values)
+
+        values = super().get_values_for_app(app_name)
+        cache.set(cache_key, get_codec().encode(values), getattr(settings, 'SETTY_CACHE_TTL', 3600))
+        return values
+
+    def get_compiled(self) -> CompiledSettings:
+        """
+        Compile all settings from the cached index of all settings. The process keeps the compiled settings until the
+        settings version changes, or for at most SETTY_CACHE_TTL seconds, so most calls only read the version.
+        """
+        version = self.get_version()
+        now = time.monotonic()
+        compiled_version, expires_at, compiled = self._local_compiled
+        if compiled is None or compiled_version != version or now >= expires_at:
+            compiled = self._compile_all()
+            self._local_compiled = (version, now + getattr(settings, 'SETTY_CACHE_TTL', 3600), compiled)
+        return compiled
+
+    def _compile_all(self) -> CompiledSettings:
+        return CompiledSettings((setting.name, setting.type, setting.value) for setting in self.get_all())
+
+    def get_rollout(self, name: str) -> Rollout:
+        """
+        Return a compiled rollout setting. The process keeps each rollout it compiles until the settings version
+        changes, or for at most SETTY_CACHE_TTL seconds, so most calls only read the version.
+        """
+        version = self.get_version()
+        now = time.monotonic()
+        rollouts_version, expires_at, rollouts = self._local_rollouts
+        if rollouts_version != version or now >= expires_at:
+            # Replaced rather than cleared, so a concurrent load is never written back into the new dict
+            rollouts = {}
+            self._local_rollouts = (version, now + getattr(settings, 'SETTY_CACHE_TTL', 3600), rollouts)
+        try:
+            return rollouts[name]
+        except KeyError:
+            rollout = rollouts[name] = super().get_rollout(name)
+            return rollout
+
+    def get_all_by_app(self) -> Dict[str, Dict[str, Any]]:
+        settings_by_app = {}
+        for setting in self.get_all():
+            settings_by_app.setdefault(setting.app_name, {})[setting.name] = setting.value
+        return settings_by_app
+
     def set(self, name: str, value: T) -> T:
         super().set(name, value)
         self.set_in_cache(name, value)
+        self.notify_changed([name])
         return value
 
+    def set_many(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update several settings in the database, then write all of them to the cache using a single set_many
+        and bump the settings version once.
+        """
+        super().set_many(values)
+        self.set_many_in_cache(values)
+        self.notify_changed(list(values))
+        return values
+
+    def get_overrides(self, scopes: Sequence[str]) -> Dict[str, Any]:
+        """
+        Retrieve the overrides of each scope from the cache using a single lookup, loading the overrides of any scopes
+        which are not cached using a single query. Scopes without overrides are cached as well.
+        """
+        cache_keys = {scope: self._make_scope_cache_key(scope) for scope in scopes}
+        cached = cache.get_many(list(cache_keys.values()))
+
+        codec = get_codec()
+        overrides = {scope: codec.decode(cached[key]) for scope, key in cache_keys.items() if key in cached}
+        missing = [scope for scope in cache_keys if scope not in overrides]
+        if missing:
+            retrieved = self._retrieve_overrides(missing)
+            cache.set_many(
+                {cache_keys[scope]: codec.encode(values) for scope, values in retrieved.items()},
+                getattr(settings, 'SETTY_CACHE_TTL', 3600),
+            )
+            overrides.update(retrieved)
+        return resolve_overrides(scopes, overrides)
+
+    def set_override(self, name: str, scope: str, value: T) -> T:
+        super().set_override(name, scope, value)
+        cache.delete(self._make_scope_cache_key(scope))
+        self.notify_changed([name])
+        return value
+
+    def delete_override(self, name: str, scope: str) -> bool:
+        deleted = super().delete_override(name, scope)
+        if deleted:
+            cache.delete(self._make_scope_cache_key(scope))
+            self.notify_changed([name])
+        return deleted
+
+    def notify_changed(self, names: Optional[Iterable[str]]) -> None:
+        """
+        Let every process know that the given settings, or all settings if names is None, have changed.
+        The settings version is bumped and the names are published if an invalidation transport is configured.
+        """
+        self.bump_version()
+        publish_invalidation(names)
+
     def set_in_cache(self, name: str, value: Any) -> None:
-        cache.set(self._make_cache_key(name), value, getattr(settings, 'SETTY_CACHE_TTL', 3600))
+        cache_key = self._make_cache_key(name)
+        ttl, fresh_ttl = self._value_cache_ttls()
+        cache.set(cache_key, get_codec().encode(value), ttl)
+        if fresh_ttl is not None:
+            cache.set(cache_key + FRESH_SUFFIX, True, fresh_ttl)
+
+    def set_many_in_cache(self, values: Mapping[str, Any]) -> None:
+        self._set_encoded_in_cache(self._encode_for_cache(values))
+
+    def delete_from_cache(self, names: Iterable[str]) -> None:
+        cache_keys = [self._make_cache_key(name) for name in names]
+        cache.delete_many(cache_keys + [cache_key + FRESH_SUFFIX for cache_key in cache_keys])
+
+    def delete_scopes_from_cache(self, scopes: Iterable[str]) -> None:
+        cache.delete_many([self._make_scope_cache_key(scope) for scope in scopes])
+
+    def set_not_found_in_cache(self, names: Iterable[str]) -> None:
+        cache.set_many(self._not_found_cache_values(names), self._not_found_cache_ttl())
 
     def load_all_settings_into_cache(self) -> None:
-        for setting in self.get_all():
-            self.set_in_cache(setting.name, setting.value)
+        self._cache_snapshot(super().get_snapshot())
+
+    def preload(self, app_names: Optional[Iterable[str]] = None) -> int:
+        """
+        Load all settings, or the settings of the given apps, into the cache using a single query and a single
+        cache write. Returns the number of settings loaded.
+        """
+        return len(self._preload_into_cache(app_names))
+
+    def _preload_into_cache(self, app_names: Optional[Iterable[str]]) -> Dict[str, Any]:
+        values = self._retrieve_settings_for_apps(app_names)
+        if app_names is None:
+            self._cache_snapshot(SettingsSnapshot(values))
+        else:
+            self._set_encoded_in_cache(self._encode_for_cache(values))
+        return values
+
+    def _cache_snapshot(self, snapshot: SettingsSnapshot) -> None:
+        self._set_encoded_in_cache(
+            self._encode_for_cache(snapshot),
+            {self._make_cache_key(SNAPSHOT_KEY): get_codec().encode(dict(snapshot))},
+        )
+
+    def _set_encoded_in_cache(self, encoded_values: Dict[str, bytes], extra_values: Optional[Dict] = None) -> None:
+        ttl, fresh_ttl = self._value_cache_ttls()
+        cache.set_many({**encoded_values, **(extra_values or {})}, ttl)
+        if fresh_ttl is not None:
+            cache.set_many(self._fresh_markers(encoded_values), fresh_ttl)
+
+    def get_version(self) -> int:
+        return cache.get(self._make_cache_key(VERSION_KEY), 0)
+
+    def bump_version(self) -> int:
+        """
+        Increment the shared settings version so that any process holding a local copy of the settings discards it.
+        Cached data derived from all settings, such as the snapshot, is discarded as well.
+        """
+        cache.delete_many(self._derived_cache_keys())
+
+        version_key = self._make_cache_key(VERSION_KEY)
+        try:
+            return cache.incr(version_key)
+        except ValueError:
+            # The key has expired or been evicted. Restart from a value no process can have seen before.
+            version = int(time.time() * 1000)
+            if cache.add(version_key, version, None):
+                return version
+            return cache.incr(version_key)
+
+    async def aget_all(self, app_name: Optional[str] = None) -> List[SettySettings]:
+        if not self._is_cacheable_app(app_name):
+            return await super().aget_all(app_name)
+
+        cache_key = self._make_index_cache_key(app_name)
+        all_settings = await _acache('get', cache_key)
+        if all_settings is None:
+            all_settings = await super().aget_all(app_name)
+            await _acache('set', cache_key, all_settings, getattr(settings, 'SETTY_CACHE_TTL', 3600))
+        return all_settings
+
+    async def aget(self, name: str) -> Any:
+        cache_key = self._make_cache_key(name)
+        if getattr(settings, 'SETTY_CACHE_STALE_TTL', 0):
+            return await self._aget_stale_while_revalidate(name, cache_key)
+
+        setting_value = await _acache('get', cache_key, '__expired__')
+        if setting_value == '__expired__':
+            logger.debug('Setting %s not found in the cache', name)
+            self._increment('cache_miss', name)
+            return await self._aretrieve_and_cache_setting(name)
+
+        logger.debug('Setting %s retrieved from the cache', name)
+        self._increment('cache_hit', name)
+        if setting_value == NOT_FOUND_MARKER:
+            return _not_found_value()
+        return get_codec().decode(setting_value)
+
+    async def _aget_stale_while_revalidate(self, name: str, cache_key: str) -> Any:
+        fresh_key = cache_key + FRESH_SUFFIX
+        cached = await _acache('get_many', [cache_key, fresh_key])
+        setting_value = cached.get(cache_key)
+        if setting_value is None:
+            self._increment('cache_miss', name)
+            return await self._aretrieve_and_cache_setting(name)
+
+        self._increment('cache_hit', name)
+        if setting_value == NOT_FOUND_MARKER:
+            return _not_found_value()
+        if fresh_key in cached:
+            return get_codec().decode(setting_value)
+
+        lock_key = cache_key + LOCK_SUFFIX
+        if await _acache('add', lock_key, True, getattr(settings, 'SETTY_CACHE_LOCK_TTL', 10)):
+            self.refresh_counts['refreshed'] += 1
+            self._increment('refreshed', name)
+            try:
+                return await self._aretrieve_and_cache_setting(name)
+            finally:
+                await _acache('delete', lock_key)
+
+        self.refresh_counts['collapsed'] += 1
+        self._increment('collapsed', name)
+        return get_codec().decode(setting_value)
+
+    async def _aretrieve_and_cache_setting(self, name: str) -> Any:
+        self._increment('db_fallback', name)
+        try:
+            value = await self._aretrieve_setting(name)
+        except SettySettings.DoesNotExist:
+            await _acache('set_many', self._not_found_cache_values([name]), self._not_found_cache_ttl())
+            return _not_found_value()
+
+        await self.aset_in_cache(name, value)
+        return value
+
+    async def aget_many(self, names: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetch the values of several settings using a single cache lookup. Settings missing from the cache are
+        retrieved from the database using a single query and written back to the cache.
+        """
+        names = list(names)
+        cache_keys = {self._make_cache_key(name): name for name in names}
+        values = self._decode_cached_values(cache_keys, await _acache('get_many', list(cache_keys)))
+
+        missing = [name for name in names if name not in values]
+        self._increment_many(len(values), len(missing), 'cache_hit', 'cache_miss')
+        if missing:
+            self._increment('db_fallback', count=len(missing))
+            retrieved = await self._aretrieve_settings(missing)
+            if retrieved:
+                await self._aset_encoded_in_cache(self._encode_for_cache(retrieved))
+            not_found = [name for name in missing if name not in retrieved]
+            if not_found:
+                await _acache('set_many', self._not_found_cache_values(not_found), self._not_found_cache_ttl())
+            values.update(retrieved)
+
+        not_found_value = _not_found_value()
+        return {name: values.get(name, not_found_value) for name in names}
+
+    async def aget_snapshot(self) -> SettingsSnapshot:
+        values = await _acache('get', self._make_cache_key(SNAPSHOT_KEY))
+        if values is not None:
+            return SettingsSnapshot(get_codec().decode(values))
+
+        snapshot = await super().aget_snapshot()
+        await self._aset_encoded_in_cache(
+            self._encode_for_cache(snapshot),
+            {self._make_cache_key(SNAPSHOT_KEY): get_codec().encode(dict(snapshot))},
+        )
+        return snapshot
+
+    async def aset(self, name: str, value: T) -> T:
+        await super().aset(name, value)
+        await self.aset_in_cache(name, value)
+        await self.anotify_changed([name])
+        return value
+
+    async def anotify_changed(self, names: Optional[Iterable[str]]) -> None:
+        await self.abump_version()
+        await _sync_to_async(publish_invalidation)(names)
+
+    async def aset_in_cache(self, name: str, value: Any) -> None:
+        cache_key = self._make_cache_key(name)
+        ttl, fresh_ttl = self._value_cache_ttls()
+        await _acache('set', cache_key, get_codec().encode(value), ttl)
+        if fresh_ttl is not None:
+            await _acache('set', cache_key + FRESH_SUFFIX, True, fresh_ttl)
+
+    async def _aset_encoded_in_cache(
+        self, encoded_values: Dict[str, bytes], extra_values: Optional[Dict] = None
+    ) -> None:
+        ttl, fresh_ttl = self._value_cache_ttls()
+        await _acache('set_many', {**encoded_values, **(extra_values or {})}, ttl)
+        if fresh_ttl is not None:
+            await _acache('set_many', self._fresh_markers(encoded_values), fresh_ttl)
+
+    async def aget_version(self) -> int:
+        return await _acache('get', self._make_cache_key(VERSION_KEY), 0)
+
+    async def abump_version(self) -> int:
+        await _acache('delete_many', self._derived_cache_keys())
+
+        version_key = self._make_cache_key(VERSION_KEY)
+        try:
+            return await _acache('incr', version_key)
+        except ValueError:
+            version = int(time.time() * 1000)
+            if await _acache('add', version_key, version, None):
+                return version
+            return await _acache('incr', version_key)
+
+    @staticmethod
+    def _value_cache_ttls() -> Tuple[int, Optional[int]]:
+        """
+        Return the TTL of cached values and, if stale-while-revalidate is enabled, the TTL of their fresh markers.
+        SETTY_CACHE_TTL_JITTER randomly extends the TTL by up to that fraction so keys cached together do not all
+        expire at the same moment.
+        """
+        ttl = getattr(settings, 'SETTY_CACHE_TTL', 3600)
+        jitter = getattr(settings, 'SETTY_CACHE_TTL_JITTER', 0)
+        if jitter:
+            ttl = int(ttl * (1 + random.uniform(0, jitter)))
+
+        stale_ttl = getattr(settings, 'SETTY_CACHE_STALE_TTL', 0)
+        if stale_ttl:
+            return ttl + stale_ttl, ttl
+        return ttl, None
+
+    @staticmethod
+    def _fresh_markers(encoded_values: Dict[str, bytes]) -> Dict[str, bool]:
+        return {cache_key + FRESH_SUFFIX: True for cache_key in encoded_values}
+
+    def _encode_for_cache(self, values: Mapping[str, Any]) -> Dict[str, bytes]:
+        codec = get_codec()
+        return {self._make_cache_key(name): codec.encode(value) for name, value in values.items()}
+
+    @staticmethod
+    def _decode_cached_values(cache_keys: Dict[str, str], cached: Dict[str, Any]) -> Dict[str, Any]:
+        codec = get_codec()
+        return {
+            cache_keys[key]: _not_found_value() if value == NOT_FOUND_MARKER else codec.decode(value)
+            for key, value in cached.items()
+        }
+
+    def _not_found_cache_values(self, names: Iterable[str]) -> Dict[str, str]:
+        return {self._make_cache_key(name): NOT_FOUND_MARKER for name in names}
+
+    @staticmethod
+    def _not_found_cache_ttl() -> int:
+        return getattr(settings, 'SETTY_NOT_FOUND_CACHE_TTL', 60)
+
+    def _derived_cache_keys(self) -> List[str]:
+        keys = [self._make_cache_key(SNAPSHOT_KEY), self._make_index_cache_key(None)]
+        keys.extend(self._make_index_cache_key(app_name) for app_name in settings.INSTALLED_APPS)
+        keys.extend(self._make_app_values_cache_key(app_name) for app_name in settings.INSTALLED_APPS)
+        return keys
+
+    @staticmethod
+    def _is_cacheable_app(app_name: Optional[str]) -> bool:
+        # Only the index of installed apps is cached, as these are the only keys discarded when settings change
+        return not app_name or app_name in settings.INSTALLED_APPS
+
+    def _make_index_cache_key(self, app_name: Optional[str]) -> str:
+        if app_name:
+            return self._make_cache_key(f'{APP_INDEX_KEY}:{app_name}')
+        return self._make_cache_key(INDEX_KEY)
+
+    def _make_app_values_cache_key(self, app_name: str) -> str:
+        return self._make_cache_key(f'{APP_VALUES_KEY}:{app_name}')
+
+    def _make_scope_cache_key(self, scope: str) -> str:
+        return self._make_cache_key(f'{SCOPE_KEY}:{scope}')
 
     @staticmethod
     def _make_cache_key(name: str) -> str:
         return ':'.join([getattr(settings, 'SETTY_CACHE_PREFIX', '_dyn_settings_'), name])
+
+
+class TwoTierCacheBackend(CacheBackend):
+    """
+    TwoTierCacheBackend keeps a per-process copy of the settings in front of the shared Django cache.
+
+    The local copy is discarded when the shared settings version changes. The version is checked at most once every
+    SETTY_LOCAL_CACHE_TTL seconds and, if SETTY_LOCAL_CACHE_CHECK_PER_REQUEST is enabled, once at the start of each
+    request.
+
+    If SETTY_INVALIDATION_TRANSPORT is configured, changed settings are also evicted from the local copy as soon as
+    their names are received from the transport.
+
+    List and dict values read with get(), get_many() or get_overrides(), or with get_value() of the snapshot, are
+    copies, so they can be modified by the caller. Other results derived from all settings, such as get_all(), get_values_for_app() and
+    get_all_by_app(), are shared by every caller in the process and must not be modified.
+    """
+
+    def __init__(self):
+        self._local_values = {}
+        # Values derived from all settings, such as the snapshot, keyed by their shared cache key
+        self._local_derived = {}
+        # Resolved overrides keyed by their scopes. The number of scopes may be unbounded, e.g. one per tenant.
+        self._local_scopes = LRUCache(getattr(settings, 'SETTY_SCOPE_CACHE_SIZE', 1000))
+        self._local_version = None
+        self._version_check_due_at = None
+
+        if getattr(settings, 'SETTY_LOCAL_CACHE_CHECK_PER_REQUEST', False):
+            request_started.connect(self._expire_version_check)
+
+        transport = get_transport()
+        if transport is not None:
+            transport.subscribe(self._evict_local)
+
+    def get(self, name: str) -> Any:
+        self._check_version()
+        # Keep a reference to the current dict so a concurrent invalidation is never written back into
+        local_values = self._local_values
+        try:
+            value = local_values[name]
+        except KeyError:
+            self._increment('local_miss', name)
+            value = local_values[name] = super().get(name)
+            return copy_mutable(value)
+
+        self._increment('local_hit', name)
+        return copy_mutable(value)
+
+    def make_reader(self, name: str) -> Callable[[], Any]:
+        read_from_cache = super().make_reader(name)
+
+        def read() -> Any:
+            self._check_version()
+            local_values = self._local_values
+            try:
+                value = local_values[name]
+            except KeyError:
+                self._increment('local_miss', name)
+                value = local_values[name] = read_from_cache()
+                return copy_mutable(value)
+
+            self._increment('local_hit', name)
+            return copy_mutable(value)
+
+        return read
+
+    def get_snapshot(self) -> SettingsSnapshot:
+        return self._get_local_derived(SNAPSHOT_KEY, super().get_snapshot)
+
+    def get_all(self, app_name: Optional[str] = None) -> Iterable:
+        if not self._is_cacheable_app(app_name):
+            return super().get_all(app_name)
+        return self._get_local_derived(self._make_index_cache_key(app_name), partial(super().get_all, app_name))
+
+    def get_values_for_app(self, app_name: str) -> Dict[str, Any]:
+        if app_name not in settings.INSTALLED_APPS:
+            return super().get_values_for_app(app_name)
+        return self._get_local_derived(
+            self._make_app_values_cache_key(app_name), partial(super().get_values_for_app, app_name)
+        )
+
+    def get_all_by_app(self) -> Dict[str, Dict[str, Any]]:
+        return self._get_local_derived(BY_APP_KEY, super().get_all_by_app)
+
+    def get_overrides(self, scopes: Sequence[str]) -> Dict[str, Any]:
+        self._check_version()
+        scopes = tuple(scopes)
+        local_scopes = self._local_scopes
+        overrides = local_scopes.get(scopes)
+        if overrides is None:
+            overrides = super().get_overrides(scopes)
+            local_scopes.set(scopes, overrides)
+        return copy_mutable(overrides)
+
+    def get_compiled(self) -> CompiledSettings:
+        # The local copy is already discarded when the version changes, so the version is not read on every call
+        return self._get_local_derived(COMPILED_KEY, self._compile_all)
+
+    def get_rollout(self, name: str) -> Rollout:
+        return self._get_local_derived(f'{ROLLOUT_KEY}:{name}', partial(DatabaseBackend.get_rollout, self, name))
+
+    def bump_version(self) -> int:
+        version = super().bump_version()
+        self._clear_local()
+        return version
+
+    def preload(self, app_names: Optional[Iterable[str]] = None) -> int:
+        """
+        Load all settings, or the settings of the given apps, into both the shared cache and the local copy.
+        Returns the number of settings loaded.
+        """
+        values = self._preload_into_cache(app_names)
+        self._check_version()
+        self._local_values.update(values)
+        if app_names is None:
+            self._local_derived[SNAPSHOT_KEY] = SettingsSnapshot(values)
+        return len(values)
+
+    async def aget(self, name: str) -> Any:
+        await self._acheck_version()
+        local_values = self._local_values
+        try:
+            value = local_values[name]
+        except KeyError:
+            self._increment('local_miss', name)
+            value = local_values[name] = await super().aget(name)
+            return copy_mutable(value)
+
+        self._increment('local_hit', name)
+        return copy_mutable(value)
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, Any]:
+        self._check_version()
+        local_values = self._local_values
+        names = list(names)
+
+        missing = [name for name in names if name not in local_values]
+        self._increment_many(len(names) - len(missing), len(missing), 'local_hit', 'local_miss')
+        if missing:
+            local_values.update(super().get_many(missing))
+
+        return {name: copy_mutable(local_values[name]) for name in names}
+
+    async def aget_many(self, names: Iterable[str]) -> Dict[str, Any]:
+        await self._acheck_version()
+        local_values = self._local_values
+        names = list(names)
+
+        missing = [name for name in names if name not in local_values]
+        self._increment_many(len(names) - len(missing), len(missing), 'local_hit', 'local_miss')
+        if missing:
+            local_values.update(await super().aget_many(missing))
+
+        return {name: copy_mutable(local_values[name]) for name in names}
+
+    async def aget_snapshot(self) -> SettingsSnapshot:
+        await self._acheck_version()
+        local_derived = self._local_derived
+        try:
+            return local_derived[SNAPSHOT_KEY]
+        except KeyError:
+            snapshot = local_derived[SNAPSHOT_KEY] = await super().aget_snapshot()
+            return snapshot
+
+    async def abump_version(self) -> int:
+        version = await super().abump_version()
+        self._clear_local()
+        return version
+
+    def _get_local_derived(self, key: str, load: Callable[[], T]) -> T:
+        self._check_version()
+        local_derived = self._local_derived
+        try:
+            return local_derived[key]
+        except KeyError:
+            value = local_derived[key] = load()
+            return value
+
+    def _check_version(self) -> None:
+        now = time.monotonic()
+        if self._is_version_check_due(now):
+            self._apply_version(self.get_version(), now)
+
+    async def _acheck_version(self) -> None:
+        now = time.monotonic()
+        if self._is_version_check_due(now):
+            self._apply_version(await self.aget_version(), now)
+
+    def _is_version_check_due(self, now: float) -> bool:
+        check_due_at = self._version_check_due_at
+        return check_due_at is None or now >= check_due_at
+
+    def _apply_version(self, version: int, now: float) -> None:
+        if version != self._local_version:
+            self._local_values = {}
+            self._local_derived = {}
+            self._local_scopes = self._new_local_scopes()
+            self._local_version = version
+        # The TTL is read here rather than on every read, as looking up settings is comparatively slow
+        self._version_check_due_at = now + getattr(settings, 'SETTY_LOCAL_CACHE_TTL', 5)
+
+    def _clear_local(self) -> None:
+        self._local_values = {}
+        self._local_derived = {}
+        self._local_scopes = self._new_local_scopes()
+        self._local_version = None
+        self._version_check_due_at = None
+
+    def _evict_local(self, names: Optional[List[str]]) -> None:
+        if names is None:
+            self._clear_local()
+            return
+
+        # Replaced rather than modified, so a concurrent read of an evicted setting is never written back
+        evicted = set(names)
+        self._local_values = {name: value for name, value in self._local_values.items() if name not in evicted}
+        self._local_derived = {}
+        self._local_scopes = self._new_local_scopes()
+
+    def _new_local_scopes(self) -> LRUCache:
+        # Replaced rather than cleared, so a concurrent load is never written back into the new copy
+        return LRUCache(self._local_scopes.max_size)
+
+    def _expire_version_check(self, **kwargs) -> None:
+        self._version_check_due_at = None
+
+
+class MemoryBackend:
+    """
+    MemoryBackend keeps the settings in the memory of the process, without using the database or the cache.
+    Intended for tests and local development, where settings are created with add() or from the SETTY_MEMORY_SETTINGS
+    setting, a dict of setting names to values. Settings are lost when the backend is replaced.
+    """
+
+    def __init__(self, values: Optional[Mapping[str, Any]] = None):
+        self._settings: Dict[str, SettySettings] = {}
+        self._overrides: Dict[str, Dict[str, Any]] = {}
+        self._compiled = None
+
+        if values is None:
+            values = getattr(settings, 'SETTY_MEMORY_SETTINGS', {})
+        for name, value in values.items():
+            self.add(name, value)
+
+    def add(self, name: str, value: Any, type: Optional[str] = None, app_name: str = '') -> SettySettings:
+        """
+        Create or replace a setting. The type is inferred from the value if not given.
+        """
+        now = timezone.now()
+        self._settings[name] = SettySettings(
+            name=name,
+            app_name=app_name,
+            type=type or TypeChoices.infer(value),
+            value=value,
+            value_preview=make_value_preview(value),
+            created_time=now,
+            updated_time=now,
+        )
+        self._compiled = None
+        return self._settings[name]
+
+    def remove(self, name: str) -> None:
+        self._settings.pop(name, None)
+        for overrides in self._overrides.values():
+            overrides.pop(name, None)
+        self._compiled = None
+
+    def copy(self) -> 'MemoryBackend':
+        """
+        Return a new MemoryBackend holding the same settings and overrides
+        """
+        backend = MemoryBackend({})
+        for setting in self._settings.values():
+            backend.add(setting.name, setting.value, setting.type, setting.app_name)
+        backend._overrides = {scope: dict(overrides) for scope, overrides in self._overrides.items()}
+        return backend
+
+    def get_all(self, app_name: Optional[str] = None) -> List[SettySettings]:
+        all_settings = sorted(self._settings.values(), key=lambda setting: setting.name)
+        if app_name:
+            return [setting for setting in all_settings if setting.app_name == app_name]
+        return all_settings
+
+    def get_values_for_app(self, app_name: str) -> Dict[str, Any]:
+        return {setting.name: setting.value for setting in self.get_all() if setting.app_name == app_name}
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._settings[name].value
+        except KeyError:
+            return _not_found_value()
+
+    def make_reader(self, name: str) -> Callable[[], Any]:
+        return partial(self.get, name)
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, Any]:
+        return {name: self.get(name) for name in names}
+
+    def get_snapshot(self) -> SettingsSnapshot:
+        return SettingsSnapshot((name, setting.value) for name, setting in self._settings.items())
+
+    def get_compiled(self) -> CompiledSettings:
+        if self._compiled is None:
+            self._compiled = CompiledSettings(
+                (setting.name, setting.type, setting.value) for setting in self._settings.values()
+            )
+        return self._compiled
+
+    def get_rollout(self, name: str) -> Rollout:
+        rollout = self.get_compiled().get_value(name)
+        if isinstance(rollout, Rollout):
+            return rollout
+        return Rollout(name)
+
+    def get_all_by_app(self) -> Dict[str, Dict[str, Any]]:
+        settings_by_app = {}
+        for setting in self._settings.values():
+            settings_by_app.setdefault(setting.app_name, {})[setting.name] = setting.value
+        return settings_by_app
+
+    def preload(self, app_names: Optional[Iterable[str]] = None) -> int:
+        if app_names is None:
+            return len(self._settings)
+        app_names = set(app_names)
+        return sum(setting.app_name in app_names for setting in self._settings.values())
+
+    def set(self, name: str, value: T) -> T:
+        self.set_many({name: value})
+        return value
+
+    def set_many(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        missing = set(values).difference(self._settings)
+        if missing:
+            raise _do_not_exist_error(sorted(missing))
+
+        now = timezone.now()
+        for name, value in values.items():
+            setting = self._settings[name]
+            setting.value = value
+            setting.value_preview = make_value_preview(value)
+            setting.updated_time = now
+        self._compiled = None
+        return values
+
+    def get_overrides(self, scopes: Sequence[str]) -> Dict[str, Any]:
+        return resolve_overrides(scopes, self._overrides)
+
+    def set_override(self, name: str, scope: str, value: T) -> T:
+        if name not in self._settings:
+            raise _does_not_exist_error(name)
+        self._overrides.setdefault(scope, {})[name] = value
+        return value
+
+    def delete_override(self, name: str, scope: str) -> bool:
+        overrides = self._overrides.get(scope, {})
+        if name not in overrides:
+            return False
+        del overrides[name]
+        return True
+
+    async def aget_all(self, app_name: Optional[str] = None) -> List[SettySettings]:
+        return self.get_all(app_name)
+
+    async def aget(self, name: str) -> Any:
+        return self.get(name)
+
+    async def aget_many(self, names: Iterable[str]) -> Dict[str, Any]:
+        return self.get_many(names)
+
+    async def aget_snapshot(self) -> SettingsSnapshot:
+        return self.get_snapshot()
+
+    async def aset(self, name: str, value: T) -> T:
+        return self.set(name, value)
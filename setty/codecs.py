@@ -0,0 +1,82 @@
+import json
+import pickle
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .exceptions import InvalidConfigurationError
+
+
+class JSONCodec:
+    """
+    Encodes values as compact UTF-8 JSON, which is readable by non-Python services
+    """
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """
+    Encodes values using msgpack, which produces smaller payloads than JSON. Requires the msgpack package.
+    """
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise InvalidConfigurationError(
+                'The msgpack package needs to be installed to use the msgpack codec.'
+            ) from e
+
+        self._msgpack = msgpack
+
+    def encode(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+class PickleCodec:
+    """
+    Encodes values using pickle. This supports any Python object, but is slower, larger
+    and unsafe to decode if the database or cache is shared with untrusted services.
+    """
+
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+CODECS = {
+    'json': JSONCodec,
+    'msgpack': MsgpackCodec,
+    'pickle': PickleCodec,
+}
+
+
+@lru_cache(maxsize=None)
+def _load_codec(codec: str):
+    if codec in CODECS:
+        return CODECS[codec]()
+
+    try:
+        return import_string(codec)()
+    except ImportError as e:
+        raise InvalidConfigurationError(f'The SETTY_VALUE_CODEC setting {codec!r} is not a valid codec.') from e
+
+
+def get_codec():
+    """
+    Return the codec configured by the SETTY_VALUE_CODEC setting. This is either one of the built-in codec names
+    ('json', 'msgpack' or 'pickle') or the import path of a class providing encode and decode methods.
+    """
+    return _load_codec(getattr(settings, 'SETTY_VALUE_CODEC', 'json'))
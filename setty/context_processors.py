@@ -1,3 +1,6 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
 import setty
 
 
@@ -7,8 +10,16 @@ def setty_settings(request):
 
     Add 'setty.context_processors.setty_settings' to the
     TEMPLATE_CONTEXT_PROCESSORS setting to ensure this can be used.
+
+    The settings of every app are loaded lazily using a single grouped fetch,
+    the first time a template uses one of the setty_<app> variables.
     """
-    tags = {f'setty_{app}': setty.config.get_for_app(app) for app in settings.INSTALLED_APPS}
+    settings_by_app = SimpleLazyObject(setty.config.get_all_by_app)
+
+    tags = {
+        f'setty_{app}': SimpleLazyObject(lambda app=app: settings_by_app.get(app, {}))
+        for app in settings.INSTALLED_APPS
+    }
     tags['setty'] = setty.config
 
     return tags
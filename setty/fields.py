@@ -0,0 +1,27 @@
+from typing import Any
+
+from django.db import models
+
+from .codecs import get_codec
+
+
+class EncodedValueField(models.BinaryField):
+    """
+    Stores a setting value encoded with the codec configured by the SETTY_VALUE_CODEC setting
+    """
+
+    def from_db_value(self, value, expression, connection) -> Any:
+        if value is None:
+            return value
+        # Some database drivers return a memoryview for binary columns
+        return get_codec().decode(bytes(value))
+
+    def get_prep_value(self, value: Any) -> bytes:
+        return get_codec().encode(value)
+
+    def to_python(self, value: Any) -> Any:
+        return value
+
+    def value_to_string(self, obj) -> Any:
+        # Serialize the decoded value so fixtures remain readable
+        return self.value_from_object(obj)
@@ -0,0 +1,54 @@
+from typing import Any
+
+from .pinning import aget_pinned_snapshot, get_pinned_snapshot
+from .wrapper import get_backend
+
+
+class SettingHandle:
+    """
+    Accessor bound to a single setting, for reading it repeatedly with as little overhead as possible, e.g.
+
+        FEATURE_X = config.handle('feature_x')
+        ...
+        if FEATURE_X:
+            ...
+
+    Per-setting work such as building the cache key is done once per backend, and reads go straight to the backend
+    without the dispatch of config.<name>. The handle sees changes in the same way as config.<name>, including pinned
+    settings, and follows the backend if it is replaced.
+    """
+
+    __slots__ = ('name', '_backend', '_read')
+
+    def __init__(self, name: str):
+        self.name = name
+        self._backend = None
+        self._read = None
+
+    @property
+    def value(self) -> Any:
+        backend = get_backend()
+        if backend is not self._backend:
+            self._read = backend.make_reader(self.name)
+            self._backend = backend
+
+        snapshot = get_pinned_snapshot(backend)
+        if snapshot is not None:
+            return snapshot.get_value(self.name)
+        return self._read()
+
+    def __call__(self) -> Any:
+        return self.value
+
+    def __bool__(self) -> bool:
+        return bool(self.value)
+
+    def __repr__(self) -> str:
+        return '<SettingHandle: {}>'.format(self.name)
+
+    async def aget(self) -> Any:
+        backend = get_backend()
+        snapshot = await aget_pinned_snapshot(backend)
+        if snapshot is not None:
+            return snapshot.get_value(self.name)
+        return await backend.aget(self.name)
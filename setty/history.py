@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from django.db.models import Max
+
+from .models import SettyHistory
+from .snapshot import SettingsSnapshot
+
+
+def get_generation() -> int:
+    """
+    Return the generation of the latest change to any setting, or 0 if no changes have been recorded.
+    The generation only increases, so it can be used as a version for data derived from the settings.
+    """
+    return SettyHistory.objects.aggregate(generation=Max('id'))['generation'] or 0
+
+
+def _latest_changes(generation: int):
+    # Generation of the latest change of each setting up to the given generation
+    return (
+        SettyHistory.objects.filter(id__lte=generation)
+        .values('setting_name')
+        .annotate(generation=Max('id'))
+        .values('generation')
+    )
+
+
+def get_snapshot_at(generation: int) -> SettingsSnapshot:
+    """
+    Load the values of all settings as they were at the given generation using a single query
+    """
+    latest_changes = SettyHistory.objects.filter(id__in=_latest_changes(generation), deleted=False)
+    return SettingsSnapshot(latest_changes.values_list('setting_name', 'value'))
+
+
+def prune_history(before: datetime) -> int:
+    """
+    Delete the changes made before the given time which have since been replaced by a later change made before that
+    time. The latest change of each setting is kept, so snapshots from the last pruned generation onwards are complete.
+    Returns the number of changes deleted.
+    """
+    cutoff = SettyHistory.objects.filter(changed_time__lt=before).aggregate(generation=Max('id'))['generation']
+    if cutoff is None:
+        return 0
+
+    deleted_count, _ = SettyHistory.objects.filter(id__lte=cutoff).exclude(id__in=_latest_changes(cutoff)).delete()
+    return deleted_count
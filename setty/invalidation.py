@@ -0,0 +1,246 @@
+import inspect
+import json
+import logging
+import os
+import select
+import threading
+import time
+import weakref
+from typing import Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils.module_loading import import_string
+
+from .exceptions import InvalidConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more. Larger messages invalidate all settings instead.
+MAX_PAYLOAD_SIZE = 7900
+
+
+def encode_message(names: Optional[Iterable[str]]) -> str:
+    """
+    Encode the names of changed settings as JSON. None means that all settings have changed.
+    """
+    payload = json.dumps(None if names is None else list(names))
+    if len(payload) > MAX_PAYLOAD_SIZE:
+        return json.dumps(None)
+    return payload
+
+
+def decode_message(payload) -> Optional[List[str]]:
+    try:
+        return json.loads(payload)
+    except (TypeError, ValueError):
+        logger.warning('Ignoring invalid setty invalidation message: %r', payload)
+        return []
+
+
+class BaseTransport:
+    """
+    Base class for transports publishing the names of changed settings to every process.
+
+    Subclasses implement publish() and listen(). listen() is called once per process, when the first
+    callback subscribes, and must pass every received message to _dispatch() without blocking the caller.
+    """
+
+    def __init__(self):
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def publish(self, names: Optional[Iterable[str]]) -> None:
+        raise NotImplementedError
+
+    def listen(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def subscribe(self, callback: Callable[[Optional[List[str]]], None]) -> None:
+        """
+        Call the callback with the names of the changed settings, or None if all settings changed, for every message.
+        Bound methods are only referenced weakly, so subscribing does not keep their instance alive.
+        """
+        ref = weakref.WeakMethod(callback) if inspect.ismethod(callback) else lambda: callback
+        with self._lock:
+            self._callbacks.append(ref)
+            if not self._listening:
+                self._listening = True
+                self.listen()
+
+    def _dispatch(self, names: Optional[List[str]]) -> None:
+        for ref in list(self._callbacks):
+            callback = ref()
+            if callback is None:
+                with self._lock:
+                    if ref in self._callbacks:
+                        self._callbacks.remove(ref)
+                continue
+
+            try:
+                callback(names)
+            except Exception:
+                logger.exception('Error handling setty invalidation message')
+
+    def _restart_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._listening = False
+        if self._callbacks:
+            self._listening = True
+            self.listen()
+
+
+class InMemoryTransport(BaseTransport):
+    """
+    Delivers messages synchronously to subscribers in the same process. Intended for tests and local development.
+    """
+
+    def publish(self, names: Optional[Iterable[str]]) -> None:
+        self._dispatch(decode_message(encode_message(names)))
+
+    def listen(self) -> None:
+        pass
+
+
+class RedisTransport(BaseTransport):
+    """
+    Publishes messages on a Redis channel. Requires the redis package.
+    """
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', channel: str = 'setty:invalidate'):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise InvalidConfigurationError('The redis package needs to be installed to use the RedisTransport.') from e
+
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._thread = None
+
+    def publish(self, names: Optional[Iterable[str]]) -> None:
+        self._client.publish(self.channel, encode_message(names))
+
+    def listen(self) -> None:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: lambda message: self._dispatch(decode_message(message['data']))})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+
+
+class PostgresTransport(BaseTransport):
+    """
+    Publishes messages using PostgreSQL LISTEN/NOTIFY. Messages are sent using the Django database connection, so they
+    are only delivered once the transaction changing the settings commits.
+    """
+
+    def __init__(self, channel: str = 'setty_invalidate', using: str = 'default', reconnect_delay: float = 5):
+        super().__init__()
+        if connections[using].vendor != 'postgresql':
+            raise InvalidConfigurationError('The PostgresTransport requires a PostgreSQL database.')
+
+        self.channel = channel
+        self.using = using
+        self.reconnect_delay = reconnect_delay
+        self._stopped = threading.Event()
+
+    def publish(self, names: Optional[Iterable[str]]) -> None:
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, encode_message(names)])
+
+    def listen(self) -> None:
+        threading.Thread(target=self._listen_forever, name='setty-invalidation', daemon=True).start()
+
+    def close(self) -> None:
+        self._stopped.set()
+
+    def _listen_forever(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception('Error listening for setty invalidation messages, reconnecting')
+                time.sleep(self.reconnect_delay)
+
+    def _listen(self) -> None:
+        database = connections[self.using]
+        connection = database.get_new_connection(database.get_connection_params())
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {database.ops.quote_name(self.channel)}')
+
+            # The settings may have changed while no connection was listening
+            self._dispatch(None)
+
+            while not self._stopped.is_set():
+                if hasattr(connection, 'poll'):  # psycopg2
+                    if select.select([connection], [], [], 1) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self._dispatch(decode_message(connection.notifies.pop(0).payload))
+                else:  # psycopg 3
+                    for notify in connection.notifies(timeout=1):
+                        self._dispatch(decode_message(notify.payload))
+        finally:
+            connection.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Optional[BaseTransport]:
+    """
+    Return the transport configured by the SETTY_INVALIDATION_TRANSPORT setting, or None if none is configured.
+    The transport is created once per process using the keyword arguments in SETTY_INVALIDATION_OPTIONS.
+    """
+    global _transport
+
+    transport_path = getattr(settings, 'SETTY_INVALIDATION_TRANSPORT', None)
+    if transport_path is None:
+        return None
+
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = import_string(transport_path)(**getattr(settings, 'SETTY_INVALIDATION_OPTIONS', {}))
+    return _transport
+
+
+def publish_invalidation(names: Optional[Iterable[str]]) -> None:
+    """
+    Publish the names of changed settings, or None if all settings changed, if a transport is configured
+    """
+    transport = get_transport()
+    if transport is not None:
+        transport.publish(names)
+
+
+def _restart_transport_after_fork() -> None:
+    # Listener threads do not survive a fork, e.g. when the app is preloaded by gunicorn
+    if _transport is not None:
+        _transport._restart_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_transport_after_fork)
+
+
+@receiver(setting_changed)
+def _reset_transport(setting, **kwargs):
+    global _transport
+
+    if setting in ('SETTY_INVALIDATION_TRANSPORT', 'SETTY_INVALIDATION_OPTIONS') and _transport is not None:
+        _transport.close()
+        _transport = None
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from setty.exceptions import InvalidConfigurationError
+from setty.models import SettySettings
+from setty.transfer import FIELDS, FORMATS, dump_settings, guess_format
+
+
+class Command(BaseCommand):
+    help = 'Export settings as JSON Lines or YAML, streaming them from the database in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-o', '--output', help='File to write the settings to. Defaults to stdout.')
+        parser.add_argument(
+            '--format', choices=FORMATS, help='Defaults to yaml for .yaml and .yml output files and jsonl otherwise.'
+        )
+        parser.add_argument(
+            '--app', dest='app_names', action='append', help='Only export the settings of this app. Can be repeated.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=500, help='Number of settings loaded per query.')
+
+    def handle(self, *args, output=None, format=None, app_names=None, chunk_size=500, **options):
+        format = format or guess_format(output or '')
+
+        queryset = SettySettings.objects.order_by('name')
+        if app_names:
+            queryset = queryset.filter(app_name__in=app_names)
+        records = queryset.values(*FIELDS).iterator(chunk_size=chunk_size)
+
+        # Write the settings as they are, as with dumpdata
+        self.stdout.ending = None
+        try:
+            stream = open(output, 'w', encoding='utf-8') if output else self.stdout
+        except OSError as e:
+            raise CommandError('Could not write the settings to {}: {}'.format(output, e))
+        try:
+            count = dump_settings(records, stream, format)
+        except InvalidConfigurationError as e:
+            raise CommandError(e)
+        finally:
+            if output:
+                stream.close()
+
+        if options.get('verbosity', 1) > 0:
+            self.stderr.write('Exported {} settings.'.format(count))
@@ -0,0 +1,152 @@
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from setty.backend import CacheBackend
+from setty.exceptions import InvalidConfigurationError
+from setty.models import SettyHistory, SettySettings, TypeChoices, make_value_preview
+from setty.transfer import FORMATS, guess_format, load_settings
+from setty.wrapper import get_backend
+
+TYPES = {choice for choice, _ in TypeChoices.ALL_CHOICES}
+UPDATE_FIELDS = ['app_name', 'type', 'value', 'value_preview', 'updated_time']
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _validate(position, record):
+    if not isinstance(record, dict) or not isinstance(record.get('name'), str) or 'value' not in record:
+        raise CommandError('Setting {} must have a name and a value.'.format(position))
+    if record.get('type') not in TYPES:
+        raise CommandError('Setting {} has an invalid type: {!r}.'.format(position, record.get('type')))
+    try:
+        TypeChoices.validate(record['name'], record['type'], record['value'])
+    except ValueError as e:
+        raise CommandError('Setting {} has an invalid value: {}'.format(position, e))
+
+
+def _describe_changes(setting, record):
+    """
+    Return a description of each field of a setting changed by a record, e.g. "value 1 -> 2"
+    """
+    changes = []
+    for field, old, new in (
+        ('app_name', setting.app_name, record.get('app_name', '')),
+        ('type', setting.type, record['type']),
+        ('value', setting.value, record['value']),
+    ):
+        # Compare the type of the value as well, as e.g. True == 1
+        if (old, type(old)) != (new, type(new)):
+            changes.append('{} {!r} -> {!r}'.format(field, old, new))
+    return changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Import settings from JSON Lines or YAML, as written by setty_export. New settings are created and changed '
+        'settings are updated in bulk, in chunks, inside a single transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='File to read the settings from, or - to read from stdin.')
+        parser.add_argument(
+            '--format', choices=FORMATS, help='Defaults to yaml for .yaml and .yml input files and jsonl otherwise.'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Show the changes without saving them.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Number of settings saved per query.')
+
+    def handle(self, *args, input, format=None, dry_run=False, chunk_size=500, **options):
+        self.verbosity = options.get('verbosity', 1)
+        format = format or guess_format(input)
+
+        try:
+            stream = sys.stdin if input == '-' else open(input, encoding='utf-8')
+        except OSError as e:
+            raise CommandError('Could not read the settings from {}: {}'.format(input, e))
+        try:
+            with transaction.atomic():
+                created, updated, unchanged = self._import(load_settings(stream, format), chunk_size, dry_run)
+        except (InvalidConfigurationError, ValueError) as e:
+            raise CommandError(e)
+        finally:
+            if input != '-':
+                stream.close()
+
+        changed_names = created + updated
+        if changed_names and not dry_run:
+            # Only the names are kept, so the values are left to be reloaded when they are next read
+            backend = get_backend()
+            if isinstance(backend, CacheBackend):
+                backend.delete_from_cache(changed_names)
+                backend.notify_changed(changed_names)
+
+        if self.verbosity > 0:
+            self.stdout.write(
+                '{} {} new, {} changed and {} unchanged settings.'.format(
+                    'Would import' if dry_run else 'Imported', len(created), len(updated), unchanged
+                )
+            )
+
+    def _import(self, records, chunk_size, dry_run):
+        created = []
+        updated = []
+        unchanged = 0
+        seen = set()
+
+        for chunk in _chunks(records, chunk_size):
+            for position, record in chunk:
+                _validate(position, record)
+                if record['name'] in seen:
+                    raise CommandError('Setting {} is a duplicate of {}.'.format(position, record['name']))
+                seen.add(record['name'])
+
+            existing = SettySettings.objects.in_bulk([record['name'] for _, record in chunk])
+            now = timezone.now()
+            settings_to_create = []
+            settings_to_update = []
+
+            for _, record in chunk:
+                name = record['name']
+                setting = existing.get(name)
+                if setting is None:
+                    setting = SettySettings(name=name)
+                    settings_to_create.append(setting)
+                    created.append(name)
+                    self._log_change('+', name, ['value {!r}'.format(record['value'])], dry_run)
+                else:
+                    changes = _describe_changes(setting, record)
+                    if not changes:
+                        unchanged += 1
+                        continue
+                    settings_to_update.append(setting)
+                    updated.append(name)
+                    self._log_change('~', name, changes, dry_run)
+
+                setting.app_name = record.get('app_name', '')
+                setting.type = record['type']
+                setting.value = record['value']
+                setting.value_preview = make_value_preview(setting.value)
+                setting.updated_time = now
+
+            if not dry_run:
+                SettySettings.objects.bulk_create(settings_to_create)
+                SettySettings.objects.bulk_update(settings_to_update, UPDATE_FIELDS)
+                SettyHistory.record(
+                    {setting.name: setting.value for setting in settings_to_create + settings_to_update}
+                )
+
+        return created, updated, unchanged
+
+    def _log_change(self, marker, name, changes, dry_run):
+        if dry_run or self.verbosity > 1:
+            self.stdout.write('{} {}: {}'.format(marker, name, ', '.join(changes)))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from setty.history import prune_history
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete changes from the settings history which are older than the retention period and have been replaced. '
+        'The latest change of each setting is always kept.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Number of days of history to keep. Defaults to the SETTY_HISTORY_RETENTION_DAYS setting, or 90.',
+        )
+
+    def handle(self, *args, days=None, **options):
+        if days is None:
+            days = getattr(settings, 'SETTY_HISTORY_RETENTION_DAYS', 90)
+
+        deleted_count = prune_history(timezone.now() - timedelta(days=days))
+
+        if options.get('verbosity', 1) > 0:
+            self.stdout.write('Deleted {} changes from the settings history.'.format(deleted_count))
@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils.module_loading import import_string
+
+from .exceptions import InvalidConfigurationError
+
+try:
+    from asgiref.local import Local
+except ImportError:  # Django < 3.0 does not depend on asgiref
+    from threading import local as Local
+
+# Upper bounds, in seconds, of the buckets of the timing histograms recorded by InMemoryMetrics
+HISTOGRAM_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, float('inf'))
+
+_state = Local()
+
+# Number of collect_metrics() blocks active in any thread or task. Metrics skip the comparatively slow context-local
+# lookup while no block is active anywhere.
+_active_collectors = 0
+_active_collectors_lock = threading.Lock()
+
+
+class NullMetrics:
+    """
+    Metrics which record nothing. Used unless SETTY_METRICS is configured.
+
+    Metrics are recorded per backend for the following events, and per setting name as well if per_key is enabled:
+
+    * get, get_many, set, set_many - timed for every read and write made via config
+    * local_hit, local_miss - reads served from, or missing from, the local copy of the TwoTierCacheBackend
+    * cache_hit, cache_miss - reads served from, or missing from, the shared cache
+    * db_fallback - reads retrieved from the database after a cache miss
+    * refreshed, collapsed - stale values refreshed, or served while another process refreshes them
+    """
+
+    # Checked by callers before doing any work to record a metric
+    enabled = False
+
+    def __init__(self, per_key: bool = False):
+        self.per_key = per_key
+
+    def increment(self, event: str, backend: str, key: Optional[str] = None, count: int = 1) -> None:
+        pass
+
+    def timing(self, event: str, backend: str, duration: float, key: Optional[str] = None) -> None:
+        pass
+
+
+class InMemoryMetrics(NullMetrics):
+    """
+    Metrics kept in the memory of the process, e.g. for tests, the debug toolbar panel or a custom stats endpoint
+    """
+
+    enabled = True
+
+    def __init__(self, per_key: bool = False):
+        super().__init__(per_key)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def increment(self, event: str, backend: str, key: Optional[str] = None, count: int = 1) -> None:
+        with self._lock:
+            self.counters[(event, backend, key if self.per_key else None)] += count
+
+        collector = self._get_collector()
+        if collector is not None:
+            collector.increment(event, backend, key, count)
+
+    def timing(self, event: str, backend: str, duration: float, key: Optional[str] = None) -> None:
+        timing_key = (event, backend, key if self.per_key else None)
+        with self._lock:
+            timing = self.timings.get(timing_key)
+            if timing is None:
+                timing = self.timings[timing_key] = {'count': 0, 'total': 0.0, 'max': 0.0, 'buckets': Counter()}
+            timing['count'] += 1
+            timing['total'] += duration
+            timing['max'] = max(timing['max'], duration)
+            timing['buckets'][next(bound for bound in HISTOGRAM_BUCKETS if duration <= bound)] += 1
+
+        collector = self._get_collector()
+        if collector is not None:
+            collector.timing(event, backend, duration, key)
+
+    def _get_collector(self) -> Optional['InMemoryMetrics']:
+        if not _active_collectors:
+            return None
+        collector = getattr(_state, 'collector', None)
+        # The collector is an InMemoryMetrics as well, so it does not pass the metrics on to itself
+        if collector is self:
+            return None
+        return collector
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters: Counter = Counter()
+            self.timings: Dict[Tuple[str, str, Optional[str]], Dict] = {}
+
+    def get_count(self, event: str, backend: Optional[str] = None, key: Optional[str] = None) -> int:
+        """
+        Return the count of an event, summed over all backends and keys unless they are given
+        """
+        return sum(
+            count
+            for (counter_event, counter_backend, counter_key), count in list(self.counters.items())
+            if counter_event == event and backend in (None, counter_backend) and key in (None, counter_key)
+        )
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the count and total time of each event, summed over all backends and keys
+        """
+        summary = {}
+        for (event, _, _), count in list(self.counters.items()):
+            summary.setdefault(event, {'count': 0, 'time': 0.0})['count'] += count
+        for (event, _, _), timing in list(self.timings.items()):
+            event_summary = summary.setdefault(event, {'count': 0, 'time': 0.0})
+            event_summary['count'] += timing['count']
+            event_summary['time'] += timing['total']
+        return summary
+
+    def get_total_time(self, event: Optional[str] = None) -> float:
+        """
+        Return the total time recorded for an event, or for all events if none is given
+        """
+        return sum(
+            timing['total']
+            for (timing_event, _, _), timing in list(self.timings.items())
+            if event in (None, timing_event)
+        )
+
+
+class StatsdMetrics(NullMetrics):
+    """
+    Metrics exported to StatsD as setty.<backend>.<event> or, if per_key is enabled, setty.<backend>.<event>.<key>.
+    Requires the statsd package.
+    """
+
+    enabled = True
+
+    def __init__(self, host: str = 'localhost', port: int = 8125, prefix: str = 'setty', per_key: bool = False):
+        super().__init__(per_key)
+        try:
+            from statsd import StatsClient
+        except ImportError:
+            raise InvalidConfigurationError('The statsd package must be installed to use StatsdMetrics.')
+
+        self.client = StatsClient(host, port, prefix=prefix)
+
+    def increment(self, event: str, backend: str, key: Optional[str] = None, count: int = 1) -> None:
+        self.client.incr(self._make_stat(event, backend, key), count)
+
+    def timing(self, event: str, backend: str, duration: float, key: Optional[str] = None) -> None:
+        self.client.timing(self._make_stat(event, backend, key), duration * 1000)
+
+    def _make_stat(self, event: str, backend: str, key: Optional[str]) -> str:
+        if self.per_key and key is not None:
+            return f'{backend}.{event}.{key}'
+        return f'{backend}.{event}'
+
+
+@contextmanager
+def collect_metrics():
+    """
+    Collect the metrics recorded by the current thread or task during the block, e.g. a single request, into a new
+    InMemoryMetrics, which is returned by the block. Metrics recorded by other threads or tasks are not collected.
+    Only metrics recorded by InMemoryMetrics configured as SETTY_METRICS are collected.
+    """
+    global _active_collectors
+
+    previous = getattr(_state, 'collector', None)
+    collector = _state.collector = InMemoryMetrics(get_metrics().per_key)
+    with _active_collectors_lock:
+        _active_collectors += 1
+    try:
+        yield collector
+    finally:
+        _state.collector = previous
+        with _active_collectors_lock:
+            _active_collectors -= 1
+
+
+@contextmanager
+def timed(metrics: NullMetrics, event: str, backend: object, key: Optional[str] = None):
+    """
+    Record the time taken by the block against the given backend, if metrics are enabled
+    """
+    if not metrics.enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timing(event, type(backend).__name__, time.perf_counter() - start, key)
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> NullMetrics:
+    """
+    Return the metrics configured by the SETTY_METRICS setting, or NullMetrics if none are configured.
+    The metrics are created once per process using the keyword arguments in SETTY_METRICS_OPTIONS.
+    """
+    global _metrics
+
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                metrics_path = getattr(settings, 'SETTY_METRICS', None)
+                metrics_class = NullMetrics if metrics_path is None else import_string(metrics_path)
+                _metrics = metrics_class(**getattr(settings, 'SETTY_METRICS_OPTIONS', {}))
+    return _metrics
+
+
+@receiver(setting_changed)
+def _reset_metrics(setting, **kwargs):
+    global _metrics
+
+    if setting in ('SETTY_METRICS', 'SETTY_METRICS_OPTIONS'):
+        _metrics = None
@@ -0,0 +1,41 @@
+from .pinning import pinned_settings
+
+try:
+    from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+except ImportError:  # asgiref < 3.6
+    import asyncio
+
+    iscoroutinefunction = asyncio.iscoroutinefunction
+
+    def markcoroutinefunction(func):
+        func._is_coroutine = asyncio.coroutines._is_coroutine
+        return func
+
+
+class PinnedSettingsMiddleware:
+    """
+    Pins a consistent view of the setty settings for the lifetime of each request.
+
+    Add 'setty.middleware.PinnedSettingsMiddleware' to the MIDDLEWARE setting to ensure this is used.
+    The middleware supports both sync and async requests, so it does not add a thread hop to async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._is_async = iscoroutinefunction(get_response)
+        if self._is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._is_async:
+            return self.__acall__(request)
+
+        with pinned_settings():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with pinned_settings():
+            return await self.get_response(request)
@@ -0,0 +1,72 @@
+import picklefield.fields
+from django.db import migrations
+
+import setty.fields
+
+# Values are re-encoded using their type column, so legacy pickled values such as tuples are
+# stored using the types the codecs support.
+TYPE_COERCIONS = {
+    'bool': bool,
+    'dict': dict,
+    'float': float,
+    'integer': int,
+    'list': list,
+    'string': str,
+}
+
+
+def encode_values(apps, schema_editor):
+    SettySettings = apps.get_model('setty', 'SettySettings')
+    for setting in SettySettings.objects.all().iterator():
+        coerce = TYPE_COERCIONS.get(setting.type)
+        try:
+            setting.encoded_value = coerce(setting.value) if coerce else setting.value
+            setting.save(update_fields=['encoded_value'])
+        except (TypeError, ValueError, OverflowError) as e:
+            raise ValueError(
+                f'The {setting.type} value {setting.value!r} of setty setting {setting.name} cannot be stored with '
+                f'the configured SETTY_VALUE_CODEC: {e}. Change the value, or set SETTY_VALUE_CODEC to \'pickle\', '
+                f'before migrating.'
+            ) from e
+
+
+def decode_values(apps, schema_editor):
+    SettySettings = apps.get_model('setty', 'SettySettings')
+    for setting in SettySettings.objects.all().iterator():
+        setting.value = setting.encoded_value
+        setting.save(update_fields=['value'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setty', '0002_settysettings_app_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settysettings',
+            name='encoded_value',
+            field=setty.fields.EncodedValueField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='settysettings',
+            name='value',
+            field=picklefield.fields.PickledObjectField(editable=False, null=True),
+        ),
+        migrations.RunPython(encode_values, decode_values),
+        migrations.RemoveField(
+            model_name='settysettings',
+            name='value',
+        ),
+        migrations.RenameField(
+            model_name='settysettings',
+            old_name='encoded_value',
+            new_name='value',
+        ),
+        migrations.AlterField(
+            model_name='settysettings',
+            name='value',
+            field=setty.fields.EncodedValueField(),
+        ),
+    ]
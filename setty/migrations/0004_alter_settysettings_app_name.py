@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setty', '0003_encode_values_with_codec'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='settysettings',
+            name='app_name',
+            field=models.CharField(blank=True, max_length=190),
+        ),
+    ]
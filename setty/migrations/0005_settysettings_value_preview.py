@@ -0,0 +1,52 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+VALUE_PREVIEW_LENGTH = 100
+
+
+def set_value_previews(apps, schema_editor):
+    SettySettings = apps.get_model('setty', 'SettySettings')
+    for setting in SettySettings.objects.all().iterator():
+        preview = str(setting.value)
+        if len(preview) > VALUE_PREVIEW_LENGTH:
+            preview = preview[: VALUE_PREVIEW_LENGTH - 1] + '…'
+        setting.value_preview = preview
+        setting.save(update_fields=['value_preview'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setty', '0004_alter_settysettings_app_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settysettings',
+            name='value_preview',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Value'),
+        ),
+        migrations.RunPython(set_value_previews, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='settysettings',
+            name='app_name',
+            field=models.CharField(blank=True, db_index=True, max_length=190),
+        ),
+        migrations.AlterField(
+            model_name='settysettings',
+            name='type',
+            field=models.CharField(
+                choices=[
+                    ('bool', 'Bool'),
+                    ('dict', 'Dict'),
+                    ('float', 'Float'),
+                    ('integer', 'Integer'),
+                    ('list', 'List'),
+                    ('string', 'String'),
+                ],
+                db_index=True,
+                max_length=8,
+            ),
+        ),
+    ]
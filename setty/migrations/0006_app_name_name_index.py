@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setty', '0005_settysettings_value_preview'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='settysettings',
+            name='app_name',
+            field=models.CharField(blank=True, max_length=190),
+        ),
+        migrations.AddIndex(
+            model_name='settysettings',
+            index=models.Index(fields=['app_name', 'name'], name='setty_app_name_name_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import setty.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setty', '0006_app_name_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettyOverride',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('scope', models.CharField(max_length=190)),
+                ('value', setty.fields.EncodedValueField()),
+                ('value_preview', models.CharField(blank=True, editable=False, max_length=100, verbose_name='Value')),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('updated_time', models.DateTimeField(auto_now=True)),
+                (
+                    'setting',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name='overrides', to='setty.settysettings'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Setty Override',
+                'verbose_name_plural': 'Setty Overrides',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='settyoverride',
+            constraint=models.UniqueConstraint(fields=('scope', 'setting'), name='setty_override_scope_setting_unique'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setty', '0007_settyoverride'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='settysettings',
+            name='type',
+            field=models.CharField(
+                choices=[
+                    ('bool', 'Bool'),
+                    ('dict', 'Dict'),
+                    ('float', 'Float'),
+                    ('integer', 'Integer'),
+                    ('list', 'List'),
+                    ('string', 'String'),
+                    ('rollout', 'Rollout'),
+                ],
+                db_index=True,
+                max_length=8,
+            ),
+        ),
+    ]
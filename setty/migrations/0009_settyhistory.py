@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:44
+
+from django.db import migrations, models
+import setty.fields
+
+
+def record_current_values(apps, schema_editor):
+    # Start the history with the current value of each setting, so past snapshots include settings never changed since
+    SettySettings = apps.get_model('setty', 'SettySettings')
+    SettyHistory = apps.get_model('setty', 'SettyHistory')
+    SettyHistory.objects.bulk_create(
+        (
+            SettyHistory(setting_name=setting.name, value=setting.value, value_preview=setting.value_preview)
+            for setting in SettySettings.objects.order_by('name').iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setty', '0008_alter_settysettings_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettyHistory',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Generation')),
+                ('setting_name', models.CharField(max_length=190)),
+                ('value', setty.fields.EncodedValueField()),
+                ('value_preview', models.CharField(blank=True, editable=False, max_length=100, verbose_name='Value')),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_time', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Setty History',
+                'verbose_name_plural': 'Setty History',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='settyhistory',
+            index=models.Index(fields=['setting_name', 'id'], name='setty_history_name_id_idx'),
+        ),
+        migrations.RunPython(record_current_values, migrations.RunPython.noop),
+    ]
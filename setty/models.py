@@ -1,8 +1,14 @@
-from typing import Any
+import logging
+from typing import Any, Dict
 
-from django.conf import settings
-from django.db import models
-from picklefield import PickledObjectField
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .fields import EncodedValueField
+from .rollouts import Rollout
+
+logger = logging.getLogger(__name__)
 
 
 class TypeChoices:
@@ -12,6 +18,7 @@ class TypeChoices:
     INTEGER = 'integer'
     LIST = 'list'
     STRING = 'string'
+    ROLLOUT = 'rollout'
 
     ALL_CHOICES = (
         (BOOL, 'Bool'),
@@ -20,18 +27,99 @@ class TypeChoices:
         (INTEGER, 'Integer'),
         (LIST, 'List'),
         (STRING, 'String'),
+        (ROLLOUT, 'Rollout'),
     )
 
+    # Python types of the values accepted for each setting type, other than rollouts
+    VALUE_TYPES = {
+        BOOL: (bool,),
+        DICT: (dict,),
+        FLOAT: (float, int),
+        INTEGER: (int,),
+        LIST: (list,),
+        STRING: (str,),
+    }
+
+    @classmethod
+    def validate(cls, name: str, type: str, value: Any) -> None:
+        """
+        Raise a ValueError if a value is not valid for the given setting type
+        """
+        if type == cls.ROLLOUT:
+            try:
+                Rollout.from_value(name, value)
+            except TypeError as e:
+                raise ValueError(str(e)) from e
+            return
+        # bool is a subclass of int, so it is only accepted for bool settings
+        if not isinstance(value, cls.VALUE_TYPES[type]) or (isinstance(value, bool) and type != cls.BOOL):
+            raise ValueError('{!r} is not a valid {} value.'.format(value, type))
+
+    @classmethod
+    def coerce(cls, type: str, value: Any) -> Any:
+        """
+        Coerce a value to the Python type of the given setting type where this does not change its meaning, i.e.
+        integers to floats and tuples to lists. Raises ValueError for any other value not of that type.
+        """
+        if type == cls.FLOAT and isinstance(value, int) and not isinstance(value, bool):
+            return float(value)
+        if type == cls.LIST and isinstance(value, tuple):
+            return list(value)
+        if type in cls.VALUE_TYPES:
+            cls.validate('', type, value)
+        return value
+
+    @classmethod
+    def infer(cls, value: Any) -> str:
+        """
+        Return the setting type of a Python value, defaulting to a string
+        """
+        # bool is checked first, as it is a subclass of int
+        for type, python_type in ((cls.BOOL, bool), (cls.INTEGER, int), (cls.FLOAT, float), (cls.DICT, dict)):
+            if isinstance(value, python_type):
+                return type
+        if isinstance(value, (list, tuple)):
+            return cls.LIST
+        return cls.STRING
+
+    @classmethod
+    def compile(cls, name: str, type: str, value: Any) -> Any:
+        """
+        Convert a value to its compiled form: rollouts are compiled into a Rollout and other values are coerced.
+        Values which cannot be coerced are kept unchanged.
+        """
+        if type != cls.ROLLOUT:
+            try:
+                return cls.coerce(type, value)
+            except ValueError as e:
+                logger.warning('Not coercing setty setting %s: %s', name, e)
+                return value
+        try:
+            return Rollout.from_value(name, value)
+        except (TypeError, ValueError) as e:
+            logger.warning('Disabling invalid setty rollout %s: %s', name, e)
+            return Rollout(name)
+
+
+# Length of the value preview shown in the admin changelist
+VALUE_PREVIEW_LENGTH = 100
+
 
-APP_CHOICES = [(app, app) for app in settings.INSTALLED_APPS]
+def make_value_preview(value: Any) -> str:
+    preview = str(value)
+    if len(preview) > VALUE_PREVIEW_LENGTH:
+        return preview[: VALUE_PREVIEW_LENGTH - 1] + '…'
+    return preview
 
 
 class SettySettings(models.Model):
     # 190 chars or there is a key length error in mysql 5.6
     name = models.CharField(max_length=190, primary_key=True)
-    app_name = models.CharField(max_length=190, choices=APP_CHOICES, blank=True)
-    value = PickledObjectField()
-    type = models.CharField(max_length=8, choices=TypeChoices.ALL_CHOICES)
+    app_name = models.CharField(max_length=190, blank=True)
+    value = EncodedValueField()
+    # Truncated copy of the value, so the admin changelist does not need to decode every value
+    value_preview = models.CharField('Value', max_length=VALUE_PREVIEW_LENGTH, blank=True, editable=False)
+    type = models.CharField(max_length=8, choices=TypeChoices.ALL_CHOICES, db_index=True)
     created_time = models.DateTimeField(auto_now_add=True)
     updated_time = models.DateTimeField(auto_now=True)
 
@@ -43,9 +131,128 @@ class SettySettings(models.Model):
     def value_unpacked(self, value: Any) -> None:
         self.value = value
 
+    def save(self, *args, **kwargs):
+        self.value_preview = make_value_preview(self.value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'value' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'value_preview'}
+        # The setting and its history are saved together
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or 'value' in update_fields:
+                SettyHistory.record({self.name: self.value})
+
     def __str__(self):
+        if 'value' in self.get_deferred_fields():
+            # Avoid a query per setting when the value has not been loaded, e.g. on the admin changelist
+            return '{}={}'.format(self.name, self.value_preview)
         return '{}={}'.format(self.name, self.value_unpacked)
 
     class Meta:
         verbose_name = 'Setty Settings'
         verbose_name_plural = 'Setty Settings'
+        indexes = [
+            # Serves both filtering by app and listing the settings of an app in name order
+            models.Index(fields=['app_name', 'name'], name='setty_app_name_name_idx'),
+        ]
+
+
+class SettyOverride(models.Model):
+    """
+    Value of a setting within a scope, such as a tenant or user group, overriding its global value
+    """
+
+    id = models.AutoField(primary_key=True)
+    setting = models.ForeignKey(SettySettings, on_delete=models.CASCADE, related_name='overrides')
+    scope = models.CharField(max_length=190)
+    value = EncodedValueField()
+    value_preview = models.CharField('Value', max_length=VALUE_PREVIEW_LENGTH, blank=True, editable=False)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        self.value_preview = make_value_preview(self.value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'value' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'value_preview'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return '{}[{}]={}'.format(self.setting_id, self.scope, self.value_preview)
+
+    class Meta:
+        verbose_name = 'Setty Override'
+        verbose_name_plural = 'Setty Overrides'
+        constraints = [
+            # Also serves loading all of the overrides of a scope
+            models.UniqueConstraint(fields=['scope', 'setting'], name='setty_override_scope_setting_unique'),
+        ]
+
+
+class SettyHistory(models.Model):
+    """
+    Append-only record of every value of each setting. The id of each change is its generation, which only increases,
+    so the settings at any generation are the latest change of each setting up to that generation.
+    """
+
+    id = models.BigAutoField('Generation', primary_key=True)
+    # Not a foreign key, so the history of deleted settings is kept
+    setting_name = models.CharField(max_length=190)
+    value = EncodedValueField()
+    value_preview = models.CharField('Value', max_length=VALUE_PREVIEW_LENGTH, blank=True, editable=False)
+    deleted = models.BooleanField(default=False)
+    changed_time = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    @classmethod
+    def record(cls, values: Dict[str, Any], deleted: bool = False) -> None:
+        """
+        Record the new values of the given settings, or that they were deleted, using a single insert
+        """
+        cls.objects.bulk_create(
+            cls(
+                setting_name=name,
+                value=None if deleted else value,
+                value_preview='' if deleted else make_value_preview(value),
+                deleted=deleted,
+            )
+            for name, value in values.items()
+        )
+
+    def __str__(self):
+        return '{}: {}={}'.format(self.id, self.setting_name, '<deleted>' if self.deleted else self.value_preview)
+
+    class Meta:
+        verbose_name = 'Setty History'
+        verbose_name_plural = 'Setty History'
+        indexes = [
+            # Serves finding the latest change of each setting up to a generation
+            models.Index(fields=['setting_name', 'id'], name='setty_history_name_id_idx'),
+        ]
+
+
+@receiver(post_delete, sender=SettySettings)
+def _record_deleted_setting(instance, **kwargs):
+    SettyHistory.record({instance.name: None}, deleted=True)
+
+
+@receiver(post_delete, sender=SettySettings)
+def _remove_deleted_setting_from_cache(instance, **kwargs):
+    # Drop the cached value and the cached listings including the setting, however it was deleted
+    from .backend import CacheBackend
+    from .wrapper import get_backend
+
+    backend = get_backend()
+    if isinstance(backend, CacheBackend):
+        backend.delete_from_cache([instance.name])
+        backend.notify_changed([instance.name])
+
+
+@receiver(post_delete, sender=SettyOverride)
+def _remove_deleted_override_from_cache(instance, **kwargs):
+    # Overrides are also deleted along with their setting, which does not go through the backend
+    from .backend import CacheBackend
+    from .wrapper import get_backend
+
+    backend = get_backend()
+    if isinstance(backend, CacheBackend):
+        backend.delete_scopes_from_cache([instance.scope])
@@ -0,0 +1,51 @@
+from debug_toolbar.panels import Panel
+
+from .metrics import InMemoryMetrics, collect_metrics, get_metrics
+
+
+class SettyPanel(Panel):
+    """
+    Django debug toolbar panel showing the setty metrics recorded during the request. Only the metrics recorded by the
+    thread or task handling the request are shown, not those of concurrent requests.
+    Requires SETTY_METRICS to be set to 'setty.metrics.InMemoryMetrics'.
+    """
+
+    title = 'Setty'
+    template = 'setty/debug_toolbar_panel.html'
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        if not stats.get('enabled'):
+            return 'Metrics disabled'
+        reads = stats['events'].get('get', {}).get('count', 0)
+        return f'{reads} reads in {stats["total_time"]:.2f}ms'
+
+    def process_request(self, request):
+        if not isinstance(get_metrics(), InMemoryMetrics):
+            self._events = None
+            return super().process_request(request)
+
+        with collect_metrics() as metrics:
+            response = super().process_request(request)
+
+        self._events = {
+            event: {'count': event_summary['count'], 'time': event_summary['time'] * 1000}
+            for event, event_summary in metrics.summary().items()
+        }
+        return response
+
+    def generate_stats(self, request, response):
+        events = getattr(self, '_events', None)
+        if events is None:
+            self.record_stats({'enabled': False})
+            return
+
+        timed_events = ('get', 'get_many', 'set', 'set_many')
+        self.record_stats(
+            {
+                'enabled': True,
+                'events': events,
+                'total_time': sum(events[event]['time'] for event in timed_events if event in events),
+            }
+        )
@@ -0,0 +1,97 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from .snapshot import SettingsSnapshot
+
+try:
+    from asgiref.local import Local
+except ImportError:  # Django < 3.0 does not depend on asgiref
+    from threading import local as Local
+
+_state = Local()
+
+# Number of pinned blocks active in any thread or task. Reads skip the comparatively slow context-local lookup while
+# no block is active anywhere.
+_active_blocks = 0
+_active_blocks_lock = threading.Lock()
+
+
+@contextmanager
+def pinned_settings():
+    """
+    Pin a consistent view of all settings for the duration of the block.
+
+    The settings are loaded in bulk on the first access inside the block and every later read is served from that
+    snapshot, so all values come from the same generation. The overrides of each set of scopes read via
+    config.for_scope() are pinned in the same way. Blocks may be nested, in which case the outermost block owns the
+    snapshot.
+    """
+    global _active_blocks
+
+    with _active_blocks_lock:
+        _active_blocks += 1
+    _state.depth = getattr(_state, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _state.depth -= 1
+        if not _state.depth:
+            _state.snapshot = None
+            _state.overrides = None
+        with _active_blocks_lock:
+            _active_blocks -= 1
+
+
+def get_pinned_snapshot(backend) -> Optional[SettingsSnapshot]:
+    """
+    Return the snapshot pinned for the current block, loading it from the backend on first use.
+    None is returned if no pinned block is active.
+    """
+    if not _active_blocks or not getattr(_state, 'depth', 0):
+        return None
+
+    snapshot = getattr(_state, 'snapshot', None)
+    if snapshot is None:
+        snapshot = _state.snapshot = backend.get_snapshot()
+    return snapshot
+
+
+async def aget_pinned_snapshot(backend) -> Optional[SettingsSnapshot]:
+    """
+    Async counterpart of get_pinned_snapshot
+    """
+    if not _active_blocks or not getattr(_state, 'depth', 0):
+        return None
+
+    snapshot = getattr(_state, 'snapshot', None)
+    if snapshot is None:
+        snapshot = _state.snapshot = await backend.aget_snapshot()
+    return snapshot
+
+
+def get_pinned_overrides(backend, scopes: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """
+    Return the resolved overrides of the given scopes pinned for the current block, loading them from the backend on
+    first use. None is returned if no pinned block is active.
+    """
+    if not _active_blocks or not getattr(_state, 'depth', 0):
+        return None
+
+    overrides_by_scopes = getattr(_state, 'overrides', None)
+    if overrides_by_scopes is None:
+        overrides_by_scopes = _state.overrides = {}
+    try:
+        return overrides_by_scopes[scopes]
+    except KeyError:
+        overrides = overrides_by_scopes[scopes] = backend.get_overrides(scopes)
+        return overrides
+
+
+def discard_pinned_snapshot() -> None:
+    """
+    Discard the pinned snapshot and overrides so the next read inside the block reloads them, e.g. after a setting has
+    been updated
+    """
+    _state.snapshot = None
+    _state.overrides = None
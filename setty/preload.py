@@ -0,0 +1,61 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.signals import request_started
+
+from .exceptions import InvalidConfigurationError
+
+logger = logging.getLogger(__name__)
+
+PRELOAD_ON_FIRST_REQUEST = 'first_request'
+
+
+def preload_settings() -> int:
+    """
+    Load the settings of the apps in SETTY_PRELOAD_APPS, or all settings if it is not set, into the cache tiers of the
+    configured backend. The number of settings loaded and the time taken are logged.
+
+    To preload when a server starts, call this from wsgi.py or asgi.py after the application is created, or from the
+    post_fork hook of gunicorn. It is never called by django.setup(), so management commands such as migrate do not
+    query the database.
+
+    Errors are logged as a warning unless SETTY_PRELOAD_FAIL_SILENTLY is False, in which case they are raised.
+    Returns the number of settings loaded.
+    """
+    from setty import config
+
+    start = time.perf_counter()
+    try:
+        count = config.preload(getattr(settings, 'SETTY_PRELOAD_APPS', None))
+    except Exception:
+        if not getattr(settings, 'SETTY_PRELOAD_FAIL_SILENTLY', True):
+            raise
+        logger.warning('Failed to preload setty settings', exc_info=True)
+        return 0
+
+    logger.info('Preloaded %d setty settings in %.1fms', count, (time.perf_counter() - start) * 1000)
+    return count
+
+
+def _preload_on_first_request(**kwargs) -> None:
+    # Only the request which manages to disconnect the receiver preloads, even if several requests start at once
+    if request_started.disconnect(_preload_on_first_request):
+        preload_settings()
+
+
+def setup_preload() -> None:
+    """
+    Preload the settings on the first request if configured by SETTY_PRELOAD. Called when Django starts, so it never
+    queries the database itself.
+    """
+    preload = getattr(settings, 'SETTY_PRELOAD', None)
+    if preload is None:
+        return
+    if preload == PRELOAD_ON_FIRST_REQUEST:
+        request_started.connect(_preload_on_first_request)
+    else:
+        raise InvalidConfigurationError(
+            f'Invalid SETTY_PRELOAD value {preload!r}. Use {PRELOAD_ON_FIRST_REQUEST!r} or None, and call '
+            f'setty.preload.preload_settings() from wsgi.py or asgi.py to preload when the server starts.'
+        )
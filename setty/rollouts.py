@@ -0,0 +1,108 @@
+import hashlib
+from typing import Any, Dict, Hashable, Iterable, Mapping, Optional, Tuple
+
+# Keys are hashed into one of this many buckets, so percentages are applied to within 0.01%
+BUCKETS = 10000
+
+ROLLOUT_FIELDS = {'percentage', 'keys', 'rules', 'salt'}
+RULE_FIELDS = {'attribute', 'values', 'percentage'}
+
+
+def _percentage_threshold(percentage: Any) -> int:
+    if isinstance(percentage, bool) or not isinstance(percentage, (int, float)) or not 0 <= percentage <= 100:
+        raise ValueError('Rollout percentages must be numbers between 0 and 100, not {!r}.'.format(percentage))
+    return round(percentage * BUCKETS / 100)
+
+
+class Rollout:
+    """
+    Compiled percentage rollout, evaluated in process for a user or request key, e.g.
+
+        rollout = config.get_rollout('new_checkout')
+        for user in users:
+            if rollout.is_enabled(user.pk, {'country': user.country}):
+                ...
+
+    Rollouts are stored as a dict such as:
+
+        {
+            'percentage': 10,  # Enabled for 10% of keys
+            'keys': ['42'],  # Always enabled for these keys
+            'rules': [{'attribute': 'country', 'values': ['GB', 'IE'], 'percentage': 50}],  # First matching rule wins
+        }
+
+    Each key is hashed into a stable bucket, salted with the setting name by default, so a key stays enabled as the
+    percentage is increased and different rollouts enable different keys.
+    """
+
+    __slots__ = ('name', 'percentage', 'keys', 'rules', '_salt', '_threshold')
+
+    def __init__(
+        self,
+        name: str,
+        percentage: float = 0,
+        keys: Iterable[Hashable] = (),
+        rules: Iterable[Tuple[str, frozenset, int]] = (),
+        salt: Optional[str] = None,
+    ):
+        self.name = name
+        self.percentage = percentage
+        self.keys = frozenset(str(key) for key in keys)
+        self.rules = tuple(rules)
+        self._salt = '{}:'.format(name if salt is None else salt).encode()
+        self._threshold = _percentage_threshold(percentage)
+
+    @classmethod
+    def from_value(cls, name: str, value: Mapping[str, Any]) -> 'Rollout':
+        """
+        Compile the stored value of a rollout, raising ValueError if it is not valid
+        """
+        if not isinstance(value, Mapping):
+            raise ValueError('Rollouts must be stored as a dict, not {!r}.'.format(value))
+        unknown_fields = set(value).difference(ROLLOUT_FIELDS)
+        if unknown_fields:
+            raise ValueError('Unknown rollout fields: {}.'.format(', '.join(sorted(unknown_fields))))
+
+        rules = []
+        for rule in value.get('rules', ()):
+            if not isinstance(rule, Mapping) or 'attribute' not in rule or set(rule).difference(RULE_FIELDS):
+                raise ValueError(
+                    'Rollout rules must be dicts with an attribute, values and an optional percentage, not {!r}.'.format(
+                        rule
+                    )
+                )
+            values = frozenset(rule.get('values', ()))
+            rules.append((rule['attribute'], values, _percentage_threshold(rule.get('percentage', 100))))
+
+        return cls(name, value.get('percentage', 0), value.get('keys', ()), rules, value.get('salt'))
+
+    def __repr__(self) -> str:
+        return '<Rollout: {} {}%>'.format(self.name, self.percentage)
+
+    def bucket(self, key: Any) -> int:
+        """
+        Return the stable bucket of a key, between 0 and BUCKETS - 1
+        """
+        digest = hashlib.sha1(self._salt + str(key).encode()).digest()
+        return int.from_bytes(digest[:8], 'big') % BUCKETS
+
+    def is_enabled(self, key: Any, attributes: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Return whether the rollout is enabled for a key, such as a user id, with the given targeting attributes
+        """
+        key = str(key)
+        if key in self.keys:
+            return True
+
+        threshold = self._threshold
+        if attributes and self.rules:
+            for attribute, values, rule_threshold in self.rules:
+                if attributes.get(attribute) in values:
+                    threshold = rule_threshold
+                    break
+
+        if threshold <= 0:
+            return False
+        if threshold >= BUCKETS:
+            return True
+        return self.bucket(key) < threshold
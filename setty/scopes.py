@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+from .pinning import discard_pinned_snapshot, get_pinned_overrides
+from .wrapper import get_backend
+
+
+class LRUCache:
+    """
+    Thread safe mapping holding at most max_size items, discarding the least recently used item when full
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return None
+            return self._items[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def resolve_overrides(scopes: Sequence[str], overrides_by_scope: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge the overrides of each scope, ordered from the most specific, into the value of each overridden setting
+    """
+    resolved = {}
+    # Apply the least specific scope first, so the more specific scopes replace its values
+    for scope in reversed(scopes):
+        resolved.update(overrides_by_scope.get(scope, {}))
+    return resolved
+
+
+class ScopedSettings:
+    """
+    View of the settings within one or more scopes, ordered from the most specific, e.g.
+
+        config.for_scope('tenant:42', 'group:beta', 'app:billing').feature_x
+
+    Each setting takes its value from the first scope overriding it, falling back to its global value.
+    Setting a value overrides it in the most specific scope only. Inside pinned_settings(), the overrides are pinned
+    along with the global values.
+    """
+
+    __slots__ = ('scopes', '_settings')
+
+    def __init__(self, settings, scopes: Sequence[str]):
+        if not scopes:
+            raise ValueError('At least one scope is required.')
+        object.__setattr__(self, 'scopes', tuple(scopes))
+        object.__setattr__(self, '_settings', settings)
+
+    def __getattr__(self, name: str) -> Any:
+        overrides = self._get_overrides()
+        try:
+            return overrides[name]
+        except KeyError:
+            return getattr(self._settings, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        get_backend().set_override(name, self.scopes[0], value)
+        discard_pinned_snapshot()
+
+    def __repr__(self) -> str:
+        return '<ScopedSettings: {}>'.format(', '.join(self.scopes))
+
+    def get_overrides(self) -> Dict[str, Any]:
+        """
+        Return the values of the settings overridden within these scopes
+        """
+        return self._get_overrides()
+
+    def delete_override(self, name: str) -> bool:
+        """
+        Remove the override of a setting in the most specific scope, returning whether there was one
+        """
+        deleted = get_backend().delete_override(name, self.scopes[0])
+        discard_pinned_snapshot()
+        return deleted
+
+    def _get_overrides(self) -> Dict[str, Any]:
+        backend = get_backend()
+        overrides = get_pinned_overrides(backend, self.scopes)
+        if overrides is None:
+            overrides = backend.get_overrides(self.scopes)
+        return overrides
@@ -0,0 +1,111 @@
+import threading
+from copy import deepcopy
+from typing import Any, Dict, Iterable, Iterator, Mapping, Tuple, TypeVar, Union
+
+from django.conf import settings
+
+# Ids of every setting name seen by the process. Ids are never reused, so an id can be looked up once, e.g. at import
+# time, and used to read the setting from any CompiledSettings.
+_key_ids: Dict[str, int] = {}
+_key_ids_lock = threading.Lock()
+
+T = TypeVar('T')
+
+
+def copy_mutable(value: T) -> T:
+    """
+    Return a copy of list and dict values, so a caller modifying a value does not change the copy shared by the process
+    """
+    if isinstance(value, (list, dict)):
+        return deepcopy(value)
+    return value
+
+
+class SettingsSnapshot(Mapping):
+    """
+    Immutable mapping of setting names to their values, loaded in bulk at a single point in time.
+    Snapshots may be shared by the process, so get_value() returns copies of list and dict values.
+    """
+
+    __slots__ = ('_values',)
+
+    def __init__(self, values: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]] = ()):
+        self._values = dict(values)
+
+    def __getitem__(self, name: str) -> Any:
+        return self._values[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return '<SettingsSnapshot: {} settings>'.format(len(self))
+
+    def get_value(self, name: str) -> Any:
+        """
+        Return the value of a setting, falling back to SETTY_NOT_FOUND_VALUE in the same way as the backends
+        """
+        try:
+            return copy_mutable(self._values[name])
+        except KeyError:
+            return getattr(settings, 'SETTY_NOT_FOUND_VALUE', None)
+
+
+def key_id(name: str) -> int:
+    """
+    Return the id of a setting name, for reading the setting from a CompiledSettings by index
+    """
+    try:
+        return _key_ids[name]
+    except KeyError:
+        with _key_ids_lock:
+            return _key_ids.setdefault(name, len(_key_ids))
+
+
+class CompiledSettings:
+    """
+    Immutable table of setting values, coerced to the Python type of each setting and stored in a tuple indexed by
+    key_id(name). Rollouts are stored as compiled Rollout objects. Settings which do not exist hold
+    SETTY_NOT_FOUND_VALUE, so a read is a single index lookup:
+
+        MY_SETTING = key_id('my_setting')
+        ...
+        compiled[MY_SETTING]
+
+    Values are shared between all readers and must not be modified.
+    """
+
+    __slots__ = ('_values', '_names', '_not_found_value')
+
+    def __init__(self, rows: Iterable[Tuple[str, str, Any]] = ()):
+        """
+        Compile the settings from (name, type, value) rows
+        """
+        from .models import TypeChoices
+
+        coerced = {key_id(name): TypeChoices.compile(name, type, value) for name, type, value in rows}
+        self._names = frozenset(name for name, index in list(_key_ids.items()) if index in coerced)
+        self._not_found_value = getattr(settings, 'SETTY_NOT_FOUND_VALUE', None)
+        self._values = tuple(coerced.get(index, self._not_found_value) for index in range(len(_key_ids)))
+
+    def __getitem__(self, index: int) -> Any:
+        try:
+            return self._values[index]
+        except IndexError:
+            # The name was first seen after these settings were compiled
+            return self._not_found_value
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __repr__(self) -> str:
+        return '<CompiledSettings: {} settings>'.format(len(self))
+
+    def get_value(self, name: str) -> Any:
+        return self[key_id(name)]
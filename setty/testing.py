@@ -0,0 +1,46 @@
+from django.test.utils import TestContextDecorator
+
+# Imported absolutely, as the test runner also discovers this module by its name
+from setty import wrapper
+from setty.backend import MemoryBackend
+from setty.pinning import discard_pinned_snapshot
+
+
+class override_setty(TestContextDecorator):
+    """
+    Replace the settings with in-memory values, without using the database or the cache, and restore the previous
+    backend afterwards. Acts as a decorator for test classes and functions, or as a context manager, e.g.
+
+        @override_setty(feature_x=True)
+        def test_feature_x(self):
+            ...
+
+        with override_setty({'my-setting': 1}) as backend:
+            backend.add('other_setting', [1, 2], app_name='myapp')
+
+    Only the given settings exist within the block, along with those of any enclosing override_setty.
+    """
+
+    def __init__(self, values=None, **kwargs):
+        self.values = {**(values or {}), **kwargs}
+        self.previous_backend = None
+        super().__init__()
+
+    def enable(self):
+        # The previous backend is read directly, so a backend is not constructed just to be replaced
+        self.previous_backend = wrapper._backend
+        if isinstance(self.previous_backend, MemoryBackend):
+            backend = self.previous_backend.copy()
+        else:
+            backend = MemoryBackend({})
+
+        for name, value in self.values.items():
+            backend.add(name, value)
+
+        wrapper.set_backend(backend)
+        discard_pinned_snapshot()
+        return backend
+
+    def disable(self):
+        wrapper.set_backend(self.previous_backend)
+        discard_pinned_snapshot()
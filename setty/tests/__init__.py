@@ -0,0 +1,6 @@
+from unittest import skipIf
+
+import django
+
+# Test methods are only awaited from Django 3.1. Older versions call them without running the coroutine.
+requires_async_tests = skipIf(django.VERSION < (3, 1), 'Async tests require Django 3.1+')
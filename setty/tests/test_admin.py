@@ -1,9 +1,15 @@
 from unittest.mock import patch
 
+from django.conf import settings
+from django.core.cache import cache
 from django.forms import fields
 from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.urls import reverse
 from setty.admin import SettingsForm
-from setty.models import SettySettings
+from setty.backend import DatabaseBackend
+from setty.models import VALUE_PREVIEW_LENGTH, SettySettings
+from setty.wrapper import get_backend
 
 
 @override_settings(SETTY_BACKEND='DatabaseBackend')
@@ -34,6 +40,11 @@ class AdminSettingsFormTests(TestCase):
     def test_form_has_name_field(self):
         self.assertIsInstance(SettingsForm({}).fields['name'], fields.CharField)
 
+    def test_form_has_app_name_choices_from_installed_apps(self):
+        choices = list(SettingsForm({}).fields['app_name'].choices)
+
+        self.assertEqual(choices[1:], [(app, app) for app in settings.INSTALLED_APPS])
+
     def test_form_has_type_field(self):
         self.assertIsInstance(SettingsForm({}).fields['type'], fields.ChoiceField)
 
@@ -88,4 +99,125 @@ class AdminSettingsFormTests(TestCase):
     def test_save_calls_cache_set_with_correct_args_if_cachebackend_used(self, mock_cache):
         self._save_form('list', '[1, 2, 3, 4]')
 
-        mock_cache.set.assert_called_once_with('_dyn_settings_:mysetting', [1, 2, 3, 4], 3600)
+        mock_cache.set.assert_called_once_with('_dyn_settings_:mysetting', b'[1,2,3,4]', 3600)
+
+    @override_settings(SETTY_BACKEND='TwoTierCacheBackend')
+    @patch('setty.backend.cache')
+    def test_save_bumps_settings_version_if_cachebackend_used(self, mock_cache):
+        self._save_form('list', '[1, 2, 3, 4]')
+
+        mock_cache.incr.assert_called_once_with('_dyn_settings_:__version__')
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class SettyAdminChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        SettySettings.objects.create(name='mybool', type='bool', value=True, app_name='django.contrib.admin')
+        SettySettings.objects.create(name='mylist', type='list', value=list(range(100)))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _get_changelist(self, **params):
+        response = self.client.get(reverse('admin:setty_settysettings_changelist'), params)
+        self.assertEqual(response.status_code, 200)
+        return [setting.name for setting in response.context['cl'].result_list]
+
+    def test_changelist_shows_truncated_value_preview(self):
+        response = self.client.get(reverse('admin:setty_settysettings_changelist'))
+
+        self.assertContains(response, SettySettings.objects.get(name='mylist').value_preview)
+
+    def test_changelist_does_not_load_values(self):
+        response = self.client.get(reverse('admin:setty_settysettings_changelist'))
+
+        self.assertEqual(
+            [setting.get_deferred_fields() for setting in response.context['cl'].result_list], [{'value'}, {'value'}]
+        )
+
+    def test_changelist_search_by_name(self):
+        self.assertEqual(self._get_changelist(q='list'), ['mylist'])
+
+    def test_changelist_filter_by_app_name(self):
+        self.assertEqual(self._get_changelist(app_name='django.contrib.admin'), ['mybool'])
+
+    def test_changelist_filter_by_type(self):
+        self.assertEqual(self._get_changelist(type__exact='list'), ['mylist'])
+
+
+@override_settings(SETTY_BACKEND='CacheBackend', SETTY_CACHE_PREFIX='_admin_delete_')
+class SettyAdminDeleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        SettySettings.objects.create(name='mybool', type='bool', value=True, app_name='django.contrib.admin')
+        SettySettings.objects.create(name='myinteger', type='integer', value=1)
+        SettySettings.objects.create(name='mystring', type='string', value='a')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.backend = get_backend()
+        self.backend.get_all()
+        self.backend.get_all('django.contrib.admin')
+        self.backend.get('mybool')
+
+    def _assert_deleted(self, names):
+        with self.subTest('index refreshed'):
+            self.assertEqual(
+                [setting.name for setting in self.backend.get_all()],
+                sorted({'mybool', 'myinteger', 'mystring'} - set(names)),
+            )
+
+        with self.subTest('app index refreshed'):
+            self.assertEqual(self.backend.get_all('django.contrib.admin'), [])
+
+        with self.subTest('cached value dropped'):
+            self.assertIsNone(self.backend.get('mybool'))
+
+    def test_delete_refreshes_cache(self):
+        response = self.client.post(reverse('admin:setty_settysettings_delete', args=['mybool']), {'post': 'yes'})
+
+        self.assertEqual(response.status_code, 302)
+        self._assert_deleted(['mybool'])
+
+    def test_delete_selected_refreshes_cache(self):
+        response = self.client.post(
+            reverse('admin:setty_settysettings_changelist'),
+            {'action': 'delete_selected', '_selected_action': ['mybool', 'mystring'], 'post': 'yes'},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self._assert_deleted(['mybool', 'mystring'])
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class ValuePreviewTests(TestCase):
+    def test_preview_stored_on_save(self):
+        setting = SettySettings.objects.create(name='mydict', type='dict', value={'a': 1})
+
+        self.assertEqual(setting.value_preview, "{'a': 1}")
+
+    def test_long_preview_truncated(self):
+        preview = SettySettings.objects.create(name='mylist', type='list', value=list(range(100))).value_preview
+
+        with self.subTest('truncated to max length'):
+            self.assertEqual(len(preview), VALUE_PREVIEW_LENGTH)
+
+        with self.subTest('truncation marked'):
+            self.assertTrue(preview.endswith('…'))
+
+    def test_preview_updated_by_backend(self):
+        SettySettings.objects.create(name='myinteger', type='integer', value=1)
+        SettySettings.objects.create(name='mystring', type='string', value='a')
+
+        DatabaseBackend().set('myinteger', 2)
+        DatabaseBackend().set_many({'mystring': 'b'})
+
+        self.assertEqual(
+            dict(SettySettings.objects.values_list('name', 'value_preview')), {'myinteger': '2', 'mystring': 'b'}
+        )
@@ -1,18 +1,42 @@
-from unittest.mock import patch, call
+from unittest.mock import call, patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.test import override_settings
-from setty.backend import DatabaseBackend, CacheBackend
+from setty.backend import DatabaseBackend, CacheBackend, MemoryBackend, TwoTierCacheBackend
+from setty.codecs import JSONCodec
 from setty.exceptions import SettingDoesNotExistError
 from setty.models import SettySettings
+from setty.snapshot import key_id
+from setty.tests import requires_async_tests
+
+
+SNAPSHOT_VALUES = {
+    'mybool': True,
+    'mydict': {'a': 1, 'b': 2},
+    'myfloat': 3.142,
+    'myinteger': 123,
+    'mylist': [1, 2, 3, 4],
+    'mystring': 'test_string',
+}
+
+SETTINGS_BY_APP = {
+    'django.contrib.admin': {'mybool': True, 'mydict': {'a': 1, 'b': 2}},
+    '': {'myfloat': 3.142, 'myinteger': 123, 'mylist': [1, 2, 3, 4], 'mystring': 'test_string'},
+}
 
 
 class BaseBackendTestsMixin:
     @classmethod
     def setUpTestData(cls):
         super().setUpTestData()
-        SettySettings.objects.create(name='mybool', type='bool', value=True)
-        SettySettings.objects.create(name='mydict', type='dict', value={'a': 1, 'b': 2})
+        SettySettings.objects.create(name='mybool', type='bool', value=True, app_name='django.contrib.admin')
+        SettySettings.objects.create(
+            name='mydict', type='dict', value={'a': 1, 'b': 2}, app_name='django.contrib.admin'
+        )
         SettySettings.objects.create(name='myfloat', type='float', value=3.142)
         SettySettings.objects.create(name='myinteger', type='integer', value=123)
         SettySettings.objects.create(name='mylist', type='list', value=[1, 2, 3, 4])
@@ -31,6 +55,93 @@ class DatabaseBackendTests(BaseBackendTestsMixin, TestCase):
         settings = self.backend.get_all()
         self.assertEqual(list(settings), list(self.all_settings))
 
+    def test_get_values_for_app_returns_values_in_name_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            values = self.backend.get_values_for_app('django.contrib.admin')
+
+        with self.subTest('values returned in name order'):
+            self.assertEqual(list(values.items()), [('mybool', True), ('mydict', {'a': 1, 'b': 2})])
+
+        with self.subTest('only names and values fetched'):
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn('created_time', queries[0]['sql'])
+
+    def test_app_name_name_index_exists(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, SettySettings._meta.db_table)
+
+        self.assertEqual(constraints['setty_app_name_name_idx']['columns'], ['app_name', 'name'])
+
+    def test_get_many_returns_values_in_one_query(self):
+        with self.assertNumQueries(1):
+            values = self.backend.get_many(['mystring', 'missing', 'mybool'])
+
+        self.assertEqual(values, {'mystring': 'test_string', 'missing': None, 'mybool': True})
+
+    def test_preload_loads_settings_of_given_apps_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.preload(['django.contrib.admin']), 2)
+
+    def test_get_snapshot_returns_all_values_in_one_query(self):
+        with self.assertNumQueries(1):
+            snapshot = self.backend.get_snapshot()
+
+        self.assertEqual(dict(snapshot), SNAPSHOT_VALUES)
+
+    def test_get_all_by_app_returns_values_grouped_by_app_in_one_query(self):
+        with self.assertNumQueries(1):
+            settings_by_app = self.backend.get_all_by_app()
+
+        self.assertEqual(settings_by_app, SETTINGS_BY_APP)
+
+    def test_get_compiled_returns_all_values_in_one_query(self):
+        with self.assertNumQueries(1):
+            compiled = self.backend.get_compiled()
+
+        self.assertEqual({name: compiled[key_id(name)] for name in SNAPSHOT_VALUES}, SNAPSHOT_VALUES)
+
+    def test_get_compiled_coerces_values_to_setting_type(self):
+        SettySettings.objects.create(name='wholefloat', type='float', value=2)
+
+        value = self.backend.get_compiled().get_value('wholefloat')
+
+        with self.subTest('correct value'):
+            self.assertEqual(value, 2.0)
+
+        with self.subTest('correct type'):
+            self.assertIsInstance(value, float)
+
+    def test_get_compiled_keeps_values_which_cannot_be_coerced_losslessly(self):
+        for name, type, value in (
+            ('stringbool', 'bool', 'false'),
+            ('fractionalinteger', 'integer', 3.7),
+            ('stringlist', 'list', 'abc'),
+        ):
+            SettySettings.objects.create(name=name, type=type, value=value)
+
+            with self.subTest(name=name), self.assertLogs('setty.models', 'WARNING'):
+                self.assertEqual(self.backend.get_compiled().get_value(name), value)
+
+    @override_settings(SETTY_NOT_FOUND_VALUE='__notfound__')
+    def test_compiled_returns_not_found_setting_value_for_missing_item(self):
+        compiled = self.backend.get_compiled()
+
+        with self.subTest('name not seen before compiling'):
+            self.assertEqual(compiled[key_id('missing_after_compile')], '__notfound__')
+
+        with self.subTest('name seen before compiling'):
+            self.assertEqual(self.backend.get_compiled().get_value('missing_after_compile'), '__notfound__')
+
+    def test_get_snapshot_is_immutable(self):
+        snapshot = self.backend.get_snapshot()
+
+        with self.assertRaises(TypeError):
+            snapshot['mybool'] = False
+
+    @override_settings(SETTY_NOT_FOUND_VALUE='__notfound__')
+    def test_snapshot_get_value_returns_not_found_setting_value_for_missing_item(self):
+        self.assertEqual(self.backend.get_snapshot().get_value('missing'), '__notfound__')
+
     def test_missing_item_returns_none_if_not_found_setting_undefined(self):
         self.assertIsNone(self.backend.get('missing'))
 
@@ -63,6 +174,33 @@ class DatabaseBackendTests(BaseBackendTestsMixin, TestCase):
         ):
             self.backend.set('invalid', True)
 
+    def test_set_many_updates_values_with_single_update(self):
+        updated_time = SettySettings.objects.get(name='mybool').updated_time
+
+        with CaptureQueriesContext(connection) as queries:
+            self.backend.set_many({'mybool': False, 'myinteger': 111})
+
+        with self.subTest('single update query'):
+            self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 1)
+
+        with self.subTest('values updated'):
+            self.assertEqual(
+                dict(SettySettings.objects.filter(name__in=['mybool', 'myinteger']).values_list('name', 'value')),
+                {'mybool': False, 'myinteger': 111},
+            )
+
+        with self.subTest('updated time changed'):
+            self.assertGreater(SettySettings.objects.get(name='mybool').updated_time, updated_time)
+
+    def test_set_many_with_invalid_settings_raises_exception_without_updating(self):
+        with self.assertRaisesMessage(
+            SettingDoesNotExistError,
+            'Error setting values for invalid, other - these settings do not exist in the database!',
+        ):
+            self.backend.set_many({'mybool': False, 'other': 1, 'invalid': True})
+
+        self.assertEqual(SettySettings.objects.get(name='mybool').value, True)
+
     def test_set_updates_bool(self):
         self.backend.set('mybool', False)
         self.assertEqual(SettySettings.objects.get(name='mybool').value, False)
@@ -94,20 +232,78 @@ class CacheBackendTest(BaseBackendTestsMixin, TestCase):
     def setUp(self):
         self.backend = CacheBackend()
 
-    def test_load_all_settings_into_cache_calls_set_for_all_settings(self, mock_cache):
+    def test_load_all_settings_into_cache_calls_set_many_once_for_all_settings(self, mock_cache):
         self.backend.load_all_settings_into_cache()
 
-        mock_cache.set.assert_has_calls(
-            [
-                call('_mock_key_:mybool', True, 3600),
-                call('_mock_key_:mydict', {'a': 1, 'b': 2}, 3600),
-                call('_mock_key_:myfloat', 3.142, 3600),
-                call('_mock_key_:myinteger', 123, 3600),
-                call('_mock_key_:mylist', [1, 2, 3, 4], 3600),
-                call('_mock_key_:mystring', 'test_string', 3600),
-            ]
+        mock_cache.set_many.assert_called_once_with(
+            {
+                '_mock_key_:mybool': b'true',
+                '_mock_key_:mydict': b'{"a":1,"b":2}',
+                '_mock_key_:myfloat': b'3.142',
+                '_mock_key_:myinteger': b'123',
+                '_mock_key_:mylist': b'[1,2,3,4]',
+                '_mock_key_:mystring': b'"test_string"',
+                '_mock_key_:__snapshot__': JSONCodec().encode(SNAPSHOT_VALUES),
+            },
+            3600,
         )
 
+    def test_get_snapshot_returns_cached_snapshot(self, mock_cache):
+        mock_cache.get.return_value = b'{"mybool":false}'
+
+        with self.assertNumQueries(0):
+            snapshot = self.backend.get_snapshot()
+
+        with self.subTest('snapshot key used'):
+            mock_cache.get.assert_called_once_with('_mock_key_:__snapshot__')
+
+        with self.subTest('correct values returned'):
+            self.assertEqual(dict(snapshot), {'mybool': False})
+
+    def test_get_all_returns_cached_settings(self, mock_cache):
+        mock_cache.get.return_value = [SettySettings(name='mybool', value=False)]
+
+        with self.assertNumQueries(0):
+            all_settings = self.backend.get_all()
+
+        with self.subTest('index key used'):
+            mock_cache.get.assert_called_once_with('_mock_key_:__index__')
+
+        with self.subTest('correct settings returned'):
+            self.assertEqual([setting.value for setting in all_settings], [False])
+
+    def test_get_all_for_app_not_found_in_cache(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        all_settings = self.backend.get_all('django.contrib.admin')
+
+        with self.subTest('cache set called'):
+            mock_cache.set.assert_called_once_with(
+                '_mock_key_:__app__:django.contrib.admin',
+                list(SettySettings.objects.filter(name__in=['mybool', 'mydict'])),
+                3600,
+            )
+
+        with self.subTest('correct settings returned'):
+            self.assertEqual([setting.name for setting in all_settings], ['mybool', 'mydict'])
+
+    def test_get_all_for_app_not_installed_is_not_cached(self, mock_cache):
+        self.backend.get_all('not_installed')
+
+        mock_cache.get.assert_not_called()
+
+    def test_get_snapshot_not_found_in_cache(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        with self.assertNumQueries(1):
+            snapshot = self.backend.get_snapshot()
+
+        with self.subTest('cache set_many called'):
+            self.assertEqual(mock_cache.set_many.call_count, 1)
+
+        with self.subTest('correct values returned'):
+            self.assertEqual(dict(snapshot), SNAPSHOT_VALUES)
+
     @override_settings(SETTY_CACHE_TTL=5)
     def test_set_method(self, mock_cache):
         self.backend.set('mybool', False)
@@ -116,15 +312,71 @@ class CacheBackendTest(BaseBackendTestsMixin, TestCase):
             self.assertEqual(SettySettings.objects.get(name='mybool').value, False)
 
         with self.subTest('uses ttl setting if set'):
-            mock_cache.set.assert_called_once_with('_mock_key_:mybool', False, 5)
+            mock_cache.set.assert_called_once_with('_mock_key_:mybool', b'false', 5)
+
+        with self.subTest('bumps the settings version'):
+            mock_cache.incr.assert_called_once_with('_mock_key_:__version__')
+
+        with self.subTest('discards the cached data derived from all settings'):
+            mock_cache.delete_many.assert_called_once_with(
+                [
+                    '_mock_key_:__snapshot__',
+                    '_mock_key_:__index__',
+                    '_mock_key_:__app__:django.contrib.admin',
+                    '_mock_key_:__app__:django.contrib.auth',
+                    '_mock_key_:__app__:django.contrib.contenttypes',
+                    '_mock_key_:__app__:django.contrib.sessions',
+                    '_mock_key_:__app__:django.contrib.messages',
+                    '_mock_key_:__app__:django.contrib.staticfiles',
+                    '_mock_key_:__app__:setty.apps.DjangoSettyConfig',
+                    '_mock_key_:__app_values__:django.contrib.admin',
+                    '_mock_key_:__app_values__:django.contrib.auth',
+                    '_mock_key_:__app_values__:django.contrib.contenttypes',
+                    '_mock_key_:__app_values__:django.contrib.sessions',
+                    '_mock_key_:__app_values__:django.contrib.messages',
+                    '_mock_key_:__app_values__:django.contrib.staticfiles',
+                    '_mock_key_:__app_values__:setty.apps.DjangoSettyConfig',
+                ]
+            )
+
+    @override_settings(SETTY_CACHE_TTL=5)
+    def test_set_many_method(self, mock_cache):
+        self.backend.set_many({'mybool': False, 'myinteger': 111})
+
+        with self.subTest('updates database values'):
+            self.assertEqual(SettySettings.objects.get(name='myinteger').value, 111)
+
+        with self.subTest('caches all values with one call'):
+            mock_cache.set_many.assert_called_once_with(
+                {'_mock_key_:mybool': b'false', '_mock_key_:myinteger': b'111'}, 5
+            )
+
+        with self.subTest('bumps the settings version once'):
+            mock_cache.incr.assert_called_once_with('_mock_key_:__version__')
+
+    def test_set_many_with_invalid_settings_does_not_update_cache(self, mock_cache):
+        with self.assertRaises(SettingDoesNotExistError):
+            self.backend.set_many({'mybool': False, 'invalid': True})
+
+        mock_cache.set_many.assert_not_called()
+
+    def test_bump_version_restarts_version_if_key_missing(self, mock_cache):
+        mock_cache.incr.side_effect = ValueError
+        mock_cache.add.return_value = True
+
+        version = self.backend.bump_version()
+
+        mock_cache.add.assert_called_once_with('_mock_key_:__version__', version, None)
 
     def test_get_calls_cache_get_method_with_expected_cache_key(self, mock_cache):
+        mock_cache.get.return_value = b'true'
+
         self.backend.get('test')
 
         mock_cache.get.assert_called_once_with('_mock_key_:test', '__expired__')
 
     def test_value_returned_if_key_found_in_cache(self, mock_cache):
-        mock_cache.get.return_value = True
+        mock_cache.get.return_value = b'true'
 
         result = self.backend.get('test')
 
@@ -136,7 +388,619 @@ class CacheBackendTest(BaseBackendTestsMixin, TestCase):
         result = self.backend.get('mylist')
 
         with self.subTest('cache set called'):
-            mock_cache.set.assert_called_once_with('_mock_key_:mylist', [1, 2, 3, 4], 3600)
+            mock_cache.set.assert_called_once_with('_mock_key_:mylist', b'[1,2,3,4]', 3600)
 
         with self.subTest('correct value returned'):
             self.assertEqual(result, [1, 2, 3, 4])
+
+    def test_missing_setting_cached_as_not_found(self, mock_cache):
+        mock_cache.get.return_value = '__expired__'
+
+        result = self.backend.get('missing')
+
+        with self.subTest('not found marker cached'):
+            mock_cache.set_many.assert_called_once_with({'_mock_key_:missing': '__not_found__'}, 60)
+
+        with self.subTest('not found value returned'):
+            self.assertIsNone(result)
+
+    @override_settings(SETTY_NOT_FOUND_CACHE_TTL=5)
+    def test_missing_setting_cached_using_not_found_ttl_setting(self, mock_cache):
+        mock_cache.get.return_value = '__expired__'
+
+        self.backend.get('missing')
+
+        mock_cache.set_many.assert_called_once_with({'_mock_key_:missing': '__not_found__'}, 5)
+
+    @override_settings(SETTY_NOT_FOUND_VALUE='__expired__')
+    def test_cached_not_found_marker_returns_not_found_value_without_database_access(self, mock_cache):
+        mock_cache.get.return_value = '__not_found__'
+
+        with self.assertNumQueries(0):
+            result = self.backend.get('missing')
+
+        self.assertEqual(result, '__expired__')
+
+
+@override_settings(SETTY_BACKEND='CacheBackend', SETTY_CACHE_PREFIX='_listing_')
+class CacheBackendListingTests(BaseBackendTestsMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = CacheBackend()
+
+    def test_repeated_get_all_does_not_query_database(self):
+        self.backend.get_all()
+
+        with self.assertNumQueries(0):
+            all_settings = self.backend.get_all()
+
+        self.assertEqual([setting.name for setting in all_settings], list(SNAPSHOT_VALUES))
+
+    def test_repeated_get_all_for_app_does_not_query_database(self):
+        self.backend.get_all('django.contrib.admin')
+
+        with self.assertNumQueries(0):
+            all_settings = self.backend.get_all('django.contrib.admin')
+
+        self.assertEqual([setting.name for setting in all_settings], ['mybool', 'mydict'])
+
+    def test_repeated_get_values_for_app_does_not_query_database(self):
+        self.backend.get_values_for_app('django.contrib.admin')
+
+        with self.assertNumQueries(0):
+            values = self.backend.get_values_for_app('django.contrib.admin')
+
+        self.assertEqual(values, SETTINGS_BY_APP['django.contrib.admin'])
+
+    def test_get_values_for_app_not_installed_is_not_cached(self):
+        self.backend.get_values_for_app('not_installed')
+
+        with self.assertNumQueries(1):
+            self.backend.get_values_for_app('not_installed')
+
+    def test_get_compiled_uses_cached_index(self):
+        self.backend.get_all()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_compiled().get_value('myinteger'), 123)
+
+    def test_repeated_get_compiled_only_reads_version(self):
+        compiled = self.backend.get_compiled()
+        version = self.backend.get_version()
+
+        with patch('setty.backend.cache') as mock_cache:
+            mock_cache.get.return_value = version
+            self.assertIs(self.backend.get_compiled(), compiled)
+
+        mock_cache.get.assert_called_once_with('_listing_:__version__', 0)
+
+    def test_get_compiled_recompiled_after_set(self):
+        self.backend.get_compiled()
+
+        self.backend.set('myinteger', 456)
+
+        self.assertEqual(self.backend.get_compiled().get_value('myinteger'), 456)
+
+    @override_settings(SETTY_CACHE_TTL=0)
+    def test_get_compiled_recompiled_after_ttl(self):
+        compiled = self.backend.get_compiled()
+
+        self.assertIsNot(self.backend.get_compiled(), compiled)
+
+    def test_get_all_by_app_uses_cached_index(self):
+        self.backend.get_all()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_all_by_app(), SETTINGS_BY_APP)
+
+    def test_set_refreshes_cached_settings(self):
+        self.backend.get_all()
+        self.backend.get_all('django.contrib.admin')
+
+        self.backend.set('mybool', False)
+
+        with self.subTest('full index refreshed'):
+            self.assertEqual(self.backend.get_all()[0].value, False)
+
+        with self.subTest('app index refreshed'):
+            self.assertEqual(self.backend.get_all('django.contrib.admin')[0].value, False)
+
+    def test_set_refreshes_cached_app_values(self):
+        self.backend.get_values_for_app('django.contrib.admin')
+
+        self.backend.set('mybool', False)
+
+        self.assertEqual(self.backend.get_values_for_app('django.contrib.admin')['mybool'], False)
+
+    def test_preload_caches_all_settings(self):
+        with self.subTest('all settings loaded'):
+            self.assertEqual(self.backend.preload(), len(SNAPSHOT_VALUES))
+
+        with self.assertNumQueries(0):
+            with self.subTest('values cached'):
+                self.assertEqual({name: self.backend.get(name) for name in SNAPSHOT_VALUES}, SNAPSHOT_VALUES)
+
+            with self.subTest('snapshot cached'):
+                self.assertEqual(dict(self.backend.get_snapshot()), SNAPSHOT_VALUES)
+
+    def test_preload_caches_settings_of_given_apps(self):
+        with self.subTest('settings of app loaded'):
+            self.assertEqual(self.backend.preload(['django.contrib.admin']), 2)
+
+        with self.subTest('values of app cached'):
+            with self.assertNumQueries(0):
+                self.assertEqual(self.backend.get('mydict'), {'a': 1, 'b': 2})
+
+        with self.subTest('other values not cached'):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.backend.get('myinteger'), 123)
+
+    def test_repeated_get_of_missing_setting_does_not_query_database(self):
+        self.backend.get('missing')
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.backend.get('missing'))
+
+    def test_creating_setting_in_admin_evicts_not_found_entry(self):
+        from setty.admin import SettingsForm
+
+        self.backend.get('newsetting')
+
+        with override_settings(SETTY_BACKEND='CacheBackend'):
+            SettingsForm(data={'name': 'newsetting', 'type': 'integer', 'value_unpacked': '5'}).save()
+
+        self.assertEqual(self.backend.get('newsetting'), 5)
+
+    @requires_async_tests
+    async def test_repeated_aget_of_missing_setting_does_not_query_database(self):
+        await self.backend.aget('missing')
+
+        with patch.object(CacheBackend, '_aretrieve_setting') as mock_retrieve:
+            self.assertIsNone(await self.backend.aget('missing'))
+
+        mock_retrieve.assert_not_called()
+
+    def test_get_many_only_retrieves_missing_values_from_database(self):
+        cache.set('_listing_:myinteger', b'456')
+
+        with self.assertNumQueries(1):
+            values = self.backend.get_many(['myinteger', 'mybool', 'missing'])
+
+        with self.subTest('correct values returned'):
+            self.assertEqual(values, {'myinteger': 456, 'mybool': True, 'missing': None})
+
+        with self.subTest('values and missing settings cached'):
+            with self.assertNumQueries(0):
+                self.assertEqual(self.backend.get_many(['mybool', 'missing']), {'mybool': True, 'missing': None})
+
+    @requires_async_tests
+    async def test_aget_many_caches_missing_settings_as_not_found(self):
+        await self.backend.aget_many(['mybool', 'missing'])
+
+        with patch.object(CacheBackend, '_aretrieve_settings') as mock_retrieve:
+            values = await self.backend.aget_many(['mybool', 'missing'])
+
+        with self.subTest('database not accessed'):
+            mock_retrieve.assert_not_called()
+
+        with self.subTest('correct values returned'):
+            self.assertEqual(values, {'mybool': True, 'missing': None})
+
+    @requires_async_tests
+    async def test_repeated_aget_all_does_not_query_database(self):
+        await self.backend.aget_all('django.contrib.admin')
+
+        with patch('setty.backend.DatabaseBackend.aget_all') as mock_aget_all:
+            all_settings = await self.backend.aget_all('django.contrib.admin')
+
+        with self.subTest('database not accessed'):
+            mock_aget_all.assert_not_called()
+
+        with self.subTest('correct settings returned'):
+            self.assertEqual([setting.name for setting in all_settings], ['mybool', 'mydict'])
+
+
+@override_settings(SETTY_BACKEND='CacheBackend', SETTY_CACHE_PREFIX='_stale_', SETTY_CACHE_STALE_TTL=30)
+class CacheBackendStaleWhileRevalidateTests(BaseBackendTestsMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        CacheBackend.refresh_counts.clear()
+        self.backend = CacheBackend()
+
+    def _cache_stale_value(self, name, value):
+        self.backend.set_in_cache(name, value)
+        cache.delete(f'_stale_:{name}:fresh')
+
+    def test_fresh_value_served_from_cache(self):
+        self.backend.set_in_cache('myinteger', 456)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get('myinteger'), 456)
+
+    def test_stale_value_refreshed_by_lock_holder(self):
+        self._cache_stale_value('myinteger', 456)
+
+        result = self.backend.get('myinteger')
+
+        with self.subTest('value refreshed from database'):
+            self.assertEqual(result, 123)
+
+        with self.subTest('refresh counted'):
+            self.assertEqual(CacheBackend.refresh_counts['refreshed'], 1)
+
+        with self.subTest('value fresh again'):
+            self.assertTrue(cache.get('_stale_:myinteger:fresh'))
+
+        with self.subTest('lock released'):
+            self.assertIsNone(cache.get('_stale_:myinteger:lock'))
+
+    def test_stale_value_served_while_another_process_refreshes(self):
+        self._cache_stale_value('myinteger', 456)
+        cache.add('_stale_:myinteger:lock', True)
+
+        with self.assertNumQueries(0):
+            result = self.backend.get('myinteger')
+
+        with self.subTest('stale value returned'):
+            self.assertEqual(result, 456)
+
+        with self.subTest('collapsed refresh counted'):
+            self.assertEqual(CacheBackend.refresh_counts['collapsed'], 1)
+
+    def test_missing_value_retrieved_from_database(self):
+        self.assertEqual(self.backend.get('myinteger'), 123)
+
+    @requires_async_tests
+    async def test_aget_serves_stale_value_while_another_process_refreshes(self):
+        self._cache_stale_value('myinteger', 456)
+        cache.add('_stale_:myinteger:lock', True)
+
+        self.assertEqual(await self.backend.aget('myinteger'), 456)
+        self.assertEqual(CacheBackend.refresh_counts['collapsed'], 1)
+
+    @patch('setty.backend.cache')
+    def test_set_in_cache_keeps_value_for_stale_ttl(self, mock_cache):
+        self.backend.set_in_cache('myinteger', 456)
+
+        mock_cache.set.assert_has_calls(
+            [call('_stale_:myinteger', b'456', 3630), call('_stale_:myinteger:fresh', True, 3600)]
+        )
+
+    @override_settings(SETTY_CACHE_STALE_TTL=0, SETTY_CACHE_TTL_JITTER=0.1)
+    @patch('setty.backend.random.uniform', return_value=0.05)
+    @patch('setty.backend.cache')
+    def test_set_in_cache_applies_ttl_jitter(self, mock_cache, mock_uniform):
+        self.backend.set_in_cache('myinteger', 456)
+
+        with self.subTest('jitter drawn from configured range'):
+            mock_uniform.assert_called_once_with(0, 0.1)
+
+        with self.subTest('ttl extended'):
+            mock_cache.set.assert_called_once_with('_stale_:myinteger', b'456', 3780)
+
+
+@override_settings(SETTY_BACKEND='TwoTierCacheBackend', SETTY_CACHE_PREFIX='_two_tier_')
+class TwoTierCacheBackendTests(BaseBackendTestsMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = TwoTierCacheBackend()
+
+    def test_repeated_get_is_served_from_local_copy(self):
+        self.backend.get('myinteger')
+
+        with patch('setty.backend.cache') as mock_cache:
+            result = self.backend.get('myinteger')
+
+        with self.subTest('correct value returned'):
+            self.assertEqual(result, 123)
+
+        with self.subTest('shared cache not accessed'):
+            mock_cache.get.assert_not_called()
+
+    @override_settings(SETTY_LOCAL_CACHE_TTL=0)
+    def test_local_copy_dropped_when_version_changes(self):
+        self.backend.get('myinteger')
+
+        TwoTierCacheBackend().set('myinteger', 456)
+
+        self.assertEqual(self.backend.get('myinteger'), 456)
+
+    def test_local_copy_kept_within_freshness_window(self):
+        self.backend.get('myinteger')
+
+        TwoTierCacheBackend().set('myinteger', 456)
+
+        self.assertEqual(self.backend.get('myinteger'), 123)
+
+    def test_repeated_get_snapshot_is_served_from_local_copy(self):
+        snapshot = self.backend.get_snapshot()
+
+        with patch('setty.backend.cache') as mock_cache:
+            self.assertIs(self.backend.get_snapshot(), snapshot)
+
+        mock_cache.get.assert_not_called()
+
+    def test_repeated_get_compiled_is_served_from_local_copy(self):
+        compiled = self.backend.get_compiled()
+
+        with patch('setty.backend.cache') as mock_cache:
+            self.assertIs(self.backend.get_compiled(), compiled)
+
+        mock_cache.get.assert_not_called()
+
+    def test_get_compiled_reloaded_after_set(self):
+        self.backend.get_compiled()
+
+        self.backend.set('myinteger', 456)
+
+        self.assertEqual(self.backend.get_compiled().get_value('myinteger'), 456)
+
+    def test_repeated_get_all_by_app_is_served_from_local_copy(self):
+        settings_by_app = self.backend.get_all_by_app()
+
+        with patch('setty.backend.cache') as mock_cache:
+            self.assertIs(self.backend.get_all_by_app(), settings_by_app)
+
+        mock_cache.get.assert_not_called()
+
+    def test_repeated_get_values_for_app_is_served_from_local_copy(self):
+        values = self.backend.get_values_for_app('django.contrib.admin')
+
+        with patch('setty.backend.cache') as mock_cache:
+            self.assertIs(self.backend.get_values_for_app('django.contrib.admin'), values)
+
+        mock_cache.get.assert_not_called()
+
+    def test_repeated_get_all_is_served_from_local_copy(self):
+        all_settings = self.backend.get_all('django.contrib.admin')
+
+        with patch('setty.backend.cache') as mock_cache:
+            self.assertIs(self.backend.get_all('django.contrib.admin'), all_settings)
+
+        mock_cache.get.assert_not_called()
+
+    def test_preload_fills_local_copy(self):
+        self.backend.preload()
+
+        with patch('setty.backend.cache') as mock_cache:
+            with self.subTest('values served from local copy'):
+                self.assertEqual(self.backend.get('myinteger'), 123)
+
+            with self.subTest('snapshot served from local copy'):
+                self.assertEqual(dict(self.backend.get_snapshot()), SNAPSHOT_VALUES)
+
+        mock_cache.get.assert_not_called()
+
+    def test_modifying_returned_values_does_not_change_local_copy(self):
+        for name, read in (
+            ('get', lambda: self.backend.get('mylist')),
+            ('get_many', lambda: self.backend.get_many(['mylist'])['mylist']),
+            ('reader', self.backend.make_reader('mylist')),
+        ):
+            with self.subTest(name):
+                read().append(5)
+                read().append(6)
+
+                self.assertEqual(read(), [1, 2, 3, 4])
+
+    def test_get_many_is_served_from_local_copy(self):
+        self.backend.get_many(['myinteger', 'mybool'])
+        cache.set('_two_tier_:myinteger', b'456')
+
+        self.assertEqual(self.backend.get_many(['myinteger', 'mybool']), {'myinteger': 123, 'mybool': True})
+
+    def test_set_many_drops_own_local_copy(self):
+        self.backend.get_many(['myinteger', 'mybool'])
+
+        self.backend.set_many({'myinteger': 456, 'mybool': False})
+
+        self.assertEqual(self.backend.get_many(['myinteger', 'mybool']), {'myinteger': 456, 'mybool': False})
+
+    def test_set_drops_own_local_copy(self):
+        self.backend.get('myinteger')
+
+        self.backend.set('myinteger', 456)
+
+        self.assertEqual(self.backend.get('myinteger'), 456)
+
+    @override_settings(SETTY_LOCAL_CACHE_CHECK_PER_REQUEST=True)
+    def test_version_checked_on_new_request(self):
+        backend = TwoTierCacheBackend()
+        backend.get('myinteger')
+        TwoTierCacheBackend().set('myinteger', 456)
+
+        request_started.send(sender=self.__class__)
+
+        self.assertEqual(backend.get('myinteger'), 456)
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class DatabaseBackendAsyncTests(BaseBackendTestsMixin, TestCase):
+    def setUp(self):
+        self.backend = DatabaseBackend()
+
+    @requires_async_tests
+    async def test_aget_returns_value(self):
+        self.assertEqual(await self.backend.aget('mydict'), {'a': 1, 'b': 2})
+
+    @requires_async_tests
+    @override_settings(SETTY_NOT_FOUND_VALUE='__notfound__')
+    async def test_aget_missing_item_returns_not_found_setting_value(self):
+        self.assertEqual(await self.backend.aget('missing'), '__notfound__')
+
+    @requires_async_tests
+    async def test_aget_all_returns_all_settings(self):
+        settings = await self.backend.aget_all()
+        self.assertEqual([setting.name for setting in settings], list(SNAPSHOT_VALUES))
+
+    @requires_async_tests
+    @override_settings(SETTY_NOT_FOUND_VALUE='__notfound__')
+    async def test_aget_many_returns_values_in_requested_order(self):
+        values = await self.backend.aget_many(['mystring', 'missing', 'mybool'])
+        self.assertEqual(values, {'mystring': 'test_string', 'missing': '__notfound__', 'mybool': True})
+
+    @requires_async_tests
+    async def test_aget_snapshot_returns_all_values(self):
+        snapshot = await self.backend.aget_snapshot()
+        self.assertEqual(dict(snapshot), SNAPSHOT_VALUES)
+
+    @requires_async_tests
+    async def test_aset_updates_value(self):
+        await self.backend.aset('myinteger', 456)
+        self.assertEqual(await self.backend.aget('myinteger'), 456)
+
+    @requires_async_tests
+    async def test_aset_invalid_setting_raises_exception(self):
+        with self.assertRaises(SettingDoesNotExistError):
+            await self.backend.aset('invalid', True)
+
+
+@override_settings(SETTY_BACKEND='CacheBackend', SETTY_CACHE_PREFIX='_async_')
+class CacheBackendAsyncTests(BaseBackendTestsMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = CacheBackend()
+
+    @requires_async_tests
+    async def test_aget_caches_value(self):
+        await self.backend.aget('myinteger')
+
+        self.assertEqual(cache.get('_async_:myinteger'), b'123')
+
+    @requires_async_tests
+    async def test_aget_returns_value_from_cache(self):
+        cache.set('_async_:myinteger', b'456')
+
+        self.assertEqual(await self.backend.aget('myinteger'), 456)
+
+    @requires_async_tests
+    async def test_aget_many_only_retrieves_missing_values_from_database(self):
+        cache.set('_async_:myinteger', b'456')
+
+        values = await self.backend.aget_many(['myinteger', 'mybool'])
+
+        with self.subTest('correct values returned'):
+            self.assertEqual(values, {'myinteger': 456, 'mybool': True})
+
+        with self.subTest('missing values cached'):
+            self.assertEqual(cache.get('_async_:mybool'), b'true')
+
+    @requires_async_tests
+    async def test_aget_snapshot_caches_snapshot(self):
+        await self.backend.aget_snapshot()
+
+        self.assertEqual(cache.get('_async_:__snapshot__'), JSONCodec().encode(SNAPSHOT_VALUES))
+
+    @requires_async_tests
+    async def test_aset_updates_cache_and_bumps_version(self):
+        version = self.backend.get_version()
+
+        await self.backend.aset('myinteger', 456)
+
+        with self.subTest('cache updated'):
+            self.assertEqual(cache.get('_async_:myinteger'), b'456')
+
+        with self.subTest('version bumped'):
+            self.assertNotEqual(self.backend.get_version(), version)
+
+
+@override_settings(SETTY_BACKEND='TwoTierCacheBackend', SETTY_CACHE_PREFIX='_async_two_tier_')
+class TwoTierCacheBackendAsyncTests(BaseBackendTestsMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = TwoTierCacheBackend()
+
+    @requires_async_tests
+    async def test_repeated_aget_is_served_from_local_copy(self):
+        await self.backend.aget('myinteger')
+        cache.set('_async_two_tier_:myinteger', b'456')
+
+        self.assertEqual(await self.backend.aget('myinteger'), 123)
+
+    @requires_async_tests
+    async def test_aget_many_is_served_from_local_copy(self):
+        await self.backend.aget_many(['myinteger', 'mybool'])
+        cache.set('_async_two_tier_:myinteger', b'456')
+
+        self.assertEqual(await self.backend.aget_many(['myinteger', 'mybool']), {'myinteger': 123, 'mybool': True})
+
+    @requires_async_tests
+    async def test_aset_drops_own_local_copy(self):
+        await self.backend.aget('myinteger')
+
+        await self.backend.aset('myinteger', 456)
+
+        self.assertEqual(await self.backend.aget('myinteger'), 456)
+
+
+class MemoryBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = MemoryBackend(SNAPSHOT_VALUES)
+        self.backend.add('mydict', {'a': 1, 'b': 2}, app_name='django.contrib.admin')
+        self.backend.add('mybool', True, app_name='django.contrib.admin')
+
+    def test_types_inferred_from_values(self):
+        self.assertEqual(
+            {setting.name: setting.type for setting in self.backend.get_all()},
+            {
+                'mybool': 'bool',
+                'mydict': 'dict',
+                'myfloat': 'float',
+                'myinteger': 'integer',
+                'mylist': 'list',
+                'mystring': 'string',
+            },
+        )
+
+    def test_get_returns_values(self):
+        with self.subTest('existing setting'):
+            self.assertEqual(self.backend.get('mylist'), [1, 2, 3, 4])
+
+        with self.subTest('missing setting'):
+            self.assertIsNone(self.backend.get('missing'))
+
+    def test_bulk_reads_return_values(self):
+        with self.subTest('snapshot'):
+            self.assertEqual(dict(self.backend.get_snapshot()), SNAPSHOT_VALUES)
+
+        with self.subTest('settings by app'):
+            self.assertEqual(self.backend.get_all_by_app(), SETTINGS_BY_APP)
+
+        with self.subTest('values for app'):
+            self.assertEqual(
+                self.backend.get_values_for_app('django.contrib.admin'), SETTINGS_BY_APP['django.contrib.admin']
+            )
+
+        with self.subTest('many'):
+            self.assertEqual(self.backend.get_many(['myinteger', 'missing']), {'myinteger': 123, 'missing': None})
+
+    def test_set_updates_values(self):
+        compiled = self.backend.get_compiled()
+
+        self.backend.set('myinteger', 456)
+
+        with self.subTest('value updated'):
+            self.assertEqual(self.backend.get('myinteger'), 456)
+
+        with self.subTest('compiled settings updated'):
+            self.assertEqual(compiled.get_value('myinteger'), 123)
+            self.assertEqual(self.backend.get_compiled().get_value('myinteger'), 456)
+
+    def test_set_many_with_invalid_settings_raises_exception_without_updating(self):
+        with self.assertRaisesMessage(
+            SettingDoesNotExistError,
+            'Error setting values for invalid, other - these settings do not exist in the database!',
+        ):
+            self.backend.set_many({'mybool': False, 'other': 1, 'invalid': True})
+
+        self.assertIs(self.backend.get('mybool'), True)
+
+    def test_copy_is_independent(self):
+        backend = self.backend.copy()
+        backend.set('mybool', False)
+
+        self.assertEqual((self.backend.get('mybool'), backend.get('mybool')), (True, False))
+
+    @override_settings(SETTY_MEMORY_SETTINGS={'mystring': 'from settings'})
+    def test_settings_loaded_from_setting(self):
+        self.assertEqual(MemoryBackend().get('mystring'), 'from settings')
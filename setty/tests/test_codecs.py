@@ -0,0 +1,111 @@
+from datetime import datetime
+from importlib import import_module
+from unittest import skipIf
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from setty.codecs import JSONCodec, MsgpackCodec, PickleCodec, get_codec
+from setty.exceptions import InvalidConfigurationError
+from setty.models import SettySettings
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+VALUES = [True, False, 123, 3.142, 'test_string', [1, 2, 3, 4], {'a': 1, 'b': [2, 3]}, None]
+
+
+class CodecTests(TestCase):
+    def _assert_round_trips(self, codec):
+        for value in VALUES:
+            with self.subTest(value=value):
+                encoded = codec.encode(value)
+                self.assertIsInstance(encoded, bytes)
+                self.assertEqual(codec.decode(encoded), value)
+
+    def test_json_codec_round_trips_values(self):
+        self._assert_round_trips(JSONCodec())
+
+    def test_json_codec_produces_compact_json(self):
+        self.assertEqual(JSONCodec().encode({'a': [1, 2]}), b'{"a":[1,2]}')
+
+    def test_pickle_codec_round_trips_values(self):
+        self._assert_round_trips(PickleCodec())
+
+    @skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack_codec_round_trips_values(self):
+        self._assert_round_trips(MsgpackCodec())
+
+    def test_msgpack_codec_raises_InvalidConfigurationError_if_msgpack_not_installed(self):
+        with patch.dict('sys.modules', {'msgpack': None}):
+            with self.assertRaises(InvalidConfigurationError):
+                MsgpackCodec()
+
+
+class GetCodecTests(TestCase):
+    def test_json_codec_used_by_default(self):
+        self.assertIsInstance(get_codec(), JSONCodec)
+
+    @override_settings(SETTY_VALUE_CODEC='pickle')
+    def test_codec_loaded_by_name(self):
+        self.assertIsInstance(get_codec(), PickleCodec)
+
+    @override_settings(SETTY_VALUE_CODEC='setty.codecs.PickleCodec')
+    def test_codec_loaded_by_import_path(self):
+        self.assertIsInstance(get_codec(), PickleCodec)
+
+    @override_settings(SETTY_VALUE_CODEC='setty.codecs.MissingCodec')
+    def test_invalid_codec_raises_InvalidConfigurationError(self):
+        with self.assertRaises(InvalidConfigurationError):
+            get_codec()
+
+
+class EncodedValueFieldTests(TestCase):
+    def test_value_stored_encoded_in_database(self):
+        SettySettings.objects.create(name='mydict', type='dict', value={'a': 1})
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT value FROM setty_settysettings WHERE name = %s', ['mydict'])
+            self.assertEqual(bytes(cursor.fetchone()[0]), b'{"a":1}')
+
+    def test_value_decoded_when_loaded(self):
+        SettySettings.objects.create(name='mylist', type='list', value=[1, 2])
+
+        self.assertEqual(SettySettings.objects.get(name='mylist').value, [1, 2])
+
+    def test_value_encoded_by_update(self):
+        SettySettings.objects.create(name='mylist', type='list', value=[1, 2])
+
+        SettySettings.objects.filter(name='mylist').update(value=[3, 4])
+
+        self.assertEqual(SettySettings.objects.get(name='mylist').value, [3, 4])
+
+
+class EncodeValuesMigrationTests(TestCase):
+    def _migrate(self, setting):
+        def save(update_fields):
+            get_codec().encode(setting.encoded_value)
+
+        setting.save = save
+        apps = MagicMock()
+        apps.get_model.return_value.objects.all.return_value.iterator.return_value = [setting]
+        import_module('setty.migrations.0003_encode_values_with_codec').encode_values(apps, None)
+
+    def test_values_coerced_to_their_type(self):
+        setting = MagicMock(type='list', value=(1, 2))
+
+        self._migrate(setting)
+
+        self.assertEqual(setting.encoded_value, [1, 2])
+
+    def test_values_which_cannot_be_encoded_name_the_setting(self):
+        for type, value in (('dict', {'at': datetime(2020, 1, 1)}), ('dict', 'abc'), ('integer', 'abc')):
+            setting = MagicMock(type=type, value=value)
+            setting.name = 'mysetting'
+
+            with self.subTest(value=value), self.assertRaisesMessage(
+                ValueError, f'{type} value {value!r} of setty setting mysetting'
+            ):
+                self._migrate(setting)
@@ -0,0 +1,205 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from setty import config
+from setty.models import SettySettings
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+class CommandTestsMixin:
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _path(self, filename):
+        return os.path.join(self.directory.name, filename)
+
+    def _write_jsonl(self, records, filename='settings.jsonl'):
+        path = self._path(filename)
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(record) + '\n' for record in records)
+        return path
+
+
+class SettyExportTests(CommandTestsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=True, app_name='django.contrib.admin')
+        SettySettings.objects.create(name='mydict', type='dict', value={'a': [1, 2]})
+
+    def test_export_writes_json_lines_in_name_order(self):
+        stdout = StringIO()
+        call_command('setty_export', stdout=stdout, stderr=StringIO())
+
+        self.assertEqual(
+            [json.loads(line) for line in stdout.getvalue().splitlines()],
+            [
+                {'name': 'mybool', 'app_name': 'django.contrib.admin', 'type': 'bool', 'value': True},
+                {'name': 'mydict', 'app_name': '', 'type': 'dict', 'value': {'a': [1, 2]}},
+            ],
+        )
+
+    def test_export_filtered_by_app(self):
+        stdout = StringIO()
+        call_command('setty_export', app_names=['django.contrib.admin'], stdout=stdout, stderr=StringIO())
+
+        self.assertEqual([json.loads(line)['name'] for line in stdout.getvalue().splitlines()], ['mybool'])
+
+    def test_unwritable_output_raises_command_error(self):
+        with self.assertRaisesMessage(CommandError, 'Could not write the settings to'):
+            call_command('setty_export', output=self._path('missing/settings.jsonl'), stderr=StringIO())
+
+    @skipIf(yaml is None, 'PyYAML is not installed')
+    def test_export_and_import_round_trip_yaml(self):
+        path = self._path('settings.yaml')
+        call_command('setty_export', output=path, stderr=StringIO())
+        SettySettings.objects.all().delete()
+
+        call_command('setty_import', path, stdout=StringIO())
+
+        self.assertEqual(
+            dict(SettySettings.objects.values_list('name', 'value')), {'mybool': True, 'mydict': {'a': [1, 2]}}
+        )
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class SettyImportTests(CommandTestsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=True)
+        SettySettings.objects.create(name='myinteger', type='integer', value=1)
+
+    RECORDS = [
+        {'name': 'mybool', 'type': 'bool', 'value': True},
+        {'name': 'myinteger', 'type': 'integer', 'value': 2},
+        {'name': 'mystring', 'app_name': 'django.contrib.admin', 'type': 'string', 'value': 'new'},
+    ]
+
+    def test_import_creates_and_updates_settings(self):
+        stdout = StringIO()
+        call_command('setty_import', self._write_jsonl(self.RECORDS), stdout=stdout)
+
+        with self.subTest('settings saved'):
+            self.assertEqual(
+                list(SettySettings.objects.order_by('name').values_list('name', 'app_name', 'value', 'value_preview')),
+                [
+                    ('mybool', '', True, 'True'),
+                    ('myinteger', '', 2, '2'),
+                    ('mystring', 'django.contrib.admin', 'new', 'new'),
+                ],
+            )
+
+        with self.subTest('summary shown'):
+            self.assertEqual(stdout.getvalue(), 'Imported 1 new, 1 changed and 1 unchanged settings.\n')
+
+    def test_import_saves_in_bulk_chunks(self):
+        # The transaction, then one select per chunk, plus a single insert and update only for chunks needing them and
+        # a single insert of their history
+        with self.assertNumQueries(8):
+            call_command('setty_import', self._write_jsonl(self.RECORDS), chunk_size=2, stdout=StringIO())
+
+    def test_dry_run_shows_changes_without_saving(self):
+        stdout = StringIO()
+        call_command('setty_import', self._write_jsonl(self.RECORDS), dry_run=True, stdout=stdout)
+
+        with self.subTest('changes shown'):
+            self.assertEqual(
+                stdout.getvalue(),
+                "~ myinteger: value 1 -> 2\n+ mystring: value 'new'\n"
+                'Would import 1 new, 1 changed and 1 unchanged settings.\n',
+            )
+
+        with self.subTest('nothing saved'):
+            self.assertEqual(dict(SettySettings.objects.values_list('name', 'value')), {'mybool': True, 'myinteger': 1})
+
+    def test_changed_value_type_is_updated(self):
+        stdout = StringIO()
+        call_command(
+            'setty_import',
+            self._write_jsonl([{'name': 'myinteger', 'type': 'bool', 'value': True}]),
+            verbosity=2,
+            stdout=stdout,
+        )
+
+        with self.subTest('setting updated'):
+            self.assertIs(SettySettings.objects.get(name='myinteger').value, True)
+
+        with self.subTest('changed fields shown'):
+            self.assertEqual(
+                stdout.getvalue().splitlines()[0], "~ myinteger: type 'integer' -> 'bool', value 1 -> True"
+            )
+
+    def test_invalid_settings_are_not_imported(self):
+        for records, message in (
+            ([{'name': 'mybool', 'type': 'bool'}], 'Setting 1 must have a name and a value.'),
+            ([{'name': 'new', 'type': 'other', 'value': 1}], "Setting 1 has an invalid type: 'other'."),
+            ([{'name': 'new', 'type': 'bool', 'value': 'false'}], "Setting 1 has an invalid value: 'false' is not"),
+            ([{'name': 'new', 'type': 'integer', 'value': 'abc'}], "Setting 1 has an invalid value: 'abc' is not"),
+            ([{'name': 'new', 'type': 'integer', 'value': True}], 'Setting 1 has an invalid value: True is not'),
+            (
+                [{'name': 'new', 'type': 'rollout', 'value': {'percentage': 500}}],
+                'Setting 1 has an invalid value: Rollout percentages must be',
+            ),
+            (self.RECORDS + self.RECORDS[:1], 'Setting 4 is a duplicate of mybool.'),
+        ):
+            with self.subTest(message=message):
+                with self.assertRaisesMessage(CommandError, message):
+                    call_command('setty_import', self._write_jsonl(records), chunk_size=2, stdout=StringIO())
+
+                self.assertEqual(SettySettings.objects.get(name='myinteger').value, 1)
+
+    def test_valid_values_of_each_type_imported(self):
+        records = [
+            {'name': 'mydict', 'type': 'dict', 'value': {'a': 1}},
+            {'name': 'myfloat', 'type': 'float', 'value': 1},
+            {'name': 'mylist', 'type': 'list', 'value': [1]},
+            {'name': 'myrollout', 'type': 'rollout', 'value': {'percentage': 50}},
+        ]
+
+        call_command('setty_import', self._write_jsonl(records), stdout=StringIO())
+
+        self.assertEqual(SettySettings.objects.count(), 6)
+
+    def test_missing_file_raises_command_error(self):
+        with self.assertRaisesMessage(CommandError, 'Could not read the settings from'):
+            call_command('setty_import', self._path('missing.jsonl'), stdout=StringIO())
+
+    def test_invalid_json_raises_command_error(self):
+        path = self._path('settings.jsonl')
+        with open(path, 'w') as f:
+            f.write('{invalid\n')
+
+        with self.assertRaisesMessage(CommandError, 'Invalid JSON on line 1'):
+            call_command('setty_import', path, stdout=StringIO())
+
+    @override_settings(SETTY_BACKEND='CacheBackend', SETTY_CACHE_PREFIX='_import_')
+    def test_import_drops_changed_settings_from_cache(self):
+        config.myinteger
+
+        with patch('setty.backend.cache') as mock_cache:
+            call_command('setty_import', self._write_jsonl(self.RECORDS), stdout=StringIO())
+
+        with self.subTest('changed settings dropped in one delete'):
+            mock_cache.delete_many.assert_any_call(
+                ['_import_:mystring', '_import_:myinteger', '_import_:mystring:fresh', '_import_:myinteger:fresh']
+            )
+
+        with self.subTest('nothing written'):
+            mock_cache.set_many.assert_not_called()
+
+        with self.subTest('settings version bumped'):
+            mock_cache.incr.assert_called_once_with('_import_:__version__')
@@ -0,0 +1,40 @@
+from django.test import RequestFactory, TestCase, override_settings
+from setty.context_processors import setty_settings
+from setty.models import SettySettings
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class SettySettingsContextProcessorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=True, app_name='django.contrib.admin')
+        SettySettings.objects.create(name='myinteger', type='integer', value=123, app_name='django.contrib.auth')
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def test_adds_settings_for_each_installed_app(self):
+        with override_settings(INSTALLED_APPS=['django.contrib.admin', 'django.contrib.auth']):
+            context = setty_settings(self.request)
+
+        self.assertEqual(set(context), {'setty_django.contrib.admin', 'setty_django.contrib.auth', 'setty'})
+
+    def test_settings_not_loaded_if_unused(self):
+        with self.assertNumQueries(0):
+            setty_settings(self.request)
+
+    def test_settings_for_all_apps_loaded_with_one_query(self):
+        context = setty_settings(self.request)
+
+        with self.assertNumQueries(1):
+            admin_settings = dict(context['setty_django.contrib.admin'])
+            auth_settings = dict(context['setty_django.contrib.auth'])
+            session_settings = dict(context['setty_django.contrib.sessions'])
+
+        with self.subTest('settings grouped by app'):
+            self.assertEqual(admin_settings, {'mybool': True})
+            self.assertEqual(auth_settings, {'myinteger': 123})
+
+        with self.subTest('apps without settings are empty'):
+            self.assertEqual(session_settings, {})
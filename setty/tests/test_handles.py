@@ -0,0 +1,92 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from setty import config
+from setty.backend import CacheBackend
+from setty.handles import SettingHandle
+from setty.models import SettySettings
+from setty.pinning import pinned_settings
+from setty.tests import requires_async_tests
+
+
+class SettingHandleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=True)
+        SettySettings.objects.create(name='myinteger', type='integer', value=123)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_handle_returns_value_for_each_backend(self):
+        for backend in ('DatabaseBackend', 'CacheBackend', 'TwoTierCacheBackend'):
+            with self.subTest(backend=backend), override_settings(SETTY_BACKEND=backend):
+                handle = config.handle('myinteger')
+
+                self.assertEqual((handle.value, handle()), (123, 123))
+
+    def test_handle_is_truthy_if_value_is(self):
+        with self.subTest('true value'):
+            self.assertTrue(config.handle('mybool'))
+
+        with self.subTest('missing setting'):
+            self.assertFalse(config.handle('missing'))
+
+    @override_settings(SETTY_BACKEND='CacheBackend')
+    def test_cache_key_built_once(self):
+        handle = config.handle('myinteger')
+        handle.value
+
+        with patch.object(CacheBackend, '_make_cache_key') as mock_make_cache_key:
+            handle.value
+            handle.value
+
+        mock_make_cache_key.assert_not_called()
+
+    def test_handle_follows_changed_backend(self):
+        handle = config.handle('myinteger')
+        handle.value
+
+        with override_settings(SETTY_BACKEND='CacheBackend', SETTY_CACHE_PREFIX='_handle_'):
+            handle.value
+
+            with self.subTest('reads from new backend'):
+                self.assertEqual(cache.get('_handle_:myinteger'), b'123')
+
+    def test_handle_sees_changed_value(self):
+        for backend in ('DatabaseBackend', 'CacheBackend', 'TwoTierCacheBackend'):
+            with self.subTest(backend=backend), override_settings(SETTY_BACKEND=backend):
+                handle = config.handle('myinteger')
+                handle.value
+
+                config.myinteger = 456
+
+                self.assertEqual(handle.value, 456)
+
+    @override_settings(
+        SETTY_BACKEND='TwoTierCacheBackend', SETTY_INVALIDATION_TRANSPORT='setty.invalidation.InMemoryTransport'
+    )
+    def test_handle_sees_value_changed_by_other_process(self):
+        from setty.backend import TwoTierCacheBackend
+
+        handle = config.handle('myinteger')
+        handle.value
+
+        TwoTierCacheBackend().set('myinteger', 456)
+
+        self.assertEqual(handle.value, 456)
+
+    def test_handle_uses_pinned_settings(self):
+        handle = config.handle('myinteger')
+
+        with pinned_settings():
+            handle.value
+            SettySettings.objects.filter(name='myinteger').update(value=456)
+
+            self.assertEqual(handle.value, 123)
+
+    @requires_async_tests
+    async def test_aget_returns_value(self):
+        self.assertEqual(await SettingHandle('myinteger').aget(), 123)
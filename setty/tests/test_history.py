@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from setty import config
+from setty.admin import SettingsForm
+from setty.backend import DatabaseBackend
+from setty.exceptions import SettingDoesNotExistError
+from setty.history import prune_history
+from setty.models import SettyHistory, SettySettings
+from setty.tests import requires_async_tests
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class HistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=True)
+        SettySettings.objects.create(name='myinteger', type='integer', value=1)
+
+    def _history(self):
+        return list(SettyHistory.objects.order_by('id').values_list('setting_name', 'value', 'deleted'))
+
+    def test_changes_recorded(self):
+        config.myinteger = 2
+        config.set_many({'mybool': False, 'myinteger': 3})
+        SettingsForm(data={'name': 'mystring', 'type': 'string', 'value_unpacked': 'a'}).save()
+        SettySettings.objects.filter(name='mystring').delete()
+
+        self.assertEqual(
+            self._history(),
+            [
+                ('mybool', True, False),
+                ('myinteger', 1, False),
+                ('myinteger', 2, False),
+                ('mybool', False, False),
+                ('myinteger', 3, False),
+                ('mystring', 'a', False),
+                ('mystring', None, True),
+            ],
+        )
+
+    @requires_async_tests
+    async def test_async_changes_recorded(self):
+        from asgiref.sync import sync_to_async
+
+        await config.aset('myinteger', 2)
+
+        self.assertEqual((await sync_to_async(self._history)())[-1], ('myinteger', 2, False))
+
+    def test_failed_set_not_recorded(self):
+        history = self._history()
+
+        with self.assertRaises(SettingDoesNotExistError):
+            DatabaseBackend().set_many({'myinteger': 2, 'missing': 1})
+
+        self.assertEqual(self._history(), history)
+
+    def test_save_rolled_back_if_history_not_recorded(self):
+        setting = SettySettings.objects.get(name='myinteger')
+        setting.value = 2
+
+        with patch.object(SettyHistory, 'record', side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            setting.save()
+
+        self.assertEqual(SettySettings.objects.get(name='myinteger').value, 1)
+
+    def test_generation_increases_with_each_change(self):
+        generation = config.get_generation()
+
+        config.myinteger = 2
+
+        self.assertGreater(config.get_generation(), generation)
+
+    def test_snapshot_at_past_generation(self):
+        generation = config.get_generation()
+        config.myinteger = 2
+        SettySettings.objects.create(name='mystring', type='string', value='a')
+        SettySettings.objects.filter(name='mybool').delete()
+
+        with self.subTest('past values returned'), self.assertNumQueries(1):
+            self.assertEqual(dict(config.at(generation)), {'mybool': True, 'myinteger': 1})
+
+        with self.subTest('current values returned'):
+            self.assertEqual(dict(config.at(config.get_generation())), {'myinteger': 2, 'mystring': 'a'})
+
+    def test_prune_keeps_latest_change_of_each_setting(self):
+        config.myinteger = 2
+        config.myinteger = 3
+        generation = config.get_generation()
+        SettyHistory.objects.update(changed_time=timezone.now() - timedelta(days=100))
+        config.myinteger = 4
+
+        with self.subTest('replaced changes deleted'):
+            self.assertEqual(prune_history(timezone.now() - timedelta(days=90)), 2)
+
+        with self.subTest('snapshots from the pruned generation complete'):
+            self.assertEqual(dict(config.at(generation)), {'mybool': True, 'myinteger': 3})
+
+        with self.subTest('later changes kept'):
+            self.assertEqual(config.at(config.get_generation()).get_value('myinteger'), 4)
+
+    def test_prune_command(self):
+        config.myinteger = 2
+        SettyHistory.objects.update(changed_time=timezone.now() - timedelta(days=10))
+        stdout = StringIO()
+
+        with override_settings(SETTY_HISTORY_RETENTION_DAYS=30):
+            call_command('setty_prune_history', stdout=stdout)
+
+        with self.subTest('history within the retention period kept'):
+            self.assertEqual(stdout.getvalue(), 'Deleted 0 changes from the settings history.\n')
+
+        call_command('setty_prune_history', days=5, stdout=stdout)
+
+        with self.subTest('older history pruned'):
+            self.assertEqual(self._history(), [('mybool', True, False), ('myinteger', 2, False)])
@@ -0,0 +1,188 @@
+import gc
+from unittest.mock import MagicMock, Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from setty.backend import CacheBackend, TwoTierCacheBackend
+from setty.exceptions import InvalidConfigurationError
+from setty.invalidation import (
+    InMemoryTransport,
+    PostgresTransport,
+    RedisTransport,
+    decode_message,
+    encode_message,
+    get_transport,
+    publish_invalidation,
+)
+from setty.models import SettySettings
+from setty.tests import requires_async_tests
+
+
+class MessageTests(TestCase):
+    def test_message_round_trips_names(self):
+        self.assertEqual(decode_message(encode_message(['a', 'b'])), ['a', 'b'])
+
+    def test_message_round_trips_all_settings(self):
+        self.assertIsNone(decode_message(encode_message(None)))
+
+    def test_large_message_invalidates_all_settings(self):
+        self.assertIsNone(decode_message(encode_message(['x' * 100] * 100)))
+
+    def test_invalid_message_is_ignored(self):
+        self.assertEqual(decode_message('{invalid'), [])
+
+
+class CallbackOwner:
+    def __init__(self):
+        self.received = []
+
+    def callback(self, names):
+        self.received.append(names)
+
+
+class InMemoryTransportTests(TestCase):
+    def setUp(self):
+        self.transport = InMemoryTransport()
+
+    def test_publish_calls_subscribed_callbacks(self):
+        callback = Mock()
+        self.transport.subscribe(callback)
+
+        self.transport.publish(['mybool'])
+
+        callback.assert_called_once_with(['mybool'])
+
+    def test_bound_method_subscription_does_not_keep_instance_alive(self):
+        owner = CallbackOwner()
+        self.transport.subscribe(owner.callback)
+
+        del owner
+        gc.collect()
+        self.transport.publish(['mybool'])
+
+        self.assertEqual(self.transport._callbacks, [])
+
+    def test_error_in_callback_does_not_stop_other_callbacks(self):
+        callback = Mock()
+        self.transport.subscribe(Mock(side_effect=ValueError))
+        self.transport.subscribe(callback)
+
+        with self.assertLogs('setty.invalidation', 'ERROR'):
+            self.transport.publish(['mybool'])
+
+        callback.assert_called_once_with(['mybool'])
+
+
+class GetTransportTests(TestCase):
+    def test_no_transport_by_default(self):
+        self.assertIsNone(get_transport())
+
+    def test_publish_without_transport_does_nothing(self):
+        publish_invalidation(['mybool'])
+
+    @override_settings(SETTY_INVALIDATION_TRANSPORT='setty.invalidation.InMemoryTransport')
+    def test_configured_transport_shared_by_process(self):
+        transport = get_transport()
+
+        with self.subTest('configured transport loaded'):
+            self.assertIsInstance(transport, InMemoryTransport)
+
+        with self.subTest('same instance returned'):
+            self.assertIs(get_transport(), transport)
+
+    def test_redis_transport_publishes_names_on_channel(self):
+        redis = MagicMock()
+        with patch.dict('sys.modules', {'redis': redis}):
+            transport = RedisTransport(url='redis://redis:6379/1', channel='mychannel')
+
+        transport.publish(['mybool'])
+
+        with self.subTest('client created from url'):
+            redis.Redis.from_url.assert_called_once_with('redis://redis:6379/1')
+
+        with self.subTest('names published'):
+            redis.Redis.from_url.return_value.publish.assert_called_once_with('mychannel', '["mybool"]')
+
+    def test_redis_transport_raises_InvalidConfigurationError_if_redis_not_installed(self):
+        with patch.dict('sys.modules', {'redis': None}):
+            with self.assertRaises(InvalidConfigurationError):
+                RedisTransport()
+
+    def test_postgres_transport_raises_InvalidConfigurationError_for_other_databases(self):
+        with self.assertRaises(InvalidConfigurationError):
+            PostgresTransport()
+
+
+@override_settings(
+    SETTY_BACKEND='TwoTierCacheBackend',
+    SETTY_CACHE_PREFIX='_invalidation_',
+    SETTY_INVALIDATION_TRANSPORT='setty.invalidation.InMemoryTransport',
+)
+class TwoTierCacheBackendInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='myinteger', type='integer', value=123)
+        SettySettings.objects.create(name='mybool', type='bool', value=True)
+
+    def setUp(self):
+        cache.clear()
+        self.backend = TwoTierCacheBackend()
+
+    def test_changed_setting_evicted_from_local_copy_within_freshness_window(self):
+        self.backend.get('myinteger')
+
+        TwoTierCacheBackend().set('myinteger', 456)
+
+        self.assertEqual(self.backend.get('myinteger'), 456)
+
+    def test_value_read_while_evicted_not_kept_in_local_copy(self):
+        get_from_cache = CacheBackend.get
+
+        def get_then_change(backend, name):
+            value = get_from_cache(backend, name)
+            # The change is received after the old value was read from the shared cache
+            TwoTierCacheBackend().set(name, 456)
+            return value
+
+        with patch.object(CacheBackend, 'get', autospec=True, side_effect=get_then_change):
+            self.assertEqual(self.backend.get('myinteger'), 123)
+
+        self.assertEqual(self.backend.get('myinteger'), 456)
+
+    def test_unchanged_settings_kept_in_local_copy(self):
+        self.backend.get('mybool')
+        SettySettings.objects.filter(name='mybool').update(value=False)
+
+        TwoTierCacheBackend().set('myinteger', 456)
+
+        self.assertEqual(self.backend.get('mybool'), True)
+
+    def test_all_settings_evicted_if_names_unknown(self):
+        self.backend.get('mybool')
+        SettySettings.objects.filter(name='mybool').update(value=False)
+        cache.clear()
+
+        get_transport().publish(None)
+
+        self.assertEqual(self.backend.get('mybool'), False)
+
+    def test_setting_changed_in_admin_evicted_from_local_copy(self):
+        from setty.admin import SettingsForm
+
+        self.backend.get('myinteger')
+
+        SettingsForm(
+            data={'name': 'myinteger', 'type': 'integer', 'value_unpacked': '456'},
+            instance=SettySettings.objects.get(name='myinteger'),
+        ).save()
+
+        self.assertEqual(self.backend.get('myinteger'), 456)
+
+    @requires_async_tests
+    async def test_aset_evicts_setting_from_local_copy(self):
+        await self.backend.aget('myinteger')
+
+        await TwoTierCacheBackend().aset('myinteger', 456)
+
+        self.assertEqual(await self.backend.aget('myinteger'), 456)
@@ -0,0 +1,266 @@
+import threading
+from unittest import skipIf
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from setty import config
+from setty.backend import CacheBackend, TwoTierCacheBackend
+from setty.exceptions import InvalidConfigurationError
+from setty.metrics import InMemoryMetrics, NullMetrics, StatsdMetrics, collect_metrics, get_metrics
+from setty.models import SettySettings
+from setty.tests import requires_async_tests
+
+try:
+    from setty.panels import SettyPanel
+except ImportError:
+    SettyPanel = None
+
+
+class InMemoryMetricsTests(TestCase):
+    def test_increment_counts_per_backend(self):
+        metrics = InMemoryMetrics()
+
+        metrics.increment('cache_hit', 'CacheBackend', 'mybool')
+        metrics.increment('cache_hit', 'CacheBackend', 'myinteger', count=2)
+        metrics.increment('cache_hit', 'TwoTierCacheBackend', 'mybool')
+
+        with self.subTest('count for backend'):
+            self.assertEqual(metrics.get_count('cache_hit', 'CacheBackend'), 3)
+
+        with self.subTest('count for all backends'):
+            self.assertEqual(metrics.get_count('cache_hit'), 4)
+
+        with self.subTest('keys not recorded by default'):
+            self.assertEqual(metrics.get_count('cache_hit', key='mybool'), 0)
+
+    def test_increment_counts_per_key_if_enabled(self):
+        metrics = InMemoryMetrics(per_key=True)
+
+        metrics.increment('cache_hit', 'CacheBackend', 'mybool')
+        metrics.increment('cache_hit', 'CacheBackend', 'myinteger')
+
+        self.assertEqual(metrics.get_count('cache_hit', key='mybool'), 1)
+
+    def test_timing_records_histogram(self):
+        metrics = InMemoryMetrics()
+
+        metrics.timing('get', 'CacheBackend', 0.00005)
+        metrics.timing('get', 'CacheBackend', 0.002)
+
+        timing = metrics.timings[('get', 'CacheBackend', None)]
+        with self.subTest('count recorded'):
+            self.assertEqual(timing['count'], 2)
+
+        with self.subTest('total recorded'):
+            self.assertAlmostEqual(metrics.get_total_time('get'), 0.00205)
+
+        with self.subTest('buckets recorded'):
+            self.assertEqual(timing['buckets'], {0.0001: 1, 0.01: 1})
+
+    def test_summary_sums_counts_and_timings(self):
+        metrics = InMemoryMetrics()
+
+        metrics.increment('cache_hit', 'CacheBackend', count=3)
+        metrics.timing('get', 'CacheBackend', 0.5)
+        metrics.timing('get', 'TwoTierCacheBackend', 0.25)
+
+        self.assertEqual(metrics.summary(), {'cache_hit': {'count': 3, 'time': 0.0}, 'get': {'count': 2, 'time': 0.75}})
+
+    def test_reset_clears_metrics(self):
+        metrics = InMemoryMetrics()
+        metrics.increment('cache_hit', 'CacheBackend')
+        metrics.timing('get', 'CacheBackend', 0.5)
+
+        metrics.reset()
+
+        self.assertEqual(metrics.summary(), {})
+
+
+@override_settings(SETTY_METRICS='setty.metrics.InMemoryMetrics')
+class CollectMetricsTests(TestCase):
+    def setUp(self):
+        get_metrics().reset()
+
+    def test_only_metrics_of_current_thread_collected(self):
+        metrics = get_metrics()
+
+        with collect_metrics() as collected:
+            metrics.increment('cache_hit', 'CacheBackend')
+            metrics.timing('get', 'CacheBackend', 0.5)
+            thread = threading.Thread(target=metrics.increment, args=('cache_hit', 'CacheBackend'))
+            thread.start()
+            thread.join()
+        metrics.increment('cache_hit', 'CacheBackend')
+
+        with self.subTest('metrics of the block collected'):
+            self.assertEqual(
+                collected.summary(), {'cache_hit': {'count': 1, 'time': 0.0}, 'get': {'count': 1, 'time': 0.5}}
+            )
+
+        with self.subTest('all metrics recorded by the process'):
+            self.assertEqual(metrics.get_count('cache_hit'), 3)
+
+    def test_nested_blocks_collect_separately(self):
+        metrics = get_metrics()
+
+        with collect_metrics() as outer:
+            metrics.increment('cache_hit', 'CacheBackend')
+            with collect_metrics() as inner:
+                metrics.increment('cache_miss', 'CacheBackend')
+            metrics.increment('cache_hit', 'CacheBackend')
+
+        self.assertEqual(
+            (outer.get_count('cache_hit'), inner.get_count('cache_hit'), inner.get_count('cache_miss')), (2, 0, 1)
+        )
+
+
+class StatsdMetricsTests(TestCase):
+    def test_metrics_sent_to_statsd(self):
+        statsd = MagicMock()
+        with patch.dict('sys.modules', {'statsd': statsd}):
+            metrics = StatsdMetrics(host='statsd', per_key=True)
+
+        metrics.increment('cache_hit', 'CacheBackend', 'mybool')
+        metrics.timing('get', 'CacheBackend', 0.002)
+
+        client = statsd.StatsClient.return_value
+        with self.subTest('client created'):
+            statsd.StatsClient.assert_called_once_with('statsd', 8125, prefix='setty')
+
+        with self.subTest('counter sent'):
+            client.incr.assert_called_once_with('CacheBackend.cache_hit.mybool', 1)
+
+        with self.subTest('timing sent in milliseconds'):
+            client.timing.assert_called_once_with('CacheBackend.get', 2.0)
+
+    def test_raises_InvalidConfigurationError_if_statsd_not_installed(self):
+        with patch.dict('sys.modules', {'statsd': None}):
+            with self.assertRaises(InvalidConfigurationError):
+                StatsdMetrics()
+
+
+class GetMetricsTests(TestCase):
+    def test_null_metrics_by_default(self):
+        self.assertIs(type(get_metrics()), NullMetrics)
+
+    @override_settings(SETTY_METRICS='setty.metrics.InMemoryMetrics', SETTY_METRICS_OPTIONS={'per_key': True})
+    def test_configured_metrics_shared_by_process(self):
+        metrics = get_metrics()
+
+        with self.subTest('configured metrics loaded'):
+            self.assertIsInstance(metrics, InMemoryMetrics)
+
+        with self.subTest('options passed'):
+            self.assertTrue(metrics.per_key)
+
+        with self.subTest('same instance returned'):
+            self.assertIs(get_metrics(), metrics)
+
+
+@override_settings(SETTY_METRICS='setty.metrics.InMemoryMetrics', SETTY_CACHE_PREFIX='_metrics_')
+class BackendMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=True)
+        SettySettings.objects.create(name='myinteger', type='integer', value=123)
+
+    def setUp(self):
+        cache.clear()
+        self.metrics = get_metrics()
+
+    def test_cache_backend_records_hits_misses_and_database_fallbacks(self):
+        backend = CacheBackend()
+
+        backend.get('mybool')
+        backend.get('mybool')
+        backend.get_many(['mybool', 'myinteger'])
+
+        for event, count in (('cache_hit', 2), ('cache_miss', 2), ('db_fallback', 2)):
+            with self.subTest(event=event):
+                self.assertEqual(self.metrics.get_count(event, 'CacheBackend'), count)
+
+    def test_two_tier_cache_backend_records_local_hits_and_misses(self):
+        backend = TwoTierCacheBackend()
+
+        backend.get('mybool')
+        backend.get('mybool')
+        backend.get_many(['mybool', 'myinteger'])
+
+        for event, count in (('local_hit', 2), ('local_miss', 2), ('cache_miss', 2)):
+            with self.subTest(event=event):
+                self.assertEqual(self.metrics.get_count(event, 'TwoTierCacheBackend'), count)
+
+    @override_settings(SETTY_BACKEND='CacheBackend')
+    def test_config_reads_and_writes_timed(self):
+        config.mybool
+        config.myinteger = 456
+        config.get_many('mybool', 'myinteger')
+
+        for event in ('get', 'set', 'get_many'):
+            with self.subTest(event=event):
+                self.assertEqual(self.metrics.timings[(event, 'CacheBackend', None)]['count'], 1)
+
+    @requires_async_tests
+    async def test_config_async_reads_timed(self):
+        await config.aget('mybool')
+
+        self.assertEqual(self.metrics.summary()['get']['count'], 1)
+
+
+@skipIf(SettyPanel is None, 'django-debug-toolbar is not installed')
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class SettyPanelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=True)
+
+    def _run_panel(self):
+        def view(request):
+            config.mybool
+            config.mybool
+            config.get_many('mybool', 'missing')
+            # Reads of concurrent requests are not included
+            thread = threading.Thread(target=get_metrics().timing, args=('get', 'DatabaseBackend', 0.1))
+            thread.start()
+            thread.join()
+            return 'response'
+
+        panel = SettyPanel(MagicMock(stats={}), view)
+        request = RequestFactory().get('/')
+        response = panel.process_request(request)
+        panel.generate_stats(request, response)
+        return panel, response
+
+    @override_settings(SETTY_METRICS='setty.metrics.InMemoryMetrics')
+    def test_metrics_of_request_recorded(self):
+        # Metrics recorded before the request are not included
+        config.mybool
+
+        panel, response = self._run_panel()
+        stats = panel.get_stats()
+
+        with self.subTest('response returned'):
+            self.assertEqual(response, 'response')
+
+        with self.subTest('events counted'):
+            self.assertEqual(
+                {event: summary['count'] for event, summary in stats['events'].items()}, {'get': 2, 'get_many': 1}
+            )
+
+        with self.subTest('total time of reads and writes'):
+            self.assertEqual(stats['total_time'], stats['events']['get']['time'] + stats['events']['get_many']['time'])
+
+        with self.subTest('reads shown'):
+            self.assertTrue(panel.nav_subtitle.startswith('2 reads in '))
+
+    def test_disabled_without_in_memory_metrics(self):
+        panel, response = self._run_panel()
+
+        with self.subTest('response returned'):
+            self.assertEqual(response, 'response')
+
+        with self.subTest('metrics disabled'):
+            self.assertEqual((panel.get_stats(), panel.nav_subtitle), ({'enabled': False}, 'Metrics disabled'))
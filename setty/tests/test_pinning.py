@@ -0,0 +1,155 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from setty.backend import DatabaseBackend
+from setty.middleware import PinnedSettingsMiddleware
+from setty.models import SettyOverride, SettySettings
+from setty.pinning import pinned_settings
+from setty.tests import requires_async_tests
+from setty.wrapper import Settings
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class PinnedSettingsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=True)
+        SettySettings.objects.create(name='myinteger', type='integer', value=123)
+
+    def setUp(self):
+        self.settings = Settings()
+
+    def test_reads_inside_block_use_a_single_query(self):
+        with pinned_settings(), self.assertNumQueries(1):
+            for _ in range(10):
+                self.settings.mybool
+                self.settings.myinteger
+
+    def test_reads_inside_block_return_values(self):
+        with pinned_settings():
+            self.assertEqual(self.settings.mybool, True)
+            self.assertEqual(self.settings.myinteger, 123)
+
+    @override_settings(SETTY_NOT_FOUND_VALUE='__notfound__')
+    def test_missing_item_inside_block_returns_not_found_setting_value(self):
+        with pinned_settings():
+            self.assertEqual(self.settings.missing, '__notfound__')
+
+    def test_reads_inside_block_do_not_see_concurrent_changes(self):
+        with pinned_settings():
+            self.settings.myinteger
+            SettySettings.objects.filter(name='myinteger').update(value=456)
+
+            self.assertEqual(self.settings.myinteger, 123)
+
+    def test_reads_after_block_see_changes(self):
+        with pinned_settings():
+            self.settings.myinteger
+        SettySettings.objects.filter(name='myinteger').update(value=456)
+
+        self.assertEqual(self.settings.myinteger, 456)
+
+    def test_update_inside_block_is_visible_to_later_reads(self):
+        with pinned_settings():
+            self.settings.myinteger
+            self.settings.myinteger = 456
+
+            self.assertEqual(self.settings.myinteger, 456)
+
+    def test_nested_block_keeps_outer_snapshot(self):
+        with pinned_settings():
+            self.settings.myinteger
+            with pinned_settings():
+                pass
+            SettySettings.objects.filter(name='myinteger').update(value=456)
+
+            self.assertEqual(self.settings.myinteger, 123)
+
+    def test_scoped_reads_inside_block_do_not_see_concurrent_changes(self):
+        setting = SettySettings.objects.get(name='myinteger')
+        SettyOverride.objects.create(setting=setting, scope='tenant:42', value=1)
+
+        with pinned_settings():
+            scoped = self.settings.for_scope('tenant:42')
+            scoped.myinteger
+            scoped.mybool
+            SettyOverride.objects.update(value=2)
+            SettyOverride.objects.create(setting_id='mybool', scope='tenant:42', value=False)
+
+            with self.subTest('overrides pinned'), self.assertNumQueries(0):
+                self.assertEqual((scoped.myinteger, scoped.mybool), (1, True))
+
+            with self.subTest('update inside block visible'):
+                scoped.myinteger = 3
+                self.assertEqual((scoped.myinteger, scoped.mybool), (3, False))
+
+        with self.subTest('changes visible after block'):
+            self.assertEqual(scoped.myinteger, 3)
+
+    @patch.object(DatabaseBackend, 'get_snapshot')
+    def test_block_without_reads_does_not_load_snapshot(self, mock_get_snapshot):
+        with pinned_settings():
+            pass
+
+        mock_get_snapshot.assert_not_called()
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class PinnedSettingsMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='myinteger', type='integer', value=123)
+
+    def test_settings_pinned_for_the_request(self):
+        settings = Settings()
+
+        def view(request):
+            return [settings.myinteger for _ in range(5)]
+
+        middleware = PinnedSettingsMiddleware(view)
+
+        with self.assertNumQueries(1):
+            response = middleware(RequestFactory().get('/'))
+
+        self.assertEqual(response, [123] * 5)
+
+    @requires_async_tests
+    async def test_settings_pinned_for_the_async_request(self):
+        settings = Settings()
+
+        async def view(request):
+            return [await settings.aget('myinteger') for _ in range(5)]
+
+        middleware = PinnedSettingsMiddleware(view)
+
+        with patch.object(DatabaseBackend, 'aget_snapshot', wraps=DatabaseBackend().aget_snapshot) as mock_snapshot:
+            response = await middleware(RequestFactory().get('/'))
+
+        with self.subTest('snapshot loaded once'):
+            mock_snapshot.assert_called_once_with()
+
+        with self.subTest('correct values returned'):
+            self.assertEqual(response, [123] * 5)
+
+    @override_settings(SETTY_BACKEND='TwoTierCacheBackend', SETTY_CACHE_PREFIX='_pinned_')
+    def test_values_modified_in_a_request_not_seen_by_the_next(self):
+        SettySettings.objects.create(name='mylist', type='list', value=[1, 2])
+        cache.clear()
+        settings = Settings()
+
+        def view(request):
+            value = settings.mylist
+            value.append(99)
+            return value, settings.get_many('mylist')['mylist']
+
+        middleware = PinnedSettingsMiddleware(view)
+        middleware(RequestFactory().get('/'))
+
+        with self.subTest('modified value not returned by the next request'):
+            self.assertEqual(middleware(RequestFactory().get('/')), ([1, 2, 99], [1, 2]))
+
+        with self.subTest('modified value not returned outside requests'):
+            self.assertEqual(settings.mylist, [1, 2])
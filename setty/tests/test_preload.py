@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+from django.apps import apps
+from django.core.signals import request_started
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from setty.exceptions import InvalidConfigurationError
+from setty.preload import _preload_on_first_request, preload_settings, setup_preload
+
+
+class PreloadTests(TestCase):
+    @patch('setty.wrapper.Settings.preload', return_value=2)
+    def test_preload_settings_logs_count(self, mock_preload):
+        with self.assertLogs('setty.preload', 'INFO') as logs:
+            self.assertEqual(preload_settings(), 2)
+
+        with self.subTest('all settings preloaded'):
+            mock_preload.assert_called_once_with(None)
+
+        with self.subTest('count logged'):
+            self.assertIn('Preloaded 2 setty settings', logs.output[0])
+
+    @override_settings(SETTY_PRELOAD_APPS=['django.contrib.admin'])
+    @patch('setty.wrapper.Settings.preload', return_value=1)
+    def test_preload_settings_of_configured_apps(self, mock_preload):
+        preload_settings()
+
+        mock_preload.assert_called_once_with(['django.contrib.admin'])
+
+    @patch('setty.wrapper.Settings.preload', side_effect=DatabaseError)
+    def test_preload_error_logged_as_warning(self, mock_preload):
+        with self.assertLogs('setty.preload', 'WARNING'):
+            self.assertEqual(preload_settings(), 0)
+
+    @override_settings(SETTY_PRELOAD_FAIL_SILENTLY=False)
+    @patch('setty.wrapper.Settings.preload', side_effect=DatabaseError)
+    def test_preload_error_raised_if_not_failing_silently(self, mock_preload):
+        with self.assertRaises(DatabaseError):
+            preload_settings()
+
+    @override_settings(SETTY_PRELOAD='first_request')
+    def test_app_ready_does_not_query_the_database(self):
+        self.addCleanup(request_started.disconnect, _preload_on_first_request)
+
+        with self.assertNumQueries(0):
+            apps.get_app_config('setty').ready()
+
+    @override_settings(SETTY_PRELOAD='first_request')
+    @patch('setty.preload.preload_settings')
+    def test_setup_preload_on_first_request_only(self, mock_preload_settings):
+        setup_preload()
+
+        with self.subTest('not preloaded on startup'):
+            mock_preload_settings.assert_not_called()
+
+        request_started.send(sender=self.__class__)
+        request_started.send(sender=self.__class__)
+
+        with self.subTest('preloaded once'):
+            mock_preload_settings.assert_called_once_with()
+
+    @patch('setty.preload.preload_settings')
+    def test_setup_preload_disabled_by_default(self, mock_preload_settings):
+        setup_preload()
+        request_started.send(sender=self.__class__)
+
+        mock_preload_settings.assert_not_called()
+
+    def test_setup_preload_raises_InvalidConfigurationError_for_invalid_value(self):
+        for preload in ('always', 'startup'):
+            with self.subTest(preload=preload), override_settings(SETTY_PRELOAD=preload):
+                with self.assertRaisesMessage(InvalidConfigurationError, 'setty.preload.preload_settings()'):
+                    setup_preload()
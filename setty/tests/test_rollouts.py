@@ -0,0 +1,136 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from setty import config
+from setty.admin import SettingsForm
+from setty.models import SettySettings
+from setty.rollouts import BUCKETS, Rollout
+
+KEYS = range(10000)
+
+
+class RolloutTests(TestCase):
+    def _enabled_count(self, rollout, attributes=None):
+        return sum(rollout.is_enabled(key, attributes) for key in KEYS)
+
+    def test_percentage_of_keys_enabled(self):
+        for percentage in (0, 10, 50, 100):
+            with self.subTest(percentage=percentage):
+                enabled_count = self._enabled_count(Rollout('myrollout', percentage))
+
+                self.assertAlmostEqual(enabled_count / len(KEYS), percentage / 100, delta=0.02)
+
+    def test_buckets_are_stable(self):
+        self.assertEqual(Rollout('myrollout').bucket(42), Rollout('myrollout', 50).bucket('42'))
+
+    def test_keys_stay_enabled_as_percentage_increases(self):
+        enabled = {key for key in KEYS if Rollout('myrollout', 10).is_enabled(key)}
+
+        self.assertTrue(all(Rollout('myrollout', 20).is_enabled(key) for key in enabled))
+
+    def test_rollouts_are_salted_by_name(self):
+        buckets = [(Rollout('first').bucket(key), Rollout('second').bucket(key)) for key in KEYS[:100]]
+
+        self.assertNotEqual([first for first, _ in buckets], [second for _, second in buckets])
+
+    def test_keys_always_enabled(self):
+        self.assertTrue(Rollout.from_value('myrollout', {'percentage': 0, 'keys': [42]}).is_enabled(42))
+
+    def test_first_matching_rule_used(self):
+        rollout = Rollout.from_value(
+            'myrollout',
+            {
+                'percentage': 0,
+                'rules': [
+                    {'attribute': 'country', 'values': ['GB']},
+                    {'attribute': 'plan', 'values': ['beta'], 'percentage': 0},
+                ],
+            },
+        )
+
+        with self.subTest('matching rule'):
+            self.assertEqual(self._enabled_count(rollout, {'country': 'GB', 'plan': 'beta'}), len(KEYS))
+
+        with self.subTest('no matching rule'):
+            self.assertEqual(self._enabled_count(rollout, {'country': 'FR'}), 0)
+
+    def test_invalid_values_raise_value_error(self):
+        for value in (
+            [],
+            {'percentage': 101},
+            {'percentage': '10'},
+            {'unknown': 1},
+            {'rules': [{'values': ['GB']}]},
+        ):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                Rollout.from_value('myrollout', value)
+
+    def test_bucket_in_range(self):
+        self.assertTrue(all(0 <= Rollout('myrollout').bucket(key) < BUCKETS for key in KEYS[:100]))
+
+
+class CompiledRolloutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='myrollout', type='rollout', value={'percentage': 100})
+        SettySettings.objects.create(name='mybool', type='bool', value=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_get_rollout_returns_compiled_rollout(self):
+        for backend in ('DatabaseBackend', 'CacheBackend', 'TwoTierCacheBackend'):
+            with self.subTest(backend=backend), override_settings(SETTY_BACKEND=backend):
+                self.assertTrue(config.is_enabled('myrollout', 42))
+
+    def test_rollout_compiled_once_by_two_tier_backend(self):
+        with override_settings(SETTY_BACKEND='TwoTierCacheBackend', SETTY_CACHE_PREFIX='_rollouts_'):
+            rollout = config.get_rollout('myrollout')
+
+            with self.assertNumQueries(0):
+                self.assertIs(config.get_rollout('myrollout'), rollout)
+
+    def test_only_requested_rollout_compiled(self):
+        for backend in ('DatabaseBackend', 'CacheBackend', 'TwoTierCacheBackend'):
+            with self.subTest(backend=backend), override_settings(SETTY_BACKEND=backend):
+                with patch('setty.backend.CompiledSettings') as mock_compiled, self.assertNumQueries(1):
+                    config.get_rollout('myrollout')
+
+                mock_compiled.assert_not_called()
+
+    def test_rollout_compiled_once_per_change_by_cache_backend(self):
+        with override_settings(SETTY_BACKEND='CacheBackend', SETTY_CACHE_PREFIX='_rollouts_'):
+            rollout = config.get_rollout('myrollout')
+
+            with self.subTest('rollout kept'), self.assertNumQueries(0):
+                self.assertIs(config.get_rollout('myrollout'), rollout)
+
+            config.myrollout = {'percentage': 0}
+
+            with self.subTest('rollout recompiled after change'):
+                self.assertFalse(config.is_enabled('myrollout', 42))
+
+    def test_raw_value_returned_by_config(self):
+        self.assertEqual(config.myrollout, {'percentage': 100})
+
+    def test_other_settings_never_enabled(self):
+        for name in ('mybool', 'missing'):
+            with self.subTest(name=name):
+                self.assertFalse(config.is_enabled(name, 42))
+
+    def test_invalid_rollout_disabled(self):
+        SettySettings.objects.create(name='myinvalidrollout', type='rollout', value={'percentage': 'all'})
+
+        with self.assertLogs('setty.models', 'WARNING'):
+            self.assertFalse(config.is_enabled('myinvalidrollout', 42))
+
+    def test_admin_form_validates_rollouts(self):
+        with self.subTest('valid rollout'):
+            form = SettingsForm(data={'name': 'new', 'type': 'rollout', 'value_unpacked': '{"percentage": 5}'})
+            self.assertTrue(form.is_valid())
+
+        with self.subTest('invalid rollout'):
+            form = SettingsForm(data={'name': 'new', 'type': 'rollout', 'value_unpacked': '{"percentage": 500}'})
+            self.assertFalse(form.is_valid())
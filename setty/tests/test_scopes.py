@@ -0,0 +1,142 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from setty import config
+from setty.backend import CacheBackend, DatabaseBackend, TwoTierCacheBackend
+from setty.exceptions import SettingDoesNotExistError
+from setty.models import SettyOverride, SettySettings
+from setty.scopes import LRUCache
+
+BACKENDS = ('DatabaseBackend', 'CacheBackend', 'TwoTierCacheBackend')
+
+
+class LRUCacheTests(TestCase):
+    def test_least_recently_used_item_evicted(self):
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+
+        lru.set('c', 3)
+
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c'), len(lru)), (1, None, 3, 2))
+
+
+class ScopedSettingsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SettySettings.objects.create(name='mybool', type='bool', value=False)
+        SettySettings.objects.create(name='myinteger', type='integer', value=1)
+        setting = SettySettings.objects.create(name='mystring', type='string', value='global')
+        SettyOverride.objects.create(setting=setting, scope='app:billing', value='app')
+        SettyOverride.objects.create(setting=setting, scope='tenant:42', value='tenant')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_most_specific_override_used(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), override_settings(SETTY_BACKEND=backend):
+                with self.subTest('tenant overrides app'):
+                    self.assertEqual(config.for_scope('tenant:42', 'app:billing').mystring, 'tenant')
+
+                with self.subTest('app override used for other tenants'):
+                    self.assertEqual(config.for_scope('tenant:7', 'app:billing').mystring, 'app')
+
+                with self.subTest('global value used without overrides'):
+                    self.assertEqual(config.for_scope('tenant:7').mystring, 'global')
+
+                with self.subTest('global value used for settings not overridden'):
+                    self.assertEqual(config.for_scope('tenant:42').myinteger, 1)
+
+    def test_set_overrides_most_specific_scope(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), override_settings(SETTY_BACKEND=backend):
+                scoped = config.for_scope('tenant:7', 'app:billing')
+                scoped.mystring
+                scoped.mybool = True
+
+                with self.subTest('override visible'):
+                    self.assertIs(scoped.mybool, True)
+
+                with self.subTest('only the most specific scope overridden'):
+                    self.assertEqual(
+                        list(SettyOverride.objects.filter(setting='mybool').values_list('scope', 'value')),
+                        [('tenant:7', True)],
+                    )
+
+                with self.subTest('global value unchanged'):
+                    self.assertIs(config.mybool, False)
+
+                with self.subTest('deleted override no longer visible'):
+                    self.assertTrue(scoped.delete_override('mybool'))
+                    self.assertIs(scoped.mybool, False)
+
+    def test_set_override_for_missing_setting_raises_exception(self):
+        with self.assertRaises(SettingDoesNotExistError):
+            DatabaseBackend().set_override('missing', 'tenant:42', 1)
+
+    def test_for_scope_requires_a_scope(self):
+        with self.assertRaises(ValueError):
+            config.for_scope()
+
+    def test_database_backend_loads_all_scopes_in_one_query(self):
+        with self.assertNumQueries(1):
+            overrides = DatabaseBackend().get_overrides(['tenant:42', 'app:billing'])
+
+        self.assertEqual(overrides, {'mystring': 'tenant'})
+
+    @override_settings(SETTY_CACHE_PREFIX='_scopes_')
+    def test_cache_backend_caches_overrides_per_scope(self):
+        backend = CacheBackend()
+        backend.get_overrides(['tenant:7', 'app:billing'])
+
+        with self.subTest('scopes without overrides cached'):
+            self.assertEqual(cache.get('_scopes_:__scope__:tenant:7'), b'{}')
+
+        with self.subTest('cached scopes do not query the database'), self.assertNumQueries(0):
+            self.assertEqual(backend.get_overrides(['tenant:7', 'app:billing']), {'mystring': 'app'})
+
+        with self.subTest('only uncached scopes loaded'), self.assertNumQueries(1):
+            self.assertEqual(backend.get_overrides(['tenant:42', 'app:billing']), {'mystring': 'tenant'})
+
+    def test_overrides_of_deleted_setting_no_longer_visible(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), override_settings(SETTY_BACKEND=backend):
+                setting = SettySettings.objects.create(name='myflag', type='bool', value=True)
+                config.for_scope('tenant:42').myflag = False
+                self.assertIs(config.for_scope('tenant:42').myflag, False)
+
+                setting.delete()
+
+                self.assertIsNone(config.for_scope('tenant:42').myflag)
+
+    @override_settings(SETTY_CACHE_PREFIX='_scopes_two_tier_')
+    def test_two_tier_backend_serves_resolved_overrides_locally(self):
+        backend = TwoTierCacheBackend()
+        overrides = backend.get_overrides(['tenant:42', 'app:billing'])
+
+        with patch('setty.backend.cache') as mock_cache:
+            self.assertEqual(backend.get_overrides(['tenant:42', 'app:billing']), overrides)
+
+        mock_cache.get_many.assert_not_called()
+
+    @override_settings(SETTY_BACKEND='TwoTierCacheBackend', SETTY_CACHE_PREFIX='_scopes_two_tier_')
+    def test_modifying_scoped_values_does_not_change_local_copy(self):
+        SettySettings.objects.create(name='mylist', type='list', value=[])
+        config.for_scope('tenant:42').mylist = [1, 2]
+
+        config.for_scope('tenant:42').mylist.append(6)
+        config.for_scope('tenant:42').get_overrides()['mylist'].append(7)
+
+        self.assertEqual(config.for_scope('tenant:42').mylist, [1, 2])
+
+    @override_settings(SETTY_CACHE_PREFIX='_scopes_two_tier_', SETTY_SCOPE_CACHE_SIZE=1)
+    def test_two_tier_backend_bounds_resolved_overrides(self):
+        backend = TwoTierCacheBackend()
+        backend.get_overrides(['tenant:42'])
+        backend.get_overrides(['tenant:7'])
+
+        self.assertEqual(len(backend._local_scopes), 1)
@@ -0,0 +1,71 @@
+from django.test import SimpleTestCase, override_settings
+from setty import config
+from setty.backend import MemoryBackend
+from setty.pinning import pinned_settings
+from setty.testing import override_setty
+from setty.tests import requires_async_tests
+from setty.wrapper import get_backend
+
+
+@override_settings(SETTY_BACKEND='DatabaseBackend')
+class OverrideSettyTests(SimpleTestCase):
+    # SimpleTestCase fails any test which queries the database
+
+    def test_context_manager_replaces_settings(self):
+        previous_backend = get_backend()
+
+        with override_setty({'my-setting': 1}, mybool=True) as backend:
+            with self.subTest('values overridden'):
+                self.assertEqual((config.mybool, config.get_many('my-setting')), (True, {'my-setting': 1}))
+
+            with self.subTest('other settings do not exist'):
+                self.assertIsNone(config.missing)
+
+            with self.subTest('backend returned'):
+                self.assertIs(get_backend(), backend)
+
+        with self.subTest('previous backend restored'):
+            self.assertIs(get_backend(), previous_backend)
+
+    @override_setty(mybool=True)
+    def test_decorated_function(self):
+        self.assertIs(config.mybool, True)
+
+    @override_setty(mybool=True, myinteger=1)
+    def test_nested_overrides_keep_enclosing_values(self):
+        with override_setty(myinteger=2):
+            self.assertEqual(config.get_many('mybool', 'myinteger'), {'mybool': True, 'myinteger': 2})
+
+        self.assertEqual(config.myinteger, 1)
+
+    @override_setty(myinteger=1)
+    def test_settings_can_be_changed(self):
+        config.myinteger = 2
+
+        with self.subTest('value changed'):
+            self.assertEqual(config.myinteger, 2)
+
+        with self.subTest('handles, compiled settings and scopes see the values'):
+            config.for_scope('tenant:42').myinteger = 3
+            self.assertEqual(
+                (config.handle('myinteger').value, config.get_compiled().get_value('myinteger')),
+                (2, 2),
+            )
+            self.assertEqual(config.for_scope('tenant:42').myinteger, 3)
+
+    @override_setty(myinteger=1)
+    def test_pinned_settings(self):
+        with pinned_settings():
+            self.assertEqual(config.myinteger, 1)
+
+    @requires_async_tests
+    @override_setty(myinteger=1)
+    async def test_async_reads(self):
+        self.assertEqual(await config.aget('myinteger'), 1)
+
+
+@override_setty(mybool=True)
+class OverrideSettyClassTests(SimpleTestCase):
+    def test_decorated_class(self):
+        self.assertIsInstance(get_backend(), MemoryBackend)
+        self.assertIs(config.mybool, True)
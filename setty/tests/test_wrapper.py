@@ -1,10 +1,12 @@
 from unittest.mock import patch
 
 from django.test import TestCase, override_settings
-from setty.backend import DatabaseBackend, CacheBackend
+from setty.backend import DatabaseBackend, CacheBackend, TwoTierCacheBackend
 from setty.exceptions import InvalidConfigurationError
 from setty.models import SettySettings as SettySettingsModel
-from setty.wrapper import Settings, _load_backend_class
+from setty.snapshot import key_id
+from setty.tests import requires_async_tests
+from setty.wrapper import Settings, _load_backend_class, get_backend, set_backend
 
 
 class WrapperTests(TestCase):
@@ -25,6 +27,12 @@ class WrapperTests(TestCase):
 
         self.assertEqual(result, ['mybool', 'mydict'])
 
+    @patch.object(DatabaseBackend, 'get_values_for_app', return_value={'mybool': True})
+    def test_get_for_app_loads_values_only(self, mock_get_values_for_app):
+        self.assertEqual(self.settings.get_for_app('django.contrib.admin'), {'mybool': True})
+
+        mock_get_values_for_app.assert_called_once_with('django.contrib.admin')
+
     @patch.object(DatabaseBackend, 'get')
     def test_getattr_calls_backend_get_with_correct_args(self, mock_get):
         self.settings.foo
@@ -37,6 +45,48 @@ class WrapperTests(TestCase):
 
         mock_set.assert_called_once_with('foo', 'bar')
 
+    @requires_async_tests
+    async def test_aget_returns_value(self):
+        self.assertEqual(await self.settings.aget('mybool'), True)
+
+    @requires_async_tests
+    async def test_aget_many_returns_values(self):
+        self.assertEqual(
+            await self.settings.aget_many('mybool', 'mydict'), {'mybool': True, 'mydict': {'a': 1, 'b': 2}}
+        )
+
+    def test_get_compiled_returns_values_by_key_id(self):
+        self.assertEqual(self.settings.get_compiled()[key_id('mydict')], {'a': 1, 'b': 2})
+
+    def test_get_many_returns_values(self):
+        for names in (('mybool', 'mydict'), (['mybool', 'mydict'],)):
+            with self.subTest(names=names):
+                self.assertEqual(self.settings.get_many(*names), {'mybool': True, 'mydict': {'a': 1, 'b': 2}})
+
+    def test_get_many_uses_defaults_for_missing_settings(self):
+        values = self.settings.get_many('mybool', 'missing', defaults={'mybool': False, 'missing': 5})
+
+        self.assertEqual(values, {'mybool': True, 'missing': 5})
+
+    @requires_async_tests
+    async def test_aget_many_uses_defaults_for_missing_settings(self):
+        values = await self.settings.aget_many(['mybool', 'missing'], defaults={'missing': 5})
+
+        self.assertEqual(values, {'mybool': True, 'missing': 5})
+
+    @patch.object(DatabaseBackend, 'set_many')
+    def test_set_many_calls_backend_set_many_with_correct_args(self, mock_set_many):
+        self.settings.set_many({'foo': 'bar', 'baz': 1})
+
+        mock_set_many.assert_called_once_with({'foo': 'bar', 'baz': 1})
+
+    @requires_async_tests
+    @patch.object(DatabaseBackend, 'aset')
+    async def test_aset_calls_backend_aset_with_correct_args(self, mock_aset):
+        await self.settings.aset('foo', 'bar')
+
+        mock_aset.assert_called_once_with('foo', 'bar')
+
 
 class LoadBackendTests(TestCase):
     @override_settings(SETTY_BACKEND='DatabaseBackend')
@@ -51,7 +101,54 @@ class LoadBackendTests(TestCase):
 
         self.assertIsInstance(klass, CacheBackend)
 
+    @override_settings(SETTY_BACKEND='TwoTierCacheBackend')
+    def test_load_two_tier_cache_backend_returns_correct_class(self):
+        klass = _load_backend_class()
+
+        self.assertIsInstance(klass, TwoTierCacheBackend)
+
     @override_settings(SETTY_BACKEND=None)
     def test_backend_setting_undefined_raises_InvalidConfigurationError_exception(self):
         with self.assertRaises(InvalidConfigurationError):
             _load_backend_class()
+
+
+class GetBackendTests(TestCase):
+    def tearDown(self):
+        set_backend(None)
+
+    def test_backend_not_loaded_until_first_use(self):
+        set_backend(None)
+
+        with patch('setty.wrapper._load_backend_class') as mock_load_backend_class:
+            settings = Settings()
+
+            with self.subTest('not loaded on creation'):
+                mock_load_backend_class.assert_not_called()
+
+            settings.get_all_by_app()
+
+            with self.subTest('loaded on first use'):
+                mock_load_backend_class.assert_called_once_with()
+
+    def test_backend_shared_between_calls(self):
+        self.assertIs(get_backend(), get_backend())
+
+    def test_set_backend_replaces_backend(self):
+        backend = CacheBackend()
+
+        set_backend(backend)
+
+        with self.subTest('backend returned'):
+            self.assertIs(get_backend(), backend)
+
+        with self.subTest('backend used by settings'):
+            self.assertIs(Settings()._backend, backend)
+
+    def test_override_settings_replaces_backend(self):
+        with override_settings(SETTY_BACKEND='TwoTierCacheBackend'):
+            with self.subTest('overridden backend used'):
+                self.assertIsInstance(get_backend(), TwoTierCacheBackend)
+
+        with self.subTest('configured backend used after override'):
+            self.assertNotIsInstance(get_backend(), CacheBackend)
@@ -0,0 +1,73 @@
+import json
+from typing import IO, Any, Dict, Iterable, Iterator, Tuple
+
+from .exceptions import InvalidConfigurationError
+
+JSONL = 'jsonl'
+YAML = 'yaml'
+FORMATS = (JSONL, YAML)
+
+# Fields of each exported setting
+FIELDS = ('name', 'app_name', 'type', 'value')
+
+
+def _import_yaml():
+    try:
+        import yaml
+    except ImportError as e:
+        raise InvalidConfigurationError('The PyYAML package needs to be installed to use the YAML format.') from e
+    return yaml
+
+
+def guess_format(path: str) -> str:
+    """
+    Return the format of a file from its extension, defaulting to JSON Lines
+    """
+    return YAML if path.endswith(('.yaml', '.yml')) else JSONL
+
+
+def dump_settings(records: Iterable[Dict[str, Any]], stream: IO[str], format: str = JSONL) -> int:
+    """
+    Write settings to a stream one at a time, either as JSON Lines or as a stream of YAML documents.
+    Returns the number of settings written.
+    """
+    count = 0
+    if format == YAML:
+        yaml = _import_yaml()
+        for record in records:
+            yaml.safe_dump(record, stream, explicit_start=True, sort_keys=False, allow_unicode=True)
+            count += 1
+    else:
+        for record in records:
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def load_settings(stream: IO[str], format: str = JSONL) -> Iterator[Tuple[int, Any]]:
+    """
+    Read settings from a stream one at a time, yielding the line (JSON Lines) or document (YAML) number of each
+    setting along with the setting. Raises ValueError if the stream cannot be parsed.
+    """
+    if format == YAML:
+        yaml = _import_yaml()
+        documents = yaml.safe_load_all(stream)
+        position = 0
+        while True:
+            position += 1
+            try:
+                record = next(documents)
+            except StopIteration:
+                return
+            except yaml.YAMLError as e:
+                raise ValueError('Invalid YAML in document {}: {}'.format(position, e)) from e
+            if record is not None:
+                yield position, record
+    else:
+        for position, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield position, json.loads(line)
+            except ValueError as e:
+                raise ValueError('Invalid JSON on line {}: {}'.format(position, e)) from e
@@ -1,8 +1,27 @@
+import threading
 from importlib import import_module
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
 from .exceptions import InvalidConfigurationError
+from .metrics import get_metrics, timed
+from .pinning import aget_pinned_snapshot, discard_pinned_snapshot, get_pinned_snapshot
+
+# Settings read when a backend is constructed. Changing any of them, e.g. with override_settings, replaces the backend.
+BACKEND_SETTINGS = {
+    'SETTY_BACKEND',
+    'SETTY_CACHE_PREFIX',
+    'SETTY_LOCAL_CACHE_CHECK_PER_REQUEST',
+    'SETTY_INVALIDATION_TRANSPORT',
+    'SETTY_INVALIDATION_OPTIONS',
+    'SETTY_SCOPE_CACHE_SIZE',
+    'SETTY_MEMORY_SETTINGS',
+}
+
+_backend = None
+_backend_lock = threading.Lock()
 
 
 def _load_backend_class():
@@ -13,21 +32,194 @@ def _load_backend_class():
     return getattr(import_module('setty.backend'), backend)()
 
 
+def get_backend():
+    """
+    Return the backend shared by the process, constructing it from SETTY_BACKEND on first use
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _load_backend_class()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Replace the backend shared by the process. Passing None constructs a new backend from SETTY_BACKEND on next use.
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    if setting in BACKEND_SETTINGS:
+        set_backend(None)
+
+
+def _flatten_names(names):
+    # Allow both get_many('a', 'b') and get_many(['a', 'b'])
+    if len(names) == 1 and not isinstance(names[0], str):
+        return list(names[0])
+    return list(names)
+
+
+def _apply_defaults(values, defaults):
+    if defaults:
+        not_found_value = getattr(settings, 'SETTY_NOT_FOUND_VALUE', None)
+        for name, value in values.items():
+            if value == not_found_value and name in defaults:
+                values[name] = defaults[name]
+    return values
+
+
 class Settings:
     """
     Wrapper class used for accessing/updating setty settings
     """
 
-    _backend = _load_backend_class()
+    @property
+    def _backend(self):
+        return get_backend()
 
     def __getattr__(self, key):
+        metrics = get_metrics()
+        if metrics.enabled:
+            with timed(metrics, 'get', self._backend, key):
+                return self._get(key)
+        return self._get(key)
+
+    def _get(self, key):
+        snapshot = get_pinned_snapshot(self._backend)
+        if snapshot is not None:
+            return snapshot.get_value(key)
         return self._backend.get(key)
 
     def __setattr__(self, key, value):
-        self._backend.set(key, value)
+        with timed(get_metrics(), 'set', self._backend, key):
+            self._backend.set(key, value)
+        discard_pinned_snapshot()
+
+    def set_many(self, values):
+        """
+        Update several settings at once, e.g. `config.set_many({'a': 1, 'b': 2})`.
+        Either all of the settings are updated or, if any of them do not exist, none of them are.
+        """
+        with timed(get_metrics(), 'set_many', self._backend):
+            self._backend.set_many(values)
+        discard_pinned_snapshot()
 
     def __dir__(self):
         return [setting.name for setting in self._backend.get_all()]
 
     def get_for_app(self, app_name):
-        return {setting.name: setting.value for setting in self._backend.get_all(app_name)}
+        return self._backend.get_values_for_app(app_name)
+
+    def get_all_by_app(self):
+        return self._backend.get_all_by_app()
+
+    def handle(self, name):
+        """
+        Return a handle for reading a single setting repeatedly with minimal overhead, e.g.
+        `FEATURE_X = config.handle('feature_x')` at module level and `FEATURE_X.value` or `if FEATURE_X:` when used.
+        """
+        from .handles import SettingHandle
+
+        return SettingHandle(name)
+
+    def for_scope(self, *scopes):
+        """
+        Return a view of the settings within the given scopes, ordered from the most specific, e.g.
+        `config.for_scope('tenant:42', 'group:beta').feature_x`. Settings not overridden in any of the scopes have
+        their global value.
+        """
+        from .scopes import ScopedSettings
+
+        return ScopedSettings(self, scopes)
+
+    def get_compiled(self):
+        """
+        Return all settings compiled into a table for the fastest reads, e.g.
+
+            MY_SETTING = key_id('my_setting')
+            ...
+            config.get_compiled()[MY_SETTING]
+        """
+        return self._backend.get_compiled()
+
+    def get_generation(self):
+        """
+        Return the generation of the latest change to any setting, which only increases as settings are changed
+        """
+        from .history import get_generation
+
+        return get_generation()
+
+    def at(self, generation):
+        """
+        Return a snapshot of all settings as they were at a past generation, e.g.
+        `config.at(generation).get_value('my_setting')`
+        """
+        from .history import get_snapshot_at
+
+        return get_snapshot_at(generation)
+
+    def get_rollout(self, name):
+        """
+        Return the compiled rollout of a setting, ready to be evaluated for many keys without reloading the setting.
+        Settings which do not exist, or are not rollouts, return a rollout which is never enabled.
+        """
+        return self._backend.get_rollout(name)
+
+    def is_enabled(self, name, key, attributes=None):
+        """
+        Return whether a rollout setting is enabled for a key, such as a user id, e.g.
+        `config.is_enabled('new_checkout', user.pk, {'country': user.country})`
+        """
+        return self.get_rollout(name).is_enabled(key, attributes)
+
+    def get_many(self, *names, defaults=None):
+        """
+        Fetch several settings in a single round trip, e.g. `values = config.get_many('a', 'b')` or
+        `config.get_many(['a', 'b'], defaults={'b': 1})`. Settings which do not exist, and so would be returned as
+        SETTY_NOT_FOUND_VALUE, are returned from defaults if present.
+        """
+        names = _flatten_names(names)
+        with timed(get_metrics(), 'get_many', self._backend):
+            snapshot = get_pinned_snapshot(self._backend)
+            if snapshot is not None:
+                values = {name: snapshot.get_value(name) for name in names}
+            else:
+                values = self._backend.get_many(names)
+        return _apply_defaults(values, defaults)
+
+    def preload(self, app_names=None):
+        return self._backend.preload(app_names)
+
+    async def aget(self, name):
+        with timed(get_metrics(), 'get', self._backend, name):
+            snapshot = await aget_pinned_snapshot(self._backend)
+            if snapshot is not None:
+                return snapshot.get_value(name)
+            return await self._backend.aget(name)
+
+    async def aget_many(self, *names, defaults=None):
+        """
+        Fetch several settings with a single await, e.g. `values = await config.aget_many('a', 'b')`.
+        The backend retrieves all of the values in a single round trip.
+        """
+        names = _flatten_names(names)
+        with timed(get_metrics(), 'get_many', self._backend):
+            snapshot = await aget_pinned_snapshot(self._backend)
+            if snapshot is not None:
+                values = {name: snapshot.get_value(name) for name in names}
+            else:
+                values = await self._backend.aget_many(names)
+        return _apply_defaults(values, defaults)
+
+    async def aset(self, name, value):
+        with timed(get_metrics(), 'set', self._backend, name):
+            await self._backend.aset(name, value)
+        discard_pinned_snapshot()
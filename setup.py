@@ -16,7 +16,7 @@ setup(
     author='Michael England',
     author_email='michael.k.england@gmail.com',
     license='Apache License Version 2.0',
-    packages=['setty', 'setty.migrations'],
+    packages=['setty', 'setty.migrations', 'setty.management', 'setty.management.commands'],
     include_package_data=True,
     url='https://github.com/mikeengland/django-setty',
     description='Django app allowing users to configure settings dynamically in the Admin screen',
@@ -35,5 +35,6 @@ setup(
     ],
     keywords='django dynamic live settings setty django-setty admin cache',
     install_requires=install_requires,
+    extras_require={'msgpack': ['msgpack'], 'yaml': ['PyYAML']},
     test_suite='setty.tests',
 )